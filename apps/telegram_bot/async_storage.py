@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncStorage:
+    """Awaitable facade over FootballDataStorage for the async handlers.
+
+    Queries run on a bounded thread pool (each worker thread gets its own
+    DuckDB cursor from the storage), so a slow query no longer blocks the
+    event loop. At most `max_concurrency` queries are in flight or queued;
+    a query that doesn't finish within `timeout` seconds, including time
+    spent waiting for a slot, raises asyncio.TimeoutError.
+    """
+
+    def __init__(
+        self,
+        storage,
+        max_workers: int = 4,
+        max_concurrency: Optional[int] = None,
+        timeout: float = 10,
+    ):
+        self.storage = storage
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="storage"
+        )
+        self._slots = asyncio.Semaphore(max_concurrency or max_workers * 4)
+
+    async def _run(self, func, *args, **kwargs):
+        async def call():
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._executor, partial(func, *args, **kwargs)
+                )
+
+        try:
+            return await asyncio.wait_for(call(), self.timeout)
+        except asyncio.TimeoutError:
+            # The worker thread finishes the query in the background
+            logger.warning(f"{func.__name__} timed out after {self.timeout}s")
+            raise
+
+    async def get_upcoming_fixtures(
+        self, team_name: Optional[str] = None, limit: int = 10
+    ) -> List[Dict]:
+        return await self._run(
+            self.storage.get_upcoming_fixtures, team_name=team_name, limit=limit
+        )
+
+    async def get_recent_results(
+        self, team_name: Optional[str] = None, limit: int = 5
+    ) -> List[Dict]:
+        return await self._run(
+            self.storage.get_recent_results, team_name=team_name, limit=limit
+        )
+
+    async def get_upcoming_fixture_lines(
+        self, team_name: Optional[str] = None, limit: int = 10
+    ) -> List[str]:
+        return await self._run(
+            self.storage.get_upcoming_fixture_lines, team_name=team_name, limit=limit
+        )
+
+    async def get_recent_result_lines(
+        self, team_name: Optional[str] = None, limit: int = 5
+    ) -> List[str]:
+        return await self._run(
+            self.storage.get_recent_result_lines, team_name=team_name, limit=limit
+        )
+
+    async def get_league_standings(
+        self, league_id: int = 39, season: Optional[int] = None
+    ) -> List[Dict]:
+        return await self._run(
+            self.storage.get_league_standings, league_id=league_id, season=season
+        )
+
+    async def find_teams(self, team_name: str) -> List[Dict]:
+        return await self._run(self.storage.find_teams, team_name)
+
+    async def get_team_names(self, team_ids: List[int]) -> Dict[int, str]:
+        return await self._run(self.storage.get_team_names, team_ids)
+
+    async def get_change_events(
+        self, after_id: int = 0, limit: int = 1000
+    ) -> List[Dict]:
+        return await self._run(self.storage.get_change_events, after_id, limit)
+
+    async def get_latest_change_event_id(self) -> int:
+        return await self._run(self.storage.get_latest_change_event_id)
+
+    async def data_version(self) -> int:
+        return await self._run(self.storage.current_data_version)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.storage.close()
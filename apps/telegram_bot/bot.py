@@ -1,13 +1,22 @@
+import asyncio
 import logging
-from telegram.ext import Application, CommandHandler
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler
 import sys
+import time
 from pathlib import Path
+from typing import Optional
 
 # Add project root to Python path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 # Now import using absolute path from project root
 from apps.telegram_bot import handlers
+from apps.telegram_bot.async_storage import AsyncStorage
+from apps.telegram_bot.notifications import Notifier
+from apps.telegram_bot.rendering import PAGE_CALLBACK_PREFIX, Renderer, SendQueue
+from apps.telegram_bot.subscriptions import SubscriptionStore
+from pipelines import metrics
+from pipelines.snapshots import SnapshotReader
 from pipelines.storage import FootballDataStorage
 
 logging.basicConfig(
@@ -17,32 +26,127 @@ logger = logging.getLogger(__name__)
 
 
 class FootballBot:
-    def __init__(self, token: str):
-        self.storage = FootballDataStorage()
-        self.app = Application.builder().token(token).build()
+
+    def __init__(
+        self,
+        token: str,
+        db_path: str = "data/football.db",
+        read_only: bool = False,
+        webhook: bool = False,
+        base_url: Optional[str] = None,
+        subscriptions_path: str = "data/subscriptions.db",
+        snapshots_dir: Optional[str] = None,
+        fixture_index: bool = False,
+    ):
+        """Bot application backed by the fixtures database.
+
+        `webhook=True` builds the application without the long-polling
+        updater; updates are then fed in by apps.telegram_bot.webhook.
+        `base_url` points the Bot API client elsewhere (e.g. a test stub).
+        With `snapshots_dir`, queries are served from the snapshots the
+        pipeline publishes there instead of `db_path`, switching to each new
+        one as it appears. `fixture_index` serves fixture, result and
+        standings lookups from an in-memory index (see
+        pipelines.fixture_index).
+        """
+        started = time.perf_counter()
+        if snapshots_dir:
+            source = SnapshotReader(
+                snapshots_dir, storage_options={"fixture_index": fixture_index}
+            )
+        else:
+            source = FootballDataStorage(
+                db_path=db_path, read_only=read_only, fixture_index=fixture_index
+            )
+        # Handlers await queries that run on a thread pool off the event loop
+        self.storage = AsyncStorage(source)
+        builder = Application.builder().token(token).concurrent_updates(True)
+        if webhook:
+            builder = builder.updater(None)
+        if base_url:
+            builder = builder.base_url(base_url)
+        builder = builder.post_init(self.start_notifier).post_shutdown(
+            self.stop_notifier
+        )
+        self.app = builder.build()
+        # Replies are rendered once per data version and paced per chat
+        self.renderer = Renderer(self.storage)
+        self.sender = SendQueue()
+        self.subscriptions = SubscriptionStore(subscriptions_path)
+        self.notifier = Notifier(
+            self.storage, self.subscriptions, self.sender, self.app.bot
+        )
+        self._notifier_task = None
+        # Cache hit rates are read from the caches when metrics are scraped
+        self._collectors = [
+            metrics.REGISTRY.register_collector(metrics.cache_collector(name, cache))
+            for name, cache in (
+                ("replies", self.renderer.cache),
+                ("queries", lambda: self.storage.storage.query_cache),
+            )
+        ]
         self._register_handlers()
+        logger.info(
+            f"Bot initialized in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+    async def start_notifier(self, app=None):
+        """Start pushing change events to followers (in the running event loop)"""
+        if self._notifier_task is None:
+            self._notifier_task = asyncio.create_task(self.notifier.run())
+
+    async def stop_notifier(self, app=None):
+        if self._notifier_task is not None:
+            self._notifier_task.cancel()
+            try:
+                await self._notifier_task
+            except asyncio.CancelledError:
+                pass
+            self._notifier_task = None
+
+    def close(self):
+        for collector in self._collectors:
+            metrics.REGISTRY.unregister_collector(collector)
+        self.storage.close()
+        self.subscriptions.close()
 
     def _register_handlers(self):
         """Register all command handlers"""
         self.app.add_handler(CommandHandler("start", handlers.start))
-        self.app.add_handler(
-            CommandHandler(
-                "fixtures", lambda u, c: handlers.fixtures(u, c, self.storage)
+        for command in ("fixtures", "results", "standings"):
+            handler = getattr(handlers, command)
+            self.app.add_handler(
+                CommandHandler(
+                    command,
+                    lambda u, c, handler=handler: handler(
+                        u, c, self.renderer, self.sender
+                    ),
+                )
+            )
+        for command in ("follow", "unfollow"):
+            handler = getattr(handlers, command)
+            self.app.add_handler(
+                CommandHandler(
+                    command,
+                    lambda u, c, handler=handler: handler(
+                        u, c, self.storage, self.subscriptions, self.sender
+                    ),
+                )
             )
-        )
-        self.app.add_handler(
-            CommandHandler("results", lambda u, c: handlers.results(u, c, self.storage))
-        )
         self.app.add_handler(
-            CommandHandler(
-                "standings", lambda u, c: handlers.standings(u, c, self.storage)
+            CallbackQueryHandler(
+                lambda u, c: handlers.page(u, c, self.renderer, self.sender),
+                pattern=f"^{PAGE_CALLBACK_PREFIX}:",
             )
         )
 
     def run(self):
         """Run the bot indefinitely"""
         logger.info("Starting football bot...")
-        self.app.run_polling()
+        try:
+            self.app.run_polling()
+        finally:
+            self.close()
 
 
 if __name__ == "__main__":
@@ -51,5 +155,20 @@ if __name__ == "__main__":
 
     load_dotenv()
 
-    bot = FootballBot(os.getenv("TELEGRAM_BOT_TOKEN"))
-    bot.run()
+    if os.getenv("TELEGRAM_WEBHOOK_URL"):
+        from apps.telegram_bot import webhook
+
+        webhook.main()
+    else:
+        if os.getenv("METRICS_PORT"):
+            metrics.serve_metrics(int(os.environ["METRICS_PORT"]))
+        db_path = os.getenv("FOOTBALL_DB_PATH", "data/football.db")
+        bot = FootballBot(
+            os.getenv("TELEGRAM_BOT_TOKEN"),
+            db_path=db_path,
+            # The bot only reads; a new database still needs the schema
+            read_only=Path(db_path).exists(),
+            snapshots_dir=os.getenv("FOOTBALL_SNAPSHOT_DIR"),
+            fixture_index=os.getenv("FOOTBALL_FIXTURE_INDEX") == "1",
+        )
+        bot.run()
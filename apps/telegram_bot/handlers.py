@@ -1,83 +1,190 @@
 from telegram import Update
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
 from typing import Optional
+import asyncio
 import logging
 
+from apps.telegram_bot.rendering import page_buttons, parse_page_callback
+from pipelines import metrics
+
 logger = logging.getLogger(__name__)
 
+COMMANDS = metrics.counter("bot_commands_total", "Bot commands by outcome")
+COMMAND_SECONDS = metrics.histogram(
+    "bot_command_seconds", "Time to render a command reply"
+)
+
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Send welcome message with available commands"""
     help_text = """
 ⚽ Football Bot Help:
 /fixtures [team] - Upcoming matches
-/results [team] - Recent results (last 5)
-/standings [league_id] - League table (default: PL)
+/results [team] - Recent results
+/standings [league_id] [season] - League table (default: PL, latest season)
+/follow [team] - Get goals and final scores of a team (no team: list followed)
+/unfollow <team> - Stop following a team
     """
     await update.message.reply_text(help_text.strip())
 
-async def fixtures(update: Update, context: ContextTypes.DEFAULT_TYPE, storage):
-    """Handle fixtures command"""
+
+async def _reply(update: Update, context, renderer, sender, command: str):
+    """Render a command and send its first page (or every page if the
+    arguments don't fit in page buttons)"""
+    args = context.args or []
+    chat_id = update.effective_chat.id
     try:
-        team_name = " ".join(context.args) if context.args else None
-        fixtures = storage.get_upcoming_fixtures(team_name=team_name)
+        with COMMAND_SECONDS.time(command=command):
+            pages = await renderer.render(command, args)
+    except asyncio.TimeoutError:
+        COMMANDS.inc(command=command, outcome="timeout")
+        await sender.send(
+            chat_id,
+            lambda: update.message.reply_text(
+                "⌛ The database is busy, please try again"
+            ),
+        )
+        return
+    except Exception as e:
+        COMMANDS.inc(command=command, outcome="error")
+        logger.error(f"{command.capitalize()} error: {e}")
+        await sender.send(
+            chat_id,
+            lambda: update.message.reply_text(f"❌ Error fetching {command}"),
+        )
+        return
+
+    COMMANDS.inc(command=command, outcome="ok")
+    buttons = page_buttons(command, args, 0, len(pages))
+    for text in pages if buttons is None else pages[:1]:
+        await sender.send(
+            chat_id,
+            lambda text=text: update.message.reply_text(text, reply_markup=buttons),
+        )
 
-        if not fixtures:
-            await update.message.reply_text("No upcoming fixtures found")
-            return
 
-        response = "🗓 Upcoming Fixtures:\n\n" + "\n\n".join(
-            f"⚔ {f['home_team']} vs {f['away_team']}\n"
-            f"📅 {f['date']}\n"
-            f"🏟 {f.get('venue_name', 'Unknown venue')}"
-            for f in fixtures[:10]  # Limit to 10 fixtures
-        )
-        await update.message.reply_text(response[:4096])  # Telegram max message length
+async def fixtures(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, renderer, sender
+):
+    """Handle fixtures command"""
+    await _reply(update, context, renderer, sender, "fixtures")
 
-    except Exception as e:
-        logger.error(f"Fixtures error: {e}")
-        await update.message.reply_text("❌ Error fetching fixtures")
 
-async def results(update: Update, context: ContextTypes.DEFAULT_TYPE, storage):
+async def results(update: Update, context: ContextTypes.DEFAULT_TYPE, renderer, sender):
     """Handle results command"""
-    try:
-        team_name = " ".join(context.args) if context.args else None
-        results = storage.get_recent_results(team_name=team_name)
+    await _reply(update, context, renderer, sender, "results")
 
-        if not results:
-            await update.message.reply_text("No recent results found")
-            return
 
-        response = "📊 Recent Results:\n\n" + "\n\n".join(
-            f"⚽ {r['home_team']} {r['home_goals']}-{r['away_goals']} {r['away_team']}\n"
-            f"📅 {r['date']}"
-            for r in results[:5]  # Last 5 results
+async def standings(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, renderer, sender
+):
+    """Handle standings command"""
+    await _reply(update, context, renderer, sender, "standings")
+
+
+async def page(update: Update, context: ContextTypes.DEFAULT_TYPE, renderer, sender):
+    """Handle the next/previous page buttons of a paginated reply"""
+    query = update.callback_query
+    await query.answer()
+    try:
+        command, number, args = parse_page_callback(query.data)
+        with COMMAND_SECONDS.time(command="page"):
+            pages = await renderer.render(command, args)
+    except Exception as e:
+        COMMANDS.inc(command="page", outcome="error")
+        logger.error(f"Page error: {e}")
+        return
+    COMMANDS.inc(command="page", outcome="ok")
+
+    # The data may have changed since the first page was sent
+    number = min(number, len(pages) - 1)
+    try:
+        await sender.send(
+            update.effective_chat.id,
+            lambda: query.edit_message_text(
+                pages[number],
+                reply_markup=page_buttons(command, args, number, len(pages)),
+            ),
         )
-        await update.message.reply_text(response)
+    except BadRequest as e:
+        # A repeated tap on the same button, or the page is unchanged
+        if "not modified" not in e.message.lower():
+            raise
+
+
+async def _resolve_one(update: Update, storage, sender, team_name: str):
+    """The single team matching `team_name`, or None after telling the user"""
+    chat_id = update.effective_chat.id
+    teams = await storage.find_teams(team_name)
+    if len(teams) == 1:
+        return teams[0]
+    if not teams:
+        text = f"No team found for '{team_name}'"
+    else:
+        text = "Which one? " + ", ".join(team["team_name"] for team in teams[:10])
+    await sender.send(chat_id, lambda: update.message.reply_text(text))
+    return None
+
+
+async def follow(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, storage, subscriptions, sender
+):
+    """Handle follow command"""
+    chat_id = update.effective_chat.id
+    try:
+        if not context.args:
+            names = await storage.get_team_names(subscriptions.teams_followed(chat_id))
+            text = (
+                "🔔 Following: " + ", ".join(sorted(names.values()))
+                if names
+                else "You don't follow any team yet: /follow <team>"
+            )
+        else:
+            team = await _resolve_one(update, storage, sender, " ".join(context.args))
+            if team is None:
+                return
+            subscriptions.follow(chat_id, team["team_id"])
+            text = (
+                f"🔔 Following {team['team_name']}: you'll get goals and final scores"
+            )
+        await sender.send(chat_id, lambda: update.message.reply_text(text))
+        COMMANDS.inc(command="follow", outcome="ok")
 
     except Exception as e:
-        logger.error(f"Results error: {e}")
-        await update.message.reply_text("❌ Error fetching results")
+        COMMANDS.inc(command="follow", outcome="error")
+        logger.error(f"Follow error: {e}")
+        await sender.send(
+            chat_id,
+            lambda: update.message.reply_text("❌ Error updating subscriptions"),
+        )
 
 
-async def standings(update: Update, context: ContextTypes.DEFAULT_TYPE, storage):
-    """Handle standings command"""
+async def unfollow(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, storage, subscriptions, sender
+):
+    """Handle unfollow command"""
+    chat_id = update.effective_chat.id
     try:
-        league_id = (
-            int(context.args[0]) if context.args else 39
-        )  # Default: Premier League
-        standings = storage.get_league_standings(league_id=league_id)
-
-        if not standings:
-            await update.message.reply_text("Standings not available for this league")
+        if not context.args:
+            await sender.send(
+                chat_id, lambda: update.message.reply_text("Usage: /unfollow <team>")
+            )
             return
-
-        response = "🏆 League Standings:\n\n" + "\n".join(
-            f"{pos}. {team['team_name']} - Pts: {team['points']} (GP: {team['games_played']})"
-            for pos, team in enumerate(standings[:20], 1)  # Top 20 teams
-        )
-        await update.message.reply_text(response[:4096])
+        team = await _resolve_one(update, storage, sender, " ".join(context.args))
+        if team is None:
+            return
+        if subscriptions.unfollow(chat_id, team["team_id"]):
+            text = f"🔕 Stopped following {team['team_name']}"
+        else:
+            text = f"You weren't following {team['team_name']}"
+        await sender.send(chat_id, lambda: update.message.reply_text(text))
+        COMMANDS.inc(command="unfollow", outcome="ok")
 
     except Exception as e:
-        logger.error(f"Standings error: {e}")
-        await update.message.reply_text("❌ Error fetching standings")
+        COMMANDS.inc(command="unfollow", outcome="error")
+        logger.error(f"Unfollow error: {e}")
+        await sender.send(
+            chat_id,
+            lambda: update.message.reply_text("❌ Error updating subscriptions"),
+        )
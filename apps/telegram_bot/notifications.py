@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List
+
+from telegram.error import Forbidden
+
+from apps.telegram_bot.rendering import paginate
+from pipelines import metrics
+from pipelines.formatting import format_change_event
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATIONS = metrics.counter(
+    "bot_notifications_total", "Change notifications per chat, by outcome"
+)
+EVENTS_HANDLED = metrics.counter(
+    "bot_change_events_total", "Change events claimed and sent by this worker"
+)
+
+
+class Notifier:
+    """Pushes score changes and final whistles to the chats following a team.
+
+    Change events recorded by the pipeline loads are read in batches after
+    the last position stored in the SubscriptionStore. Each chat gets one
+    message per batch with every event for the teams it follows, sent
+    concurrently through the SendQueue. On first start the position is set
+    to the latest event, so history is never replayed.
+    """
+
+    def __init__(
+        self,
+        storage,
+        subscriptions,
+        sender,
+        bot,
+        interval: float = 30,
+        batch_size: int = 1000,
+        concurrency: int = 100,
+    ):
+        self.storage = storage
+        self.subscriptions = subscriptions
+        self.sender = sender
+        self.bot = bot
+        self.interval = interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    def _messages(self, events: List[Dict]) -> Dict[int, List[str]]:
+        """Message pages per chat for a batch of events"""
+        lines = defaultdict(list)
+        for event in events:
+            teams = (event["home_team_id"], event["away_team_id"])
+            line = format_change_event(event)
+            for chat_id in self.subscriptions.chats_for(teams):
+                lines[chat_id].append(line)
+        return {
+            chat_id: paginate("", chat_lines, per_page=50)
+            for chat_id, chat_lines in lines.items()
+        }
+
+    async def _send(self, chat_id: int, pages: List[str]):
+        try:
+            for text in pages:
+                await self.sender.send(
+                    chat_id,
+                    lambda text=text: self.bot.send_message(chat_id=chat_id, text=text),
+                )
+            NOTIFICATIONS.inc(outcome="sent")
+        except Forbidden:
+            NOTIFICATIONS.inc(outcome="blocked")
+            logger.info(f"Chat {chat_id} blocked the bot, removing its subscriptions")
+            self.subscriptions.remove_chat(chat_id)
+        except Exception as e:
+            NOTIFICATIONS.inc(outcome="error")
+            logger.error(f"Notification to chat {chat_id} failed: {e}")
+
+    async def poll_once(self) -> int:
+        """Send notifications for new events; returns the number of events handled"""
+        last = self.subscriptions.last_event_id()
+        if last is None:
+            latest = await self.storage.get_latest_change_event_id()
+            self.subscriptions.claim_events(None, latest)
+            return 0
+
+        events = await self.storage.get_change_events(last, self.batch_size)
+        if not events:
+            return 0
+        if not self.subscriptions.claim_events(last, events[-1]["event_id"]):
+            return 0  # another worker is sending this batch
+
+        messages = list(self._messages(events).items())
+        for start in range(0, len(messages), self.concurrency):
+            await asyncio.gather(
+                *(
+                    self._send(chat_id, pages)
+                    for chat_id, pages in messages[start : start + self.concurrency]
+                )
+            )
+        EVENTS_HANDLED.inc(len(events))
+        logger.info(f"Notified {len(messages)} chats about {len(events)} events")
+        return len(events)
+
+    async def run(self):
+        while True:
+            try:
+                # Keep draining while full batches arrive
+                while await self.poll_once() == self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Notifier error: {e}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import RetryAfter
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from pipelines import metrics
+from pipelines.formatting import (
+    FIXTURES_HEADER,
+    RESULTS_HEADER,
+    STANDINGS_HEADER,
+    format_standing,
+)
+from pipelines.query_cache import QueryCache
+from pipelines.teams import normalize
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096
+# Telegram limits callback_data to 64 bytes
+MAX_CALLBACK_DATA = 64
+PAGE_CALLBACK_PREFIX = "page"
+
+MESSAGES_SENT = metrics.counter("bot_messages_sent_total", "Messages sent")
+RATE_LIMITED = metrics.counter(
+    "bot_rate_limited_total", "Sends answered with RetryAfter by Telegram"
+)
+
+
+def paginate(
+    header: str,
+    blocks: Sequence[str],
+    per_page: int,
+    separator: str = "\n\n",
+    max_length: int = MAX_MESSAGE_LENGTH,
+) -> List[str]:
+    """Split blocks into messages of at most `per_page` blocks and `max_length`.
+
+    Blocks are never split across messages unless a single block is longer
+    than a whole message; every page starts with `header`.
+    """
+    pages, current = [], []
+    length = len(header)
+    for block in blocks:
+        block = block[: max_length - len(header)]
+        extra = len(block) + (len(separator) if current else 0)
+        if current and (len(current) == per_page or length + extra > max_length):
+            pages.append(header + separator.join(current))
+            current, length = [], len(header)
+            extra = len(block)
+        current.append(block)
+        length += extra
+    if current:
+        pages.append(header + separator.join(current))
+    return pages
+
+
+def page_callback_data(command: str, page: int, args: Sequence[str]) -> Optional[str]:
+    """Self-contained callback data for a page button, so any bot worker can
+    answer it; None when the arguments don't fit Telegram's limit"""
+    data = f"{PAGE_CALLBACK_PREFIX}:{command}:{page}:{' '.join(args)}"
+    return data if len(data.encode()) <= MAX_CALLBACK_DATA else None
+
+
+def parse_page_callback(data: str) -> tuple[str, int, List[str]]:
+    _, command, page, args = data.split(":", 3)
+    return command, int(page), args.split()
+
+
+def page_buttons(
+    command: str, args: Sequence[str], page: int, page_count: int
+) -> Optional[InlineKeyboardMarkup]:
+    """Prev/next buttons for a paginated reply.
+
+    None for a single page, or when the arguments are too long to encode
+    in the buttons (the caller then sends every page as its own message).
+    """
+    if page_count <= 1 or page_callback_data(command, page_count, args) is None:
+        return None
+    buttons = []
+    for target, label in ((page - 1, "◀ Prev"), (page + 1, "Next ▶")):
+        if 0 <= target < page_count:
+            buttons.append(
+                InlineKeyboardButton(
+                    f"{label} ({target + 1}/{page_count})",
+                    callback_data=page_callback_data(command, target, args),
+                )
+            )
+    return InlineKeyboardMarkup([buttons])
+
+
+class Renderer:
+    """Renders command replies into message pages, cached per data version.
+
+    The cache key is (command, normalized arguments, data version), so a
+    reply is rebuilt only after the pipeline loaded new data or the entry
+    expired (upcoming fixtures depend on the clock, hence the TTL).
+    """
+
+    PAGE_SIZES = {"fixtures": 10, "results": 5, "standings": 20}
+
+    def __init__(self, storage, ttl: float = 60, max_entries: int = 1024):
+        self.storage = storage
+        self.cache = QueryCache(ttl=ttl, max_entries=max_entries)
+
+    @staticmethod
+    def _cache_args(command: str, args: Sequence[str]) -> tuple:
+        if command == "standings":
+            return tuple(args)
+        return (normalize(" ".join(args)),)
+
+    async def render(self, command: str, args: Sequence[str]) -> List[str]:
+        version = await self.storage.data_version()
+        key = (command, self._cache_args(command, args), version)
+        pages = self.cache.get(key)
+        if pages is None:
+            pages = await getattr(self, f"_render_{command}")(list(args))
+            self.cache.put(key, pages)
+        return pages
+
+    async def _render_fixtures(self, args: List[str]) -> List[str]:
+        team_name = " ".join(args) or None
+        lines = await self.storage.get_upcoming_fixture_lines(
+            team_name=team_name, limit=20
+        )
+        if not lines:
+            return ["No upcoming fixtures found"]
+        return paginate(FIXTURES_HEADER, lines, self.PAGE_SIZES["fixtures"])
+
+    async def _render_results(self, args: List[str]) -> List[str]:
+        team_name = " ".join(args) or None
+        lines = await self.storage.get_recent_result_lines(
+            team_name=team_name, limit=10
+        )
+        if not lines:
+            return ["No recent results found"]
+        return paginate(RESULTS_HEADER, lines, self.PAGE_SIZES["results"])
+
+    async def _render_standings(self, args: List[str]) -> List[str]:
+        league_id = int(args[0]) if args else 39  # Default: Premier League
+        season = int(args[1]) if len(args) > 1 else None
+        standings = await self.storage.get_league_standings(
+            league_id=league_id, season=season
+        )
+        if not standings:
+            return ["Standings not available for this league"]
+        return paginate(
+            STANDINGS_HEADER,
+            [format_standing(team) for team in standings],
+            self.PAGE_SIZES["standings"],
+            separator="\n",
+        )
+
+
+class SendQueue:
+    """Paces outgoing messages within Telegram's rate limits.
+
+    Messages to one chat are sent in order, at least `per_chat_interval`
+    seconds apart, and no more than `global_rate` messages per second go
+    out overall. A 429 (RetryAfter) waits the time Telegram asks for and
+    retries, up to `max_retries` times.
+    """
+
+    def __init__(
+        self,
+        per_chat_interval: float = 1.0,
+        global_rate: int = 30,
+        max_retries: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable] = asyncio.sleep,
+    ):
+        self.per_chat_interval = per_chat_interval
+        self.global_rate = global_rate
+        self.max_retries = max_retries
+        self._clock = clock
+        self._sleep = sleep
+        self._chat_locks: dict[int, asyncio.Lock] = {}
+        self._last_sent: dict[int, float] = {}
+        self._global_lock = asyncio.Lock()
+        self._recent: List[float] = []
+
+    async def _wait_global_slot(self):
+        async with self._global_lock:
+            while True:
+                now = self._clock()
+                self._recent = [t for t in self._recent if now - t < 1.0]
+                if len(self._recent) < self.global_rate:
+                    self._recent.append(now)
+                    return
+                await self._sleep(1.0 - (now - self._recent[0]))
+
+    async def send(self, chat_id: int, send: Callable[[], Awaitable]):
+        """Run `send` (a coroutine factory, e.g. a reply_text call) for a chat"""
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        async with lock:
+            for attempt in range(self.max_retries + 1):
+                ready_at = self._last_sent.get(chat_id, float("-inf"))
+                wait = ready_at + self.per_chat_interval - self._clock()
+                if wait > 0:
+                    await self._sleep(wait)
+                await self._wait_global_slot()
+                try:
+                    result = await send()
+                    self._last_sent[chat_id] = self._clock()
+                    MESSAGES_SENT.inc()
+                    return result
+                except RetryAfter as e:
+                    RATE_LIMITED.inc()
+                    if attempt == self.max_retries:
+                        raise
+                    delay = e.retry_after
+                    if isinstance(delay, timedelta):
+                        delay = delay.total_seconds()
+                    logger.warning(f"Rate limited in chat {chat_id}, retry in {delay}s")
+                    await self._sleep(delay)
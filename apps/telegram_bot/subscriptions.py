@@ -0,0 +1,122 @@
+import sqlite3
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+
+class SubscriptionStore:
+    """Which chats follow which teams, plus the notifier's progress.
+
+    Kept in a small SQLite file next to the football database because the
+    bot may open DuckDB read-only. Lookups go through an in-memory
+    team_id -> chat set index, reloaded whenever SQLite reports that
+    another connection (e.g. another webhook worker) changed the file.
+    """
+
+    def __init__(self, db_path: str = "data/subscriptions.db"):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self.conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                team_id INTEGER NOT NULL,
+                chat_id INTEGER NOT NULL,
+                PRIMARY KEY (team_id, chat_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_subscriptions_chat
+                ON subscriptions(chat_id);
+            CREATE TABLE IF NOT EXISTS notifier_state (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            """)
+        self._lock = threading.Lock()
+        self._index: dict[int, Set[int]] = defaultdict(set)
+        self._seen_version: Optional[int] = None
+
+    def _sync(self):
+        """Reload the index if the file changed through another connection"""
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._seen_version:
+            return
+        index = defaultdict(set)
+        for team_id, chat_id in self.conn.execute(
+            "SELECT team_id, chat_id FROM subscriptions"
+        ):
+            index[team_id].add(chat_id)
+        self._index, self._seen_version = index, version
+
+    def follow(self, chat_id: int, team_id: int):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO subscriptions VALUES (?, ?)", (team_id, chat_id)
+            )
+            self._sync()
+            self._index[team_id].add(chat_id)
+
+    def unfollow(self, chat_id: int, team_id: int) -> bool:
+        with self._lock, self.conn:
+            removed = self.conn.execute(
+                "DELETE FROM subscriptions WHERE team_id = ? AND chat_id = ?",
+                (team_id, chat_id),
+            ).rowcount
+            self._sync()
+            self._index[team_id].discard(chat_id)
+            return bool(removed)
+
+    def remove_chat(self, chat_id: int):
+        """Drop every subscription of a chat (e.g. the user blocked the bot)"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM subscriptions WHERE chat_id = ?", (chat_id,))
+            self._sync()
+            for chats in self._index.values():
+                chats.discard(chat_id)
+
+    def teams_followed(self, chat_id: int) -> list[int]:
+        with self._lock:
+            return [
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT team_id FROM subscriptions WHERE chat_id = ? ORDER BY team_id",
+                    (chat_id,),
+                )
+            ]
+
+    def chats_for(self, team_ids: Iterable[int]) -> Set[int]:
+        """Chats following any of the teams"""
+        with self._lock:
+            self._sync()
+            chats = set()
+            for team_id in team_ids:
+                chats |= self._index.get(team_id, set())
+            return chats
+
+    def last_event_id(self) -> Optional[int]:
+        row = self.conn.execute(
+            "SELECT value FROM notifier_state WHERE key = 'last_event_id'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def claim_events(self, last_seen: Optional[int], up_to: int) -> bool:
+        """Move the notifier position from `last_seen` to `up_to`.
+
+        Compare-and-swap, so when several bot workers see the same events
+        only the one whose claim succeeds sends them.
+        """
+        with self._lock, self.conn:
+            if last_seen is None:
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO notifier_state VALUES ('last_event_id', ?)",
+                    (up_to,),
+                )
+            else:
+                cursor = self.conn.execute(
+                    "UPDATE notifier_state SET value = ? "
+                    "WHERE key = 'last_event_id' AND value = ?",
+                    (up_to, last_seen),
+                )
+            return cursor.rowcount == 1
+
+    def close(self):
+        self.conn.close()
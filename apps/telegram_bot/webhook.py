@@ -0,0 +1,187 @@
+import asyncio
+import hmac
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+from telegram import Bot, Update
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from apps.telegram_bot.bot import FootballBot
+from pipelines import metrics
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_PATH = "/telegram"
+
+
+class WebhookApp:
+    """ASGI application receiving Telegram updates for a FootballBot.
+
+    POSTs to `path` are checked against the secret token Telegram sends in
+    the X-Telegram-Bot-Api-Secret-Token header, parsed and put on the bot's
+    update queue; the response is sent before the update is handled so
+    Telegram never waits on a query. GET /healthz answers 200 and GET
+    /metrics serves this worker's metrics in the Prometheus text format
+    (scrape each worker, e.g. one port per worker, for totals). The ASGI
+    lifespan starts and stops the bot application, so every server worker
+    process runs its own bot and storage (and notifier; workers claim
+    notification batches so each is sent once).
+    """
+
+    def __init__(
+        self,
+        bot: FootballBot,
+        path: str = WEBHOOK_PATH,
+        secret_token: Optional[str] = None,
+    ):
+        self.bot = bot
+        self.path = path
+        self.secret_token = secret_token
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            if scope["path"] == "/metrics" and scope["method"] == "GET":
+                status, content_type = 200, metrics.CONTENT_TYPE.encode()
+                body = metrics.REGISTRY.render().encode()
+            else:
+                status = await self._handle(scope, receive)
+                content_type, body = b"text/plain", str(status).encode()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": status,
+                    "headers": [(b"content-type", content_type)],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+
+    async def startup(self):
+        await self.bot.app.initialize()
+        await self.bot.app.start()
+        await self.bot.start_notifier()
+
+    async def shutdown(self):
+        await self.bot.stop_notifier()
+        await self.bot.app.stop()
+        await self.bot.app.shutdown()
+        self.bot.close()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _handle(self, scope, receive) -> int:
+        if scope["path"] == "/healthz" and scope["method"] == "GET":
+            return 200
+        if scope["path"] != self.path:
+            return 404
+        if scope["method"] != "POST":
+            return 405
+
+        headers = dict(scope["headers"])
+        if self.secret_token is not None:
+            sent = headers.get(b"x-telegram-bot-api-secret-token", b"")
+            if not hmac.compare_digest(sent, self.secret_token.encode()):
+                return 403
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        try:
+            update = Update.de_json(json.loads(body), self.bot.app.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Rejected malformed update: {e}")
+            return 400
+        await self.bot.app.update_queue.put(update)
+        return 200
+
+
+def create_app() -> WebhookApp:
+    """Application factory for ASGI servers, configured from the environment.
+
+    Each worker opens the database read-only, so any number of workers can
+    serve from one file while the pipeline loads elsewhere. With
+    FOOTBALL_SNAPSHOT_DIR set, workers follow the snapshots the pipeline
+    publishes there, so loads never wait for the bot to let go of the file.
+    FOOTBALL_FIXTURE_INDEX=1 serves lookups from an in-memory fixture index.
+    """
+    bot = FootballBot(
+        os.environ["TELEGRAM_BOT_TOKEN"],
+        db_path=os.getenv("FOOTBALL_DB_PATH", "data/football.db"),
+        read_only=True,
+        webhook=True,
+        snapshots_dir=os.getenv("FOOTBALL_SNAPSHOT_DIR"),
+        fixture_index=os.getenv("FOOTBALL_FIXTURE_INDEX") == "1",
+    )
+    return WebhookApp(
+        bot,
+        path=os.getenv("TELEGRAM_WEBHOOK_PATH", WEBHOOK_PATH),
+        secret_token=os.getenv("TELEGRAM_WEBHOOK_SECRET"),
+    )
+
+
+async def register_webhook(token: str, url: str, secret_token: Optional[str] = None):
+    """Tell Telegram where to deliver updates (once, not per worker)"""
+    async with Bot(token) as bot:
+        await bot.set_webhook(
+            url, secret_token=secret_token, allowed_updates=Update.ALL_TYPES
+        )
+    logger.info(f"Webhook registered at {url}")
+
+
+def serve(host: str = "0.0.0.0", port: int = 8443, workers: Optional[int] = None):
+    """Run the webhook app in `workers` processes behind one port"""
+    try:
+        import uvicorn
+    except ImportError:
+        raise RuntimeError("Webhook mode requires uvicorn: pip install uvicorn")
+
+    uvicorn.run(
+        "apps.telegram_bot.webhook:create_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers or os.cpu_count(),
+        lifespan="on",
+    )
+
+
+def main():
+    token = os.environ["TELEGRAM_BOT_TOKEN"]
+    url = os.environ["TELEGRAM_WEBHOOK_URL"]
+    path = os.getenv("TELEGRAM_WEBHOOK_PATH", WEBHOOK_PATH)
+    asyncio.run(
+        register_webhook(
+            token, url.rstrip("/") + path, os.getenv("TELEGRAM_WEBHOOK_SECRET")
+        )
+    )
+    serve(
+        host=os.getenv("WEBHOOK_HOST", "0.0.0.0"),
+        port=int(os.getenv("WEBHOOK_PORT", "8443")),
+        workers=int(os.getenv("WEBHOOK_WORKERS", "0")) or None,
+    )
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    main()
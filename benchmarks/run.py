@@ -0,0 +1,318 @@
+# benchmarks/run.py
+"""End-to-end pipeline benchmarks on synthetic data.
+
+    python -m benchmarks.run                        # 10^3..10^5 fixtures
+    python -m benchmarks.run --sizes 1000 10000000  # up to 10^7
+    python -m benchmarks.run --update-baseline
+
+Each size runs in a fresh process so its peak RSS is its own. Stages:
+ingestion from a local stub API, processing (JSON -> Arrow), Parquet
+writing into the lake, DuckDB loading, every bot query (cold, with caches
+cleared, warm, and answered by the in-memory fixture index) and the cold
+start of a bot worker on the loaded database (see benchmarks/startup.py).
+Results are compared with benchmarks/baseline.json and the run fails when
+a timing regressed by more than the tolerance. The baseline records the
+host it was measured on; on another host absolute timings say little, so
+they are compared after scaling by the median ratio of all stages (how
+much faster or slower this host is) and differences are only reported.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(str(Path(__file__).parent.parent))
+import pyarrow as pa
+
+from benchmarks.startup import measure_startup
+from benchmarks.synthetic import generate_dataset, team_name
+from pipelines.ingestion import fetch_fixtures_batch
+from pipelines.lake import partition_glob, write_partitioned
+from pipelines.processing import fixtures_to_table, read_fixture_items
+from pipelines.storage import FootballDataStorage
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+# Differences below this many seconds are noise, whatever the ratio: for
+# the medians of repeated queries and startups, and for the pipeline stages
+# (records with rows_per_sec), which run once per size
+MIN_REGRESSION_SECONDS = 0.005
+MIN_STAGE_REGRESSION_SECONDS = 0.05
+
+
+def host_info() -> dict:
+    """The machine a set of timings was measured on"""
+    cpu = platform.processor()  # empty on Linux, where /proc/cpuinfo has it
+    if os.path.exists("/proc/cpuinfo"):
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    cpu = line.split(":", 1)[1].strip()
+                    break
+    return {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu": cpu,
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _stub_api(files: dict):
+    """Serve the generated files as /fixtures?league=..&season=.."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            path = files[(int(query["league"][0]), int(query["season"][0]))]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(path.stat().st_size))
+            self.end_headers()
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        # The default listen backlog of 5 drops some of the batch's
+        # concurrent connects, which then wait a full second to retry
+        request_queue_size = 64
+
+    server = Server(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _time_query(func, reps: int, clear=None) -> dict:
+    timings = []
+    for _ in range(reps):
+        if clear:
+            clear()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    return {"seconds": median, "qps": 1 / median if median else None}
+
+
+def bench_size(fixtures: int, work_dir: str, reps: int = 20) -> dict:
+    """Run every stage for one dataset size and return its measurements"""
+    work = Path(work_dir)
+    results = {}
+
+    def record(stage, seconds, rows=None):
+        results[stage] = {
+            "seconds": seconds,
+            "rows_per_sec": rows / seconds if rows and seconds else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    started = time.perf_counter()
+    dataset = generate_dataset(work / "raw", fixtures)
+    record("generate", time.perf_counter() - started, fixtures)
+
+    # Ingestion: fetch every league/season from a local stub of the API
+    server = _stub_api({(league, season): path for league, season, path in dataset})
+    try:
+        started = time.perf_counter()
+        fetched = fetch_fixtures_batch(
+            [(league, season) for league, season, _ in dataset],
+            api_key="bench",
+            base_url=f"http://127.0.0.1:{server.server_address[1]}",
+        )
+        record("ingestion", time.perf_counter() - started, fixtures)
+        assert all(result.ok for result in fetched), "stub ingestion failed"
+        del fetched
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    started = time.perf_counter()
+    tables = [fixtures_to_table(read_fixture_items(path)) for _, _, path in dataset]
+    table = pa.concat_tables(tables)
+    del tables
+    record("processing", time.perf_counter() - started, fixtures)
+    assert table.num_rows == fixtures
+
+    lake = work / "lake"
+    started = time.perf_counter()
+    write_partitioned(table, lake)
+    record("parquet_write", time.perf_counter() - started, fixtures)
+    del table
+
+    storage = FootballDataStorage(db_path=str(work / "bench.db"))
+    try:
+        started = time.perf_counter()
+        loaded = storage.bulk_load(partition_glob(lake))
+        record("duckdb_load", time.perf_counter() - started, fixtures)
+        assert loaded["inserted"] == fixtures
+
+        league, team = dataset[0][0], team_name(dataset[0][0], 1)
+
+        def clear():
+            storage.query_cache.clear()
+            storage._reset_team_index()
+
+        queries = {
+            "resolve_team": lambda: storage.resolve_team(team),
+            "upcoming_fixtures": lambda: storage.get_upcoming_fixtures(),
+            "upcoming_fixture_lines": lambda: storage.get_upcoming_fixture_lines(team),
+            "recent_results": lambda: storage.get_recent_results(team),
+            "recent_result_lines": lambda: storage.get_recent_result_lines(team),
+            "league_standings": lambda: storage.get_league_standings(league),
+        }
+        for name, query in queries.items():
+            results[f"query_{name}_cold"] = _time_query(query, reps, clear)
+            results[f"query_{name}_warm"] = _time_query(query, reps)
+
+        # The same lookups answered by the in-memory fixture index, which
+        # bypasses the result cache: every call is computed
+        storage.use_fixture_index = True
+        started = time.perf_counter()
+        storage.fixture_index
+        record("fixture_index_build", time.perf_counter() - started, fixtures)
+        for name, query in queries.items():
+            if name != "resolve_team":
+                results[f"query_{name}_index"] = _time_query(query, reps)
+    finally:
+        storage.close()
+
+    results.update(measure_startup(work / "bench.db"))
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def _bench_size_isolated(fixtures: int, reps: int) -> dict:
+    """bench_size in a fresh process, in a temporary directory"""
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="football-bench-") as work_dir:
+        with ctx.Pool(1) as pool:
+            return pool.apply(bench_size, (fixtures, work_dir, reps))
+
+
+def _matching_stages(results: dict, baseline: dict):
+    """(size, stage, measured, expected) for the stages timed in both"""
+    for size, stages in results.items():
+        for stage, measured in stages.items():
+            expected = baseline.get(size, {}).get(stage)
+            if isinstance(measured, dict) and expected:
+                yield size, stage, measured, expected
+
+
+def host_speed(results: dict, baseline: dict) -> float:
+    """Median ratio of measured to baseline seconds, over the stages long
+    enough not to be noise: > 1 when this host is slower"""
+    ratios = [
+        measured["seconds"] / expected["seconds"]
+        for _, _, measured, expected in _matching_stages(results, baseline)
+        if expected["seconds"] > MIN_REGRESSION_SECONDS
+    ]
+    return statistics.median(ratios) if ratios else 1.0
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: float, scale: float = 1.0
+) -> list[str]:
+    """Timings in `results` slower than `baseline` (times `scale`) by more
+    than `tolerance`"""
+    regressions = []
+    for size, stage, measured, expected in _matching_stages(results, baseline):
+        seconds = expected["seconds"] * scale
+        noise = (
+            MIN_STAGE_REGRESSION_SECONDS
+            if "rows_per_sec" in measured
+            else MIN_REGRESSION_SECONDS
+        )
+        if (
+            measured["seconds"] > seconds * (1 + tolerance)
+            and measured["seconds"] - seconds > noise
+        ):
+            regressions.append(
+                f"{size} fixtures / {stage}: {measured['seconds']:.4f}s "
+                f"vs baseline {seconds:.4f}s"
+            )
+    return regressions
+
+
+def _print_table(results: dict):
+    for size, stages in results.items():
+        print(f"\n{int(size):,} fixtures (peak RSS {stages['peak_rss_mb']:.0f} MB)")
+        for stage, measured in stages.items():
+            if not isinstance(measured, dict):
+                continue
+            rate = measured.get("rows_per_sec") or measured.get("qps")
+            unit = "rows/s" if "rows_per_sec" in measured else "q/s"
+            print(
+                f"  {stage:<32} {measured['seconds'] * 1000:>10.2f} ms"
+                + (f"  {rate:>14,.0f} {unit}" if rate else "")
+            )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Football pipeline benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--reps", type=int, default=20, help="runs per query")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = {str(size): _bench_size_isolated(size, args.reps) for size in args.sizes}
+    _print_table(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    host = host_info()
+    if args.update_baseline:
+        baseline = (
+            json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        )
+        # Timings from different hosts don't belong in one baseline
+        if baseline.get("host") != host:
+            baseline = {"host": host}
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\nBaseline updated: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("\nNo baseline to compare with (run with --update-baseline)")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("host") != host:
+        scale = host_speed(results, baseline)
+        print(
+            f"\nBaseline measured on another host ({baseline.get('host')}); "
+            f"timings scaled by this host's speed ({scale:.2f}x), not failing"
+        )
+        for difference in compare(results, baseline, args.tolerance, scale):
+            print(f"SLOWER {difference}")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# benchmarks/startup.py
+"""Cold start time of a bot worker.
+
+    python -m benchmarks.startup data/football.db
+
+Each run starts a fresh interpreter that imports the bot, builds a
+FootballBot on the database (read-only, webhook mode, as the webhook
+workers do) and renders a first reply. Reports the median of each step
+and of the whole process wall time.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+
+def _child(db_path: str, subscriptions_path: str):
+    started = time.perf_counter()
+    sys.path.append(str(ROOT))
+    from apps.telegram_bot.bot import FootballBot
+
+    imported = time.perf_counter()
+    bot = FootballBot(
+        "0:startup-benchmark",
+        db_path=db_path,
+        read_only=True,
+        webhook=True,
+        subscriptions_path=subscriptions_path,
+    )
+    constructed = time.perf_counter()
+    asyncio.run(bot.renderer.render("fixtures", []))
+    replied = time.perf_counter()
+    bot.close()
+    print(
+        json.dumps(
+            {
+                "import": imported - started,
+                "construct": constructed - imported,
+                "first_reply": replied - constructed,
+                "heavy_modules": [
+                    m for m in ("pandas", "pyarrow", "numpy") if m in sys.modules
+                ],
+            }
+        )
+    )
+
+
+def measure_startup(db_path: str | Path, runs: int = 5) -> dict:
+    """Median seconds per startup step over `runs` fresh processes"""
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(runs):
+            started = time.perf_counter()
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.startup",
+                    "--child",
+                    str(db_path),
+                    str(Path(tmp) / f"subscriptions-{i}.db"),
+                ],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            sample = json.loads(output.strip().splitlines()[-1])
+            sample["process"] = time.perf_counter() - started
+            samples.append(sample)
+
+    steps = ("import", "construct", "first_reply", "process")
+    result = {
+        f"bot_startup_{step}": {
+            "seconds": statistics.median(sample[step] for sample in samples)
+        }
+        for step in steps
+    }
+    result["bot_startup_heavy_modules"] = samples[0]["heavy_modules"]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bot cold start benchmark")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    parser.add_argument("db_path", nargs="?", default="data/football.db")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+    if args.child:
+        _child(*args.child)
+        return
+    for step, measured in measure_startup(args.db_path, args.runs).items():
+        if isinstance(measured, dict):
+            print(f"{step:<28} {measured['seconds'] * 1000:>8.1f} ms")
+        else:
+            print(f"{step:<28} {measured}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/synthetic.py
+"""Synthetic API-Football `/fixtures` responses for benchmarks"""
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+STATUSES_PLAYED = ("FT", "FT", "FT", "AET", "PEN")
+STATUSES_LIVE = ("1H", "HT", "2H")
+
+
+def team_name(league_id: int, team: int) -> str:
+    return f"Synthetic {league_id} Club {team}"
+
+
+def generate_fixtures(
+    n: int,
+    league_id: int = 39,
+    season: int = 2023,
+    teams: int = 20,
+    first_id: int = 1,
+    now: Optional[datetime] = None,
+    seed: int = 0,
+) -> Iterator[dict]:
+    """Yield `n` fixtures shaped like the API's `response[]` items.
+
+    Fixtures are spread over a season around `now`: earlier ones are
+    finished with scores, a few around `now` are live, later ones are
+    not started. `now` defaults to the current hour (UTC), so queries for
+    upcoming fixtures have something to return.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc).replace(
+            tzinfo=None, minute=0, second=0, microsecond=0
+        )
+    rng = random.Random(seed * 1_000_003 + league_id * 101 + season)
+    start = now - timedelta(days=180)
+    step = timedelta(days=365) / max(n, 1)
+    for i in range(n):
+        date = start + step * i
+        home, away = rng.sample(range(1, teams + 1), 2)
+        if date < now - timedelta(hours=3):
+            status = rng.choice(STATUSES_PLAYED)
+            goals = {"home": rng.randint(0, 4), "away": rng.randint(0, 3)}
+        elif date < now:
+            status = rng.choice(STATUSES_LIVE)
+            goals = {"home": rng.randint(0, 2), "away": rng.randint(0, 2)}
+        else:
+            status = "NS"
+            goals = {"home": None, "away": None}
+        yield {
+            "fixture": {
+                "id": first_id + i,
+                "referee": f"Referee {rng.randint(1, 40)}",
+                "timezone": "UTC",
+                "date": date.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
+                "timestamp": int(date.timestamp()),
+                "venue": {
+                    "id": league_id * 100 + home,
+                    "name": f"Stadium {league_id}-{home}",
+                    "city": "City",
+                },
+                "status": {"long": status, "short": status, "elapsed": None},
+            },
+            "league": {
+                "id": league_id,
+                "name": f"League {league_id}",
+                "country": "Country",
+                "season": season,
+                "round": f"Regular Season - {i % 38 + 1}",
+            },
+            "teams": {
+                "home": {
+                    "id": league_id * 1000 + home,
+                    "name": team_name(league_id, home),
+                },
+                "away": {
+                    "id": league_id * 1000 + away,
+                    "name": team_name(league_id, away),
+                },
+            },
+            "goals": goals,
+            "score": {"halftime": goals, "fulltime": goals},
+        }
+
+
+def write_response(path: str | Path, fixtures: Iterator[dict], parameters: dict) -> int:
+    """Stream fixtures into a JSON file shaped like an API response.
+
+    Returns the number of fixtures written; memory use is independent of it.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"get": "fixtures", "parameters": ')
+        f.write(json.dumps(parameters))
+        f.write(', "errors": [], "response": [')
+        for fixture in fixtures:
+            if count:
+                f.write(",")
+            f.write(json.dumps(fixture))
+            count += 1
+        f.write(f'], "results": {count}}}')
+    return count
+
+
+def generate_dataset(
+    out_dir: str | Path,
+    fixtures: int,
+    leagues: int = 5,
+    seasons: int = 2,
+    teams: int = 20,
+    seed: int = 0,
+) -> list[tuple[int, int, Path]]:
+    """Write one raw response file per league/season, `fixtures` in total.
+
+    Returns (league_id, season, path) for every file written.
+    """
+    pairs = [(39 + l, 2022 + s) for l in range(leagues) for s in range(seasons)]
+    per_pair, extra = divmod(fixtures, len(pairs))
+    written = []
+    first_id = 1
+    for index, (league_id, season) in enumerate(pairs):
+        n = per_pair + (1 if index < extra else 0)
+        path = Path(out_dir) / f"fixtures_{league_id}_{season}.json"
+        write_response(
+            path,
+            generate_fixtures(
+                n, league_id, season, teams=teams, first_id=first_id, seed=seed
+            ),
+            {"league": str(league_id), "season": str(season)},
+        )
+        written.append((league_id, season, path))
+        first_id += n
+    return written
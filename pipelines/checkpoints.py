@@ -0,0 +1,109 @@
+# pipelines/checkpoints.py
+"""Stage checkpoints for resumable pipeline runs.
+
+Every unit of work (one league/season run) keeps a manifest of the stages
+it completed, each keyed by a content hash of the stage's input:
+
+    data/checkpoints/<unit>/manifest.json
+        fetch       -> SHA-256 of the raw response file
+        processing  input: raw hash  -> processed Parquet (+ its hash)
+        lake_write  input: processed hash
+        load        input: processed hash and database
+
+A stage whose recorded input hash equals the current one has nothing new
+to do and is skipped. A unit whose manifest is still "running" was
+interrupted, and the next run can resume from its last completed stage.
+Only the latest record per stage is kept.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTS_DIR = "data/checkpoints"
+
+
+def file_hash(path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class Checkpoint:
+    """Manifest of the completed stages of one unit of work"""
+
+    def __init__(self, unit: str, checkpoints_dir: str | Path = CHECKPOINTS_DIR):
+        self.unit = unit
+        self.dir = Path(checkpoints_dir) / unit
+        self.path = self.dir / "manifest.json"
+        try:
+            self.state = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            self.state = {"unit": unit, "status": "new", "stages": {}}
+        except ValueError as e:
+            # A manifest is replaced atomically, so this is outside damage
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            self.state = {"unit": unit, "status": "new", "stages": {}}
+
+    @property
+    def status(self) -> str:
+        """new, running (started but not finished: resumable) or complete"""
+        return self.state["status"]
+
+    def stage(self, name: str) -> Optional[dict]:
+        return self.state["stages"].get(name)
+
+    def completed(self, name: str, input_hash: str) -> Optional[dict]:
+        """The stage's record if it last completed on this same input"""
+        record = self.stage(name)
+        if record is not None and record.get("input") == input_hash:
+            return record
+        return None
+
+    def artifact(self, name: str) -> Path:
+        """Path for a file this unit keeps between runs"""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        return self.dir / name
+
+    def record(self, name: str, input_hash: Optional[str] = None, **outputs) -> dict:
+        """Mark a stage completed on `input_hash`; the unit is now running"""
+        record = {
+            "input": input_hash,
+            **outputs,
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.state["stages"][name] = record
+        self.state["status"] = "running"
+        self._save()
+        return record
+
+    def finish(self):
+        self.state["status"] = "complete"
+        self._save()
+
+    def reset(self):
+        """Forget every stage, so the next run starts from scratch"""
+        self.state = {"unit": self.unit, "status": "new", "stages": {}}
+        self._save()
+
+    def _save(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
@@ -0,0 +1,247 @@
+# pipelines/fixture_index.py
+"""Array-backed in-memory index of the fixtures table for the bot's reads.
+
+The whole fixtures table is read once into NumPy columns sorted by date
+(team, venue and status strings interned into small lookup arrays), with
+per-team offsets into the positions of that team's fixtures:
+
+    team_keys      sorted team IDs
+    team_offsets   team_keys[k]'s fixtures are
+                   team_positions[team_offsets[k]:team_offsets[k + 1]]
+
+Upcoming fixtures and recent results are then a binary search on the date
+column plus a short scan, without SQL planning or result conversion. The
+index is immutable; FootballDataStorage drops it when the data version
+moves and builds a new one on the next read. Fixtures without a date are
+left out.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Standings as returned by FootballDataStorage.get_league_standings
+STANDINGS_COLUMNS = (
+    "rank",
+    "team_name",
+    "points",
+    "games_played",
+    "won",
+    "drawn",
+    "lost",
+    "goals_for",
+    "goals_against",
+    "goal_diff",
+    "form",
+)
+STANDINGS_SQL = (
+    "rank",
+    "team_name",
+    "points",
+    "played",
+    "won",
+    "drawn",
+    "lost",
+    "goals_for",
+    "goals_against",
+    "goal_diff",
+    "form",
+)
+
+
+def _to_micros(when: datetime) -> int:
+    return (when - _EPOCH) // _MICROSECOND
+
+
+def _format_dates(micros: np.ndarray, unit: str) -> list[str]:
+    """ "YYYY-MM-DD" (unit "D") or "YYYY-MM-DD HH:MM" (unit "m") strings"""
+    formatted = np.datetime_as_string(micros.astype("datetime64[us]"), unit=unit)
+    return [text.replace("T", " ") for text in formatted.tolist()]
+
+
+class FixtureIndex:
+    """Fixtures and standings of one data version, answering the bot's
+    upcoming/recent/standings lookups from memory"""
+
+    def __init__(self, columns: dict, standings: list[tuple] = ()):
+        self.fixture_id = columns["fixture_id"].astype(np.int64)
+        self.date = columns["date"].astype(np.int64)  # microseconds since epoch
+        self.home_goals = columns["home_goals"].astype(np.int16)  # -1: no score
+        self.away_goals = columns["away_goals"].astype(np.int16)
+
+        # Interned strings: one lookup list, int32 codes per fixture
+        names, codes = np.unique(
+            np.concatenate(
+                [columns["home_team_name"], columns["away_team_name"]]
+            ).astype(str),
+            return_inverse=True,
+        )
+        self.names = names.tolist()
+        self.home_name, self.away_name = np.split(codes.astype(np.int32), 2)
+        venues, venue_codes = np.unique(
+            columns["venue_name"].astype(str), return_inverse=True
+        )
+        self.venues = [venue or None for venue in venues.tolist()]
+        self.venue = venue_codes.astype(np.int32)
+        statuses, status_codes = np.unique(
+            columns["status_short"].astype(str), return_inverse=True
+        )
+        self.statuses = {status: code for code, status in enumerate(statuses.tolist())}
+        self.status = status_codes.astype(np.int8)
+
+        # Per-team positions into the date-sorted columns, in date order
+        rows = len(self.fixture_id)
+        teams = np.concatenate([columns["home_team_id"], columns["away_team_id"]])
+        positions = np.concatenate([np.arange(rows), np.arange(rows)])
+        order = np.lexsort((positions, teams))
+        self.team_keys, counts = np.unique(teams[order], return_counts=True)
+        self.team_offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.team_positions = positions[order]
+
+        self.standings: dict[tuple[int, int], list[dict]] = {}
+        self.latest_season: dict[int, int] = {}
+        for league_id, season, *row in standings:
+            self.standings.setdefault((league_id, season), []).append(
+                dict(zip(STANDINGS_COLUMNS, row))
+            )
+            self.latest_season[league_id] = max(
+                season, self.latest_season.get(league_id, season)
+            )
+
+    @classmethod
+    def build(cls, conn) -> "FixtureIndex":
+        """Read the fixtures and standings tables through a DuckDB connection"""
+        columns = conn.execute("""
+            SELECT
+                fixture_id,
+                epoch_us(date) AS date,
+                coalesce(home_team_id, -1) AS home_team_id,
+                coalesce(away_team_id, -1) AS away_team_id,
+                coalesce(home_team_name, '') AS home_team_name,
+                coalesce(away_team_name, '') AS away_team_name,
+                coalesce(home_goals, -1) AS home_goals,
+                coalesce(away_goals, -1) AS away_goals,
+                coalesce(venue_name, '') AS venue_name,
+                coalesce(status_short, '') AS status_short
+            FROM fixtures
+            WHERE date IS NOT NULL
+            ORDER BY date, fixture_id
+        """).fetchnumpy()
+        # Columns without NULLs come back as masked arrays without a mask
+        columns = {name: np.asarray(values) for name, values in columns.items()}
+        standings = conn.execute(f"""
+            SELECT league_id, season, {", ".join(STANDINGS_SQL)}
+            FROM standings
+            ORDER BY league_id, season, rank
+        """).fetchall()
+        return cls(columns, standings)
+
+    def __len__(self):
+        return len(self.fixture_id)
+
+    def _team_rows(self, team_ids: list[int]) -> np.ndarray:
+        """Positions of the teams' fixtures, ascending (so in date order)"""
+        slices = []
+        for team_id in team_ids:
+            k = np.searchsorted(self.team_keys, team_id)
+            if k < len(self.team_keys) and self.team_keys[k] == team_id:
+                slices.append(
+                    self.team_positions[self.team_offsets[k] : self.team_offsets[k + 1]]
+                )
+        if len(slices) == 1:
+            return slices[0]
+        # Fixtures between two of the teams appear once
+        return np.unique(np.concatenate(slices)) if slices else np.empty(0, int)
+
+    def _scan(
+        self,
+        rows: Optional[np.ndarray],
+        lo: int,
+        hi: int,
+        status: str,
+        limit: int,
+        reverse: bool = False,
+    ) -> np.ndarray:
+        """Up to `limit` positions with `status` among rows[lo:hi] (all
+        fixtures if `rows` is None), nearest to `lo` or, reversed, to `hi`"""
+        code = self.statuses.get(status)
+        if code is None:
+            return np.empty(0, int)
+        found, count = [], 0
+        window = max(2 * limit, 16)
+        while lo < hi and count < limit:
+            if reverse:
+                start, stop = max(hi - window, lo), hi
+                hi = start
+            else:
+                start, stop = lo, min(lo + window, hi)
+                lo = stop
+            if rows is None:
+                matched = np.flatnonzero(self.status[start:stop] == code) + start
+            else:
+                chunk = rows[start:stop]
+                matched = chunk[self.status[chunk] == code]
+            if reverse:
+                matched = matched[::-1]
+            found.append(matched[: limit - count])
+            count += len(found[-1])
+            window *= 2
+        return np.concatenate(found) if found else np.empty(0, int)
+
+    def upcoming(
+        self, team_ids: Optional[list[int]], limit: int, now: datetime
+    ) -> list[dict]:
+        """Not started fixtures after `now` (naive UTC), soonest first"""
+        rows = None if team_ids is None else self._team_rows(team_ids)
+        dates = self.date if rows is None else self.date[rows]
+        lo = int(np.searchsorted(dates, _to_micros(now), side="right"))
+        found = self._scan(rows, lo, len(dates), "NS", limit)
+        # Gather whole columns at once; per-element numpy access is slow
+        return [
+            {
+                "fixture_id": fixture_id,
+                "home_team": self.names[home],
+                "away_team": self.names[away],
+                "date": date,
+                "venue_name": self.venues[venue],
+            }
+            for fixture_id, home, away, date, venue in zip(
+                self.fixture_id[found].tolist(),
+                self.home_name[found].tolist(),
+                self.away_name[found].tolist(),
+                _format_dates(self.date[found], "m"),
+                self.venue[found].tolist(),
+            )
+        ]
+
+    def recent(self, team_ids: Optional[list[int]], limit: int) -> list[dict]:
+        """Finished fixtures, most recent first"""
+        rows = None if team_ids is None else self._team_rows(team_ids)
+        hi = len(self.date) if rows is None else len(rows)
+        found = self._scan(rows, 0, hi, "FT", limit, reverse=True)
+        return [
+            {
+                "home_team": self.names[home],
+                "away_team": self.names[away],
+                "home_goals": None if home_goals < 0 else home_goals,
+                "away_goals": None if away_goals < 0 else away_goals,
+                "date": date,
+            }
+            for home, away, home_goals, away_goals, date in zip(
+                self.home_name[found].tolist(),
+                self.away_name[found].tolist(),
+                self.home_goals[found].tolist(),
+                self.away_goals[found].tolist(),
+                _format_dates(self.date[found], "D"),
+            )
+        ]
+
+    def league_standings(self, league_id: int, season: Optional[int]) -> list[dict]:
+        """League table, for the latest stored season unless one is given"""
+        if season is None:
+            season = self.latest_season.get(league_id)
+        return [dict(row) for row in self.standings.get((league_id, season), [])]
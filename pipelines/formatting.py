@@ -0,0 +1,39 @@
+# pipelines/formatting.py
+"""Text shown by the bot, shared by the handlers and the snapshot builder"""
+
+FIXTURES_HEADER = "🗓 Upcoming Fixtures:\n\n"
+RESULTS_HEADER = "📊 Recent Results:\n\n"
+STANDINGS_HEADER = "🏆 League Standings:\n\n"
+
+
+def format_fixture(f: dict) -> str:
+    return (
+        f"⚔ {f['home_team']} vs {f['away_team']}\n"
+        f"📅 {f['date']}\n"
+        f"🏟 {f.get('venue_name') or 'Unknown venue'}"
+    )
+
+
+def format_result(r: dict) -> str:
+    return (
+        f"⚽ {r['home_team']} {r['home_goals']}-{r['away_goals']} {r['away_team']}\n"
+        f"📅 {r['date']}"
+    )
+
+
+def format_standing(team: dict) -> str:
+    return (
+        f"{team['rank']}. {team['team_name']} - Pts: {team['points']} "
+        f"(GP: {team['games_played']}, W{team['won']} D{team['drawn']} "
+        f"L{team['lost']}, GD {team['goal_diff']:+d}) {team['form']}"
+    )
+
+
+def format_change_event(event: dict) -> str:
+    score = (
+        f"{event['home_team_name']} {event['home_goals']}-{event['away_goals']} "
+        f"{event['away_team_name']}"
+    )
+    if event["kind"] == "final":
+        return f"🏁 Full time: {score}"
+    return f"⚽ Score update: {score}"
@@ -0,0 +1,179 @@
+# pipelines/http_cache.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached response is served without asking the API again
+DEFAULT_TTLS = {
+    "fixtures": 15 * 60,
+    "leagues": 24 * 60 * 60,
+    "teams": 24 * 60 * 60,
+}
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    endpoint: str
+    blob: str
+    size: int
+    stored_at: float
+    accessed_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache for API responses.
+
+    Response bodies are stored once under the SHA-256 of their content in
+    `blobs/`, and every request key (endpoint + sorted query parameters) has
+    a small metadata file in `meta/` pointing at its blob together with the
+    ETag/Last-Modified validators. Entries are fresh for a per-endpoint TTL,
+    after which they are revalidated with a conditional request. When the
+    blobs exceed `max_bytes` the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path = "data/cache/http",
+        ttls: Optional[dict[str, float]] = None,
+        default_ttl: float = 15 * 60,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._meta_dir = self.cache_dir / "meta"
+        self._blob_dir = self.cache_dir / "blobs"
+        self._meta_dir.mkdir(parents=True, exist_ok=True)
+        self._blob_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Running size of the blobs, so that put doesn't stat all of them
+        self._total = self.total_bytes()
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict) -> str:
+        """Stable key for a request, independent of parameter order"""
+        query = urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+        return hashlib.sha256(f"{endpoint}?{query}".encode()).hexdigest()
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def is_fresh(self, entry: CacheEntry, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return now - entry.stored_at < self.ttl_for(entry.endpoint)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up an entry and mark it as recently used"""
+        with self._lock:
+            entry = self._read_meta(key)
+            if entry is None or not (self._blob_dir / entry.blob).exists():
+                return None
+            entry.accessed_at = time.time()
+            self._write_meta(entry)
+            return entry
+
+    def read_body(self, entry: CacheEntry) -> bytes:
+        return (self._blob_dir / entry.blob).read_bytes()
+
+    def put(
+        self,
+        key: str,
+        endpoint: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CacheEntry:
+        """Store a response body and its validators"""
+        blob = hashlib.sha256(body).hexdigest()
+        now = time.time()
+        entry = CacheEntry(
+            key=key,
+            endpoint=endpoint,
+            blob=blob,
+            size=len(body),
+            stored_at=now,
+            accessed_at=now,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        with self._lock:
+            blob_path = self._blob_dir / blob
+            if not blob_path.exists():
+                self._atomic_write(blob_path, body)
+                self._total += len(body)
+            self._write_meta(entry)
+            self._evict()
+        return entry
+
+    def refresh(self, entry: CacheEntry) -> CacheEntry:
+        """Restart the TTL of an entry the API confirmed unchanged (304)"""
+        entry.stored_at = entry.accessed_at = time.time()
+        with self._lock:
+            self._write_meta(entry)
+        return entry
+
+    def total_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self._blob_dir.iterdir())
+
+    def _evict(self):
+        """Drop least recently used entries until blobs fit into max_bytes"""
+        if self._total <= self.max_bytes:
+            return
+        # Re-count from disk: other processes may share the cache directory
+        self._total = total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        entries = sorted(
+            (e for e in map(self._read_meta, self._keys()) if e is not None),
+            key=lambda e: e.accessed_at,
+        )
+        refs = {}
+        for entry in entries:
+            refs[entry.blob] = refs.get(entry.blob, 0) + 1
+
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            (self._meta_dir / f"{entry.key}.json").unlink(missing_ok=True)
+            refs[entry.blob] -= 1
+            if refs[entry.blob] == 0:
+                (self._blob_dir / entry.blob).unlink(missing_ok=True)
+                total -= entry.size
+            logger.debug(f"Evicted cached response {entry.key[:12]}")
+        self._total = total
+
+    def _keys(self):
+        return [path.stem for path in self._meta_dir.glob("*.json")]
+
+    def _read_meta(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._meta_dir / f"{key}.json", "r") as f:
+                return CacheEntry(**json.load(f))
+        except (FileNotFoundError, ValueError, TypeError):
+            return None
+
+    def _write_meta(self, entry: CacheEntry):
+        self._atomic_write(
+            self._meta_dir / f"{entry.key}.json", json.dumps(entry.__dict__).encode()
+        )
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
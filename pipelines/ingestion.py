@@ -2,26 +2,388 @@ import requests
 import os
 from dotenv import load_dotenv
 import json
-from datetime import datetime
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from requests.adapters import HTTPAdapter
+
+from pipelines import metrics
+from pipelines.http_cache import ResponseCache
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-def fetch_fixtures(league_id: int, season: int, api_key: str):
-    url = (
-        f"https://v3.football.api-sports.io/fixtures?league={league_id}&season={season}"
-    )
+API_BASE_URL = os.getenv("API_BASE_URL", "https://v3.football.api-sports.io")
+REQUEST_TIMEOUT = 30
+# The /fixtures endpoint accepts at most this many IDs per `ids=` request
+MAX_IDS_PER_REQUEST = 20
+
+API_REQUESTS = metrics.counter(
+    "api_requests_total", "API-Football calls by endpoint and outcome"
+)
+API_SECONDS = metrics.histogram(
+    "api_request_seconds", "API-Football request latency, cache hits excluded"
+)
+API_BYTES = metrics.counter(
+    "api_response_bytes_total", "Response bytes received from API-Football"
+)
+
+
+class APIError(requests.exceptions.RequestException):
+    """API-Football answered (HTTP 200) with a non-empty `errors` object,
+    e.g. for a used-up quota or a bad key"""
+
+
+def _api_get(
+    endpoint: str,
+    params: dict,
+    api_key: str,
+    session: Optional[requests.Session] = None,
+    base_url: str = API_BASE_URL,
+    cache: Optional[ResponseCache] = None,
+) -> dict:
+    """GET an API-Football endpoint and return the decoded JSON body.
+
+    With a `cache`, fresh entries are served without a request and stale
+    ones are revalidated with If-None-Match / If-Modified-Since. Bodies
+    reporting `errors` raise APIError and are never cached.
+    """
     headers = {"x-apisports-key": api_key}
+    http = session or requests
+
+    entry = None
+    if cache is not None:
+        key = cache.make_key(endpoint, params)
+        entry = cache.get(key)
+        if entry and cache.is_fresh(entry):
+            API_REQUESTS.inc(endpoint=endpoint, outcome="cached")
+            return json.loads(cache.read_body(entry))
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
 
     try:
-        response = requests.get(url, headers=headers)
+        try:
+            with API_SECONDS.time(endpoint=endpoint):
+                response = http.get(
+                    f"{base_url}/{endpoint}",
+                    params=params,
+                    headers=headers,
+                    timeout=REQUEST_TIMEOUT,
+                )
+        except requests.exceptions.RequestException:
+            API_REQUESTS.inc(endpoint=endpoint, outcome="error")
+            raise
+        API_BYTES.inc(len(response.content), endpoint=endpoint)
+        if entry and response.status_code == 304:
+            API_REQUESTS.inc(endpoint=endpoint, outcome="not_modified")
+            cache.refresh(entry)
+            return json.loads(cache.read_body(entry))
+        if not response.ok:
+            API_REQUESTS.inc(endpoint=endpoint, outcome="error")
         response.raise_for_status()  # Raises HTTPError for 4XX/5XX status codes
-        return response.json()
+        payload = response.json()
+        if payload.get("errors"):
+            # Quota and auth failures come as 200s; don't cache them
+            API_REQUESTS.inc(endpoint=endpoint, outcome="api_error")
+            raise APIError(f"API-Football {endpoint} errors: {payload['errors']}")
+        API_REQUESTS.inc(endpoint=endpoint, outcome="ok")
+        if cache is not None:
+            cache.put(
+                key,
+                endpoint,
+                response.content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return payload
     except requests.exceptions.HTTPError as e:
         print(f"API Error: {e}")
         raise  # Re-raise the exception for the test to catch
 
 
+def fetch_fixtures(
+    league_id: int,
+    season: int,
+    api_key: str,
+    session: Optional[requests.Session] = None,
+    base_url: str = API_BASE_URL,
+    cache: Optional[ResponseCache] = None,
+):
+    return _api_get(
+        "fixtures",
+        {"league": league_id, "season": season},
+        api_key,
+        session=session,
+        base_url=base_url,
+        cache=cache,
+    )
+
+
+def fetch_fixtures_incremental(
+    league_id: int,
+    season: int,
+    api_key: str,
+    since: datetime,
+    open_fixture_ids: Iterable[int] = (),
+    lookahead_days: int = 7,
+    session: Optional[requests.Session] = None,
+    base_url: str = API_BASE_URL,
+    cache: Optional[ResponseCache] = None,
+) -> dict:
+    """Fetch only the fixtures that may have changed since the last run.
+
+    Requests the `from`/`to` date window between the previous watermark and
+    `lookahead_days` from now, plus any still-open fixtures dated before that
+    window (postponed or unfinished matches) by ID in batches of
+    MAX_IDS_PER_REQUEST. The merged payload has the same `response[]` shape
+    as a full fetch, so it can go straight through `process_fixtures`.
+    """
+    window_start = (since - timedelta(days=1)).date()
+    window_end = (datetime.now() + timedelta(days=lookahead_days)).date()
+    payload = _api_get(
+        "fixtures",
+        {
+            "league": league_id,
+            "season": season,
+            "from": window_start.isoformat(),
+            "to": window_end.isoformat(),
+        },
+        api_key,
+        session=session,
+        base_url=base_url,
+        cache=cache,
+    )
+    fixtures = {item["fixture"]["id"]: item for item in payload.get("response", [])}
+
+    stale_ids = [i for i in open_fixture_ids if i not in fixtures]
+    extra = fetch_fixtures_by_ids(
+        stale_ids, api_key, session=session, base_url=base_url, cache=cache
+    )
+    for item in extra["response"]:
+        fixtures[item["fixture"]["id"]] = item
+
+    payload["response"] = list(fixtures.values())
+    payload["results"] = len(fixtures)
+    return payload
+
+
+def fetch_fixtures_by_ids(
+    fixture_ids: Iterable[int],
+    api_key: str,
+    session: Optional[requests.Session] = None,
+    base_url: str = API_BASE_URL,
+    cache: Optional[ResponseCache] = None,
+) -> dict:
+    """Fetch specific fixtures with `ids=`, MAX_IDS_PER_REQUEST per request"""
+    fixture_ids = list(fixture_ids)
+    fixtures = []
+    for start in range(0, len(fixture_ids), MAX_IDS_PER_REQUEST):
+        chunk = fixture_ids[start : start + MAX_IDS_PER_REQUEST]
+        payload = _api_get(
+            "fixtures",
+            {"ids": "-".join(str(i) for i in chunk)},
+            api_key,
+            session=session,
+            base_url=base_url,
+            cache=cache,
+        )
+        fixtures.extend(payload.get("response", []))
+    return {"results": len(fixtures), "response": fixtures}
+
+
+def fetch_fixture_details(
+    fixture_ids: Iterable[int],
+    api_key: str,
+    max_concurrency: int = 4,
+    requests_per_minute: Optional[int] = None,
+    max_requests: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+    base_url: str = API_BASE_URL,
+) -> dict:
+    """Fetch events, lineups and statistics of fixtures, batched by ID.
+
+    `ids=` requests return each fixture with its details embedded, so the
+    IDs go out MAX_IDS_PER_REQUEST per request instead of one request per
+    fixture and endpoint. Batches run on up to `max_concurrency` threads,
+    within `requests_per_minute`, and at most `max_requests` are sent
+    (the daily quota left); IDs beyond that, or in a failed batch, are
+    returned under "pending" for a later run.
+    """
+    fixture_ids = list(fixture_ids)
+    batches = [
+        fixture_ids[start : start + MAX_IDS_PER_REQUEST]
+        for start in range(0, len(fixture_ids), MAX_IDS_PER_REQUEST)
+    ]
+    if max_requests is not None:
+        batches, deferred = batches[:max_requests], batches[max_requests:]
+    else:
+        deferred = []
+    if not batches:
+        return {"results": 0, "response": [], "pending": fixture_ids}
+
+    workers = max(1, min(max_concurrency, len(batches)))
+    limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+    own_session = session is None
+    session = session or create_session(pool_size=workers)
+
+    def fetch_batch(batch: list[int]) -> Optional[list]:
+        if limiter:
+            limiter.acquire()
+        try:
+            payload = _api_get(
+                "fixtures",
+                {"ids": "-".join(str(i) for i in batch)},
+                api_key,
+                session=session,
+                base_url=base_url,
+            )
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Fixture details batch of {len(batch)} failed: {e}")
+            return None
+        return payload.get("response", [])
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            responses = list(executor.map(fetch_batch, batches))
+    finally:
+        if own_session:
+            session.close()
+
+    fixtures = []
+    pending = [i for batch in deferred for i in batch]
+    for batch, response in zip(batches, responses):
+        if response is None:
+            pending.extend(batch)
+        else:
+            fixtures.extend(response)
+    return {"results": len(fixtures), "response": fixtures, "pending": pending}
+
+
+class RateLimiter:
+    """Thread-safe sliding-window limiter for the API's per-minute quota."""
+
+    def __init__(
+        self,
+        max_calls: int,
+        period: float = 60.0,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        if max_calls < 1:
+            raise ValueError("max_calls must be at least 1")
+        self.max_calls = max_calls
+        self.period = period
+        self._clock = clock
+        self._sleep = sleep
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until another request fits into the current window"""
+        with self._lock:
+            while True:
+                now = self._clock()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.max_calls:
+                    self._calls.append(now)
+                    return
+                self._sleep(self.period - (now - self._calls[0]))
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one (league, season) request in a batch."""
+
+    league_id: int
+    season: int
+    data: Optional[dict] = None
+    latency: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def create_session(pool_size: int = 10, api_key: Optional[str] = None):
+    """Create a keep-alive session whose connection pool fits `pool_size` workers"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if api_key:
+        session.headers["x-apisports-key"] = api_key
+    return session
+
+
+def fetch_fixtures_batch(
+    pairs: Iterable[tuple[int, int]],
+    api_key: str,
+    max_concurrency: int = 8,
+    requests_per_minute: Optional[int] = None,
+    base_url: str = API_BASE_URL,
+    session: Optional[requests.Session] = None,
+    cache: Optional[ResponseCache] = None,
+) -> list[FetchResult]:
+    """Fetch fixtures for many (league_id, season) pairs concurrently.
+
+    Requests share one pooled keep-alive session, run on at most
+    `max_concurrency` threads and, when `requests_per_minute` is set, never
+    exceed the API quota. Failures are reported per pair instead of aborting
+    the whole batch. Results come back in input order.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+
+    workers = max(1, min(max_concurrency, len(pairs)))
+    limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+    own_session = session is None
+    session = session or create_session(pool_size=workers)
+
+    def fetch_one(pair: tuple[int, int]) -> FetchResult:
+        league_id, season = pair
+        if limiter:
+            limiter.acquire()
+        started = time.perf_counter()
+        try:
+            data = fetch_fixtures(
+                league_id,
+                season,
+                api_key,
+                session=session,
+                base_url=base_url,
+                cache=cache,
+            )
+            result = FetchResult(league_id, season, data=data)
+        except requests.exceptions.RequestException as e:
+            result = FetchResult(league_id, season, error=str(e))
+        result.latency = time.perf_counter() - started
+        logger.info(
+            f"Fetched league={league_id} season={season} "
+            f"in {result.latency * 1000:.0f} ms"
+            + ("" if result.ok else f" (failed: {result.error})")
+        )
+        return result
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fetch_one, pairs))
+    finally:
+        if own_session:
+            session.close()
+
+
 def save_raw_data(data: dict, filename: str, save_dir: str = "data/raw"):
     """Saves raw API response to JSON."""
     os.makedirs(save_dir, exist_ok=True)
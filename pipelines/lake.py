@@ -0,0 +1,205 @@
+# pipelines/lake.py
+import logging
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+LAKE_DIR = "data/processed/fixtures"
+
+# Hive layout: <lake>/league_id=39/season=2023/part-<run>-<n>.parquet
+PARTITIONING = ds.partitioning(
+    pa.schema([("league_id", pa.int64()), ("season", pa.int16())]),
+    flavor="hive",
+)
+
+
+def _run_id() -> str:
+    """Time-ordered, collision-free component for data file names"""
+    return f"{datetime.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+
+def by_write_order(paths: Iterable) -> list:
+    """Data files (paths, or fragments with a `.path`), oldest first.
+
+    File names carry their write time (see _run_id; raw and processed
+    files are named by fetch time), so they order snapshots of the same
+    fixtures. Modification times do not survive a copy or restore.
+    """
+    return sorted(paths, key=lambda p: Path(getattr(p, "path", p)).name)
+
+
+def keep_latest(table: pa.Table, order_column: str = "snapshot_at") -> pa.Table:
+    """Keep only the row with the highest `order_column` per fixture_id"""
+    table = table.sort_by([("fixture_id", "ascending"), (order_column, "descending")])
+    ids = table.column("fixture_id").to_numpy()
+    keep = np.ones(len(ids), dtype=bool)
+    keep[1:] = ids[1:] != ids[:-1]
+    return table.filter(pa.array(keep)).drop_columns([order_column])
+
+
+def write_partitioned(
+    data: pa.Table | pd.DataFrame,
+    lake_dir: str | Path = LAKE_DIR,
+    replace: bool = False,
+) -> list[Path]:
+    """Write processed fixtures into the league_id/season partitioned lake.
+
+    Each call adds new files whose names sort by write time, so readers can
+    tell newer snapshots from older ones. With `replace=True` the partitions
+    being written are emptied first (used for full rebuilds).
+    Returns the paths of the files written.
+    """
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(
+        data, preserve_index=False
+    )
+    written = []
+    ds.write_dataset(
+        table,
+        str(lake_dir),
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"part-{_run_id()}-{{i}}.parquet",
+        existing_data_behavior="delete_matching" if replace else "overwrite_or_ignore",
+        file_visitor=lambda f: written.append(Path(f.path)),
+    )
+    return written
+
+
+def _partition_filter(league_id: Optional[int], season: Optional[int]):
+    expression = None
+    for name, value in (("league_id", league_id), ("season", season)):
+        if value is not None:
+            term = ds.field(name) == value
+            expression = term if expression is None else expression & term
+    return expression
+
+
+def open_dataset(lake_dir: str | Path = LAKE_DIR) -> ds.Dataset:
+    return ds.dataset(str(lake_dir), format="parquet", partitioning=PARTITIONING)
+
+
+def read_fixtures(
+    lake_dir: str | Path = LAKE_DIR,
+    league_id: Optional[int] = None,
+    season: Optional[int] = None,
+) -> pa.Table:
+    """Read the latest row per fixture, touching only the matching partitions"""
+    dataset = open_dataset(lake_dir)
+    fragments = by_write_order(
+        dataset.get_fragments(filter=_partition_filter(league_id, season))
+    )
+    if not fragments:
+        return dataset.schema.empty_table()
+
+    tables = []
+    for order, fragment in enumerate(fragments):
+        table = fragment.to_table(schema=dataset.schema)
+        tables.append(
+            table.append_column(
+                "snapshot_at", pa.array([order] * table.num_rows, type=pa.int64())
+            )
+        )
+    return keep_latest(pa.concat_tables(tables))
+
+
+def lake_has_fixtures(
+    data: pa.Table | pd.DataFrame,
+    lake_dir: str | Path = LAKE_DIR,
+    league_id: Optional[int] = None,
+    season: Optional[int] = None,
+) -> bool:
+    """Whether every fixture in `data` is in the lake's matching partitions"""
+    table = (
+        data
+        if isinstance(data, pa.Table)
+        else pa.Table.from_pandas(data, preserve_index=False)
+    )
+    if not table.num_rows:
+        return True
+    if not Path(lake_dir).exists():
+        return False
+    stored = read_fixtures(lake_dir, league_id, season).column("fixture_id")
+    return pc.all(pc.is_in(table.column("fixture_id"), value_set=stored)).as_py()
+
+
+def partition_glob(
+    lake_dir: str | Path = LAKE_DIR,
+    league_id: Optional[int] = None,
+    season: Optional[int] = None,
+) -> str:
+    """Glob over the matching partitions, for DuckDB's read_parquet()"""
+    league = "*" if league_id is None else league_id
+    season_part = "*" if season is None else season
+    return f"{Path(lake_dir)}/league_id={league}/season={season_part}/*.parquet"
+
+
+def new_partition_file(
+    lake_dir: str | Path, league_id: int, season: int
+) -> Path:
+    """Path for a new data file in a partition, sorting after existing ones.
+
+    Files in the lake hold no league_id/season columns; those come from
+    the directory names.
+    """
+    partition = Path(lake_dir) / f"league_id={league_id}" / f"season={season}"
+    partition.mkdir(parents=True, exist_ok=True)
+    return partition / f"part-{_run_id()}-0.parquet"
+
+
+def compact(
+    lake_dir: str | Path = LAKE_DIR,
+    league_id: Optional[int] = None,
+    season: Optional[int] = None,
+    min_files: int = 2,
+    target_file_bytes: int = 64 * 1024 * 1024,
+) -> int:
+    """Merge each partition's small files into one deduplicated file.
+
+    Partitions (optionally only those matching `league_id`/`season`) with at
+    least `min_files` files smaller than `target_file_bytes` are rewritten as
+    a single file that keeps the latest row per fixture. Returns the number
+    of partitions compacted.
+    """
+    league = "*" if league_id is None else league_id
+    season_part = "*" if season is None else season
+    compacted = 0
+    for partition in sorted(Path(lake_dir).glob(f"league_id={league}/season={season_part}")):
+        files = sorted(
+            f for f in partition.glob("*.parquet") if f.stat().st_size < target_file_bytes
+        )
+        if len(files) < min_files:
+            continue
+
+        tables = []
+        for order, path in enumerate(files):
+            table = pq.read_table(path, partitioning=None)
+            tables.append(
+                table.append_column(
+                    "snapshot_at", pa.array([order] * table.num_rows, type=pa.int64())
+                )
+            )
+        merged = keep_latest(pa.concat_tables(tables, promote_options="permissive"))
+
+        # The compacted file takes the newest name so it still sorts after
+        # anything older and before anything written later
+        target = files[-1]
+        tmp_path = partition / f".{target.name}.compacting"
+        pq.write_table(merged, tmp_path)
+        os.replace(tmp_path, target)
+        # Leftovers from a crash here are harmless: readers prefer the newest file
+        for path in files[:-1]:
+            path.unlink()
+        compacted += 1
+        logger.info(f"Compacted {len(files)} files in {partition}")
+    return compacted
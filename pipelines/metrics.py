@@ -0,0 +1,343 @@
+# pipelines/metrics.py
+"""In-process metrics for the pipeline and the bot.
+
+Counters and histograms live in a MetricsRegistry (the module-level
+REGISTRY by default) and are rendered in the Prometheus text format by
+`render()`. Values that already exist elsewhere, such as QueryCache hit
+counts, are exported through collectors read at render time instead of
+being copied. PipelineRun times the stages of one pipeline run and writes
+a JSON summary of it.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+RUNS_DIR = "data/runs"
+# Seconds; from a cached bot reply up to a full league fetch
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: Iterable[tuple[str, str]]) -> str:
+    if not key:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in key
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram:
+    """Distribution of observed values (typically seconds) per label combination"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [count per bucket..., sum, count]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the `with` block, also when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(_label_key(labels))
+        return state[-1] if state else 0
+
+    def total(self, **labels) -> float:
+        state = self._values.get(_label_key(labels))
+        return state[-2] if state else 0.0
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, state in self._values.items():
+                # Buckets are cumulative; +Inf holds every observation
+                counts = state[: len(self.buckets)] + [state[-1]]
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    le = (("le", _format_value(bound)),)
+                    samples.append((f"{self.name}_bucket", key + le, count))
+                samples.append((f"{self.name}_sum", key, state[-2]))
+                samples.append((f"{self.name}_count", key, state[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """Named counters, histograms and collectors of one process.
+
+    A collector is a callable returning (name, kind, help, labels, value)
+    tuples, evaluated on every render.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._collectors: list[Callable] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get_or_create(Counter, name, help)
+
+    def histogram(
+        self, name: str, help: str = "", buckets: tuple = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, buckets)
+
+    def register_collector(self, collector: Callable) -> Callable:
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+
+    def unregister_collector(self, collector: Callable):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families = {}
+        for metric in metrics:
+            families[metric.name] = (metric.kind, metric.help, metric.samples())
+        for collector in collectors:
+            try:
+                collected = list(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+                continue
+            for name, kind, help, labels, value in collected:
+                family = families.setdefault(name, (kind, help, []))
+                family[2].append((name, _label_key(labels), value))
+
+        lines = []
+        for name, (kind, help, samples) in sorted(families.items()):
+            if help:
+                lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, key, value in samples:
+                lines.append(
+                    f"{sample_name}{_format_labels(key)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, help: str = "") -> Counter:
+    return REGISTRY.counter(name, help)
+
+
+def histogram(name: str, help: str = "", buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.histogram(name, help, buckets)
+
+
+def cache_collector(name: str, cache) -> Callable:
+    """Collector exporting a QueryCache's stats() under cache="<name>".
+
+    `cache` may also be a callable returning the cache, for caches that are
+    replaced at runtime (e.g. with a SnapshotReader's storage), or None
+    while there is no cache yet.
+    """
+
+    def collect():
+        current = cache() if callable(cache) else cache
+        if current is None:
+            return []
+        stats = current.stats()
+        labels = {"cache": name}
+        return [
+            (
+                "cache_hits_total",
+                "counter",
+                "Cache lookups served",
+                labels,
+                stats["hits"],
+            ),
+            (
+                "cache_misses_total",
+                "counter",
+                "Cache lookups missed",
+                labels,
+                stats["misses"],
+            ),
+            ("cache_hit_ratio", "gauge", "Hits per lookup", labels, stats["hit_rate"]),
+            ("cache_entries", "gauge", "Entries held", labels, stats["entries"]),
+            (
+                "cache_evictions_total",
+                "counter",
+                "Entries evicted",
+                labels,
+                stats["evictions"],
+            ),
+        ]
+
+    return collect
+
+
+def serve_metrics(
+    port: int, host: str = "0.0.0.0", registry: MetricsRegistry = REGISTRY
+) -> ThreadingHTTPServer:
+    """Serve GET /metrics from a background thread (for long-polling bots,
+    which have no HTTP server of their own)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+class PipelineRun:
+    """Stage timings and counts of one pipeline run, as a JSON summary.
+
+    Each `with run.stage(name) as stage:` block records its duration in
+    the summary and in the pipeline_stage_seconds histogram; keys set on
+    `stage` (rows, bytes, inserted, ...) are added to the summary, and
+    `rows` also gives rows_per_sec. A stage entered again (e.g. once per
+    league in a batch) adds up its seconds and numeric counts.
+    """
+
+    def __init__(self, name: str, registry: MetricsRegistry = REGISTRY, **context):
+        self.name = name
+        self.context = context
+        self.started_at = datetime.now()
+        self.stages: dict[str, dict] = {}
+        self.status = "running"
+        self._started = time.perf_counter()
+        self._seconds = registry.histogram(
+            "pipeline_stage_seconds", "Duration of pipeline stages"
+        )
+
+    @contextmanager
+    def stage(self, name: str):
+        entry = {}
+        started = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            seconds = time.perf_counter() - started
+            self._seconds.observe(seconds, stage=name)
+            total = self.stages.setdefault(name, {"seconds": 0.0})
+            for key, value in entry.items():
+                if isinstance(value, (int, float)) and key in total:
+                    total[key] += value
+                else:
+                    total[key] = value
+            total["seconds"] = round(total["seconds"] + seconds, 6)
+            if total.get("rows") is not None:
+                total["rows_per_sec"] = (
+                    round(total["rows"] / total["seconds"], 1)
+                    if total["seconds"]
+                    else None
+                )
+
+    def finish(self, status: str = "ok") -> dict:
+        self.status = status
+        return self.summary()
+
+    def summary(self) -> dict:
+        return {
+            "run": self.name,
+            **self.context,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "seconds": round(time.perf_counter() - self._started, 6),
+            "stages": self.stages,
+        }
+
+    def write(self, runs_dir: str | Path = RUNS_DIR) -> Path:
+        """Write the summary to <runs_dir>/<name>_<started_at>.json"""
+        path = Path(runs_dir) / f"{self.name}_{self.started_at:%Y-%m-%d_%H%M%S}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), indent=2, default=str))
+        return path
@@ -0,0 +1,121 @@
+# pipelines/query_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class QueryCache:
+    """Thread-safe in-memory LRU cache for query results.
+
+    Entries expire `ttl` seconds after they were stored, and once more than
+    `max_entries` are held the least recently used one is dropped. Cached
+    values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60,
+        max_entries: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            item = self._entries.get(key, _MISSING)
+            if item is not _MISSING and self._clock() - item[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            if item is not _MISSING:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        """Cached value for `key`, computing and storing it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class DataVersionTracker:
+    """Clears a QueryCache whenever the stored data version moves.
+
+    `read_version` is polled at most once every `check_interval` seconds so
+    that a version bump made by another process (e.g. the pipeline loading
+    into the database the bot reads) is noticed without a query per lookup.
+    `on_change` is called after the cache is cleared, for other derived state.
+    """
+
+    def __init__(
+        self,
+        cache: QueryCache,
+        read_version: Callable[[], int],
+        check_interval: float = 5,
+        clock: Callable[[], float] = time.monotonic,
+        on_change: Optional[Callable[[], None]] = None,
+    ):
+        self.cache = cache
+        self._read_version = read_version
+        self._on_change = on_change
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.version: Optional[int] = None
+        self._checked_at = float("-inf")
+
+    def check(self, force: bool = False):
+        with self._lock:
+            now = self._clock()
+            if not force and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            version = self._read_version()
+            if version != self.version:
+                if self.version is not None:
+                    self.cache.clear()
+                    if self._on_change:
+                        self._on_change()
+                self.version = version
@@ -0,0 +1,238 @@
+# pipelines/scheduler.py
+import logging
+import math
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+import requests
+
+from pipelines.ingestion import API_BASE_URL, MAX_IDS_PER_REQUEST, fetch_fixtures_by_ids
+from pipelines.processing import fixture_details_to_tables, fixtures_to_table
+from pipelines.storage import FootballDataStorage, utcnow
+
+logger = logging.getLogger(__name__)
+
+
+class CountingSession(requests.Session):
+    """requests.Session that counts the HTTP requests actually sent"""
+
+    def __init__(self):
+        super().__init__()
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def request(self, *args, **kwargs):
+        with self._lock:
+            self._count += 1
+        return super().request(*args, **kwargs)
+
+    def take_count(self) -> int:
+        """Requests sent since the previous call"""
+        with self._lock:
+            count, self._count = self._count, 0
+        return count
+
+
+class QuotaBudget:
+    """Daily API request budget; API-Football quotas reset at 00:00 UTC."""
+
+    def __init__(self, daily_limit: int, clock: Callable[[], datetime] = utcnow):
+        self.daily_limit = daily_limit
+        self._clock = clock
+        self._day = clock().date()
+        self.used = 0
+
+    def _roll_over(self):
+        today = self._clock().date()
+        if today != self._day:
+            self._day, self.used = today, 0
+
+    def remaining(self) -> int:
+        self._roll_over()
+        return max(self.daily_limit - self.used, 0)
+
+    def spend(self, requests_made: int):
+        self._roll_over()
+        self.used += requests_made
+
+    def can_spend(self, requests_needed: int, reserve: int = 0) -> bool:
+        return self.remaining() - reserve >= requests_needed
+
+    def seconds_until_reset(self) -> float:
+        now = self._clock()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return (midnight - now).total_seconds()
+
+
+class PipelineScheduler:
+    """Long-running scheduler for the configured league/season pairs.
+
+    Every `refresh_interval` seconds each pair gets a cheap incremental
+    refresh through `refresh(league_id, season, session)`. While fixtures
+    are in their match window (see FootballDataStorage.get_live_fixtures)
+    only those fixtures are polled by ID every `live_interval` seconds and
+    upserted; outside match windows the scheduler sleeps until the next
+    kick-off or refresh. All requests are charged to a daily QuotaBudget:
+    live polling keeps `refresh_reserve` requests back for refreshes and
+    slows down when the budget would not last to the end of the window.
+    Intervals get +/- `jitter` random spread, and failures back off
+    exponentially up to `max_backoff` seconds. With `publish_dir`, a
+    database snapshot is published there whenever a tick changed the data
+    (see pipelines.snapshots).
+    """
+
+    def __init__(
+        self,
+        pairs: list[tuple[int, int]],
+        storage: FootballDataStorage,
+        api_key: str,
+        refresh: Callable[[int, int, requests.Session], object],
+        refresh_interval: float = 6 * 60 * 60,
+        live_interval: float = 60,
+        idle_interval: float = 30 * 60,
+        daily_quota: int = 100,
+        refresh_reserve: Optional[int] = None,
+        jitter: float = 0.1,
+        max_backoff: float = 30 * 60,
+        lead: timedelta = timedelta(minutes=15),
+        max_duration: timedelta = timedelta(hours=3),
+        base_url: str = API_BASE_URL,
+        clock: Callable[[], datetime] = utcnow,
+        rng: Optional[random.Random] = None,
+        publish_dir: Optional[str] = None,
+    ):
+        self.pairs = list(pairs)
+        self.league_ids = sorted({league_id for league_id, _ in self.pairs})
+        self.storage = storage
+        self.api_key = api_key
+        self.refresh = refresh
+        self.refresh_interval = refresh_interval
+        self.live_interval = live_interval
+        self.idle_interval = idle_interval
+        self.refresh_reserve = (
+            2 * len(self.pairs) if refresh_reserve is None else refresh_reserve
+        )
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.lead = lead
+        self.max_duration = max_duration
+        self.base_url = base_url
+        self.publish_dir = publish_dir
+        self._published_version = None
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self.session = CountingSession()
+        self.budget = QuotaBudget(daily_quota, clock)
+        now = clock()
+        self._next_refresh = {pair: now for pair in self.pairs}
+        self._next_live_poll = now
+        self.failures = 0
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * (1 + self._rng.uniform(-self.jitter, self.jitter))
+
+    def _charge(self):
+        self.budget.spend(self.session.take_count())
+
+    def _refresh_due(self, now: datetime):
+        for pair, due in self._next_refresh.items():
+            if due > now:
+                continue
+            if not self.budget.can_spend(1):
+                logger.warning("Daily API quota used up, postponing refreshes")
+                self._next_refresh[pair] = now + timedelta(
+                    seconds=self.budget.seconds_until_reset()
+                )
+                continue
+            league_id, season = pair
+            logger.info(f"Refreshing league={league_id} season={season}")
+            try:
+                self.refresh(league_id, season, self.session)
+            finally:
+                self._charge()
+            self._next_refresh[pair] = now + timedelta(
+                seconds=self._jittered(self.refresh_interval)
+            )
+
+    def _live_poll_interval(self, cost: int) -> float:
+        """Poll interval that keeps live polling within the remaining budget"""
+        affordable = (self.budget.remaining() - self.refresh_reserve) // cost
+        if affordable <= 0:
+            return self.budget.seconds_until_reset()
+        window = self.max_duration.total_seconds()
+        return max(self.live_interval, window / affordable)
+
+    def _poll_live(self, now: datetime, fixture_ids: list[int]):
+        cost = math.ceil(len(fixture_ids) / MAX_IDS_PER_REQUEST)
+        interval = self._live_poll_interval(cost)
+        if not self.budget.can_spend(cost, reserve=self.refresh_reserve):
+            logger.warning("Not enough API quota left for live polling")
+        else:
+            # Live data must not come from the response cache
+            try:
+                payload = fetch_fixtures_by_ids(
+                    fixture_ids,
+                    self.api_key,
+                    session=self.session,
+                    base_url=self.base_url,
+                )
+            finally:
+                self._charge()
+            if payload["response"]:
+                stats = self.storage.load_fixtures(
+                    fixtures_to_table(payload["response"]), mode="upsert"
+                )
+                logger.info(f"Live poll of {len(fixture_ids)} fixtures: {stats}")
+                # `ids=` responses embed events, lineups and statistics
+                self.storage.load_fixture_details(
+                    fixture_details_to_tables(payload["response"])
+                )
+        self._next_live_poll = now + timedelta(seconds=self._jittered(interval))
+
+    def _publish(self):
+        version = self.storage.get_data_version()
+        if version != self._published_version:
+            self.storage.publish_snapshot(self.publish_dir)
+            self._published_version = version
+
+    def tick(self) -> float:
+        """Run whatever is due and return the seconds to sleep until the next tick"""
+        now = self._clock()
+        try:
+            self._refresh_due(now)
+            live_ids = self.storage.get_live_fixtures(
+                now, self.lead, self.max_duration, self.league_ids
+            )
+            if live_ids and self._next_live_poll <= now:
+                self._poll_live(now, live_ids)
+            if self.publish_dir:
+                self._publish()
+        except Exception as e:
+            self.failures += 1
+            delay = min(self.max_backoff, self.live_interval * 2**self.failures)
+            delay = self._jittered(delay)
+            logger.error(f"Scheduler tick failed ({e}), retrying in {delay:.0f}s")
+            return delay
+        self.failures = 0
+
+        wake_at = [
+            min(self._next_refresh.values()),
+            now + timedelta(seconds=self.idle_interval),
+        ]
+        if live_ids:
+            wake_at.append(self._next_live_poll)
+        else:
+            kickoff = self.storage.get_next_kickoff(now, self.league_ids)
+            if kickoff is not None:
+                wake_at.append(kickoff - self.lead)
+        return max((min(wake_at) - now).total_seconds(), 1.0)
+
+    def run(self, stop: Optional[threading.Event] = None):
+        """Tick until `stop` is set"""
+        stop = stop or threading.Event()
+        logger.info(f"Scheduler started for {self.pairs}")
+        while not stop.is_set():
+            stop.wait(self.tick())
+        logger.info("Scheduler stopped")
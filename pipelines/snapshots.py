@@ -0,0 +1,234 @@
+# pipelines/snapshots.py
+"""Publish immutable database snapshots for readers, and hot-swap to them.
+
+DuckDB allows one writer per file, and no readers while it writes. In
+snapshot mode the pipeline keeps writing its own database (data/football.db)
+and, after a load, publishes a copy into SNAPSHOTS_DIR:
+
+    data/snapshots/football-<data version>-<timestamp>.db
+    data/snapshots/CURRENT      -> name of the latest snapshot
+
+Snapshot files are never written again once published, and CURRENT is
+replaced atomically, so readers (the bot) never share a file with the
+writer. SnapshotReader follows CURRENT and swaps to a new snapshot between
+queries; queries already running finish on the snapshot they started on.
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from pipelines.storage import FootballDataStorage
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOTS_DIR = "data/snapshots"
+POINTER_NAME = "CURRENT"
+# Published snapshots kept besides the current one
+KEEP_SNAPSHOTS = 2
+
+
+def _replace_atomically(path: Path, data: str):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def current_snapshot(snapshots_dir: str | Path = SNAPSHOTS_DIR) -> Optional[Path]:
+    """Path of the published snapshot, or None if nothing was published yet"""
+    try:
+        name = (Path(snapshots_dir) / POINTER_NAME).read_text().strip()
+    except FileNotFoundError:
+        return None
+    return Path(snapshots_dir) / name if name else None
+
+
+def publish_snapshot(
+    db_path: str | Path,
+    snapshots_dir: str | Path = SNAPSHOTS_DIR,
+    version: int = 0,
+    keep: int = KEEP_SNAPSHOTS,
+) -> Path:
+    """Copy a consistent (checkpointed or closed) database file into
+    `snapshots_dir` and make it the current snapshot.
+
+    The copy is written under a temporary name and renamed, then CURRENT
+    is replaced, so readers see either the old or the new snapshot, never
+    a partial one. Older snapshots beyond `keep` are removed.
+    """
+    snapshots_dir = Path(snapshots_dir)
+    snapshots_dir.mkdir(parents=True, exist_ok=True)
+    name = f"football-{version}-{datetime.now():%Y%m%d%H%M%S%f}.db"
+    tmp = snapshots_dir / f".{name}.tmp"
+    started = time.perf_counter()
+    shutil.copyfile(db_path, tmp)
+    os.replace(tmp, snapshots_dir / name)
+    _replace_atomically(snapshots_dir / POINTER_NAME, name)
+    logger.info(
+        f"Published snapshot {name} (data version {version}) "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    _prune(snapshots_dir, name, keep)
+    return snapshots_dir / name
+
+
+def _prune(snapshots_dir: Path, current: str, keep: int):
+    published = sorted(
+        (p for p in snapshots_dir.glob("football-*.db") if p.name != current),
+        key=lambda p: p.stat().st_mtime_ns,
+    )
+    for path in published[: max(len(published) - keep, 0)]:
+        try:
+            path.unlink()
+        except OSError as e:
+            # Still open by a reader on a platform that forbids unlinking it
+            logger.debug(f"Could not remove old snapshot {path.name}: {e}")
+
+
+class SnapshotReader:
+    """Read-only FootballDataStorage that follows the published snapshot.
+
+    Every storage method called on the reader runs on the snapshot that is
+    current when the call starts. CURRENT is checked at most every
+    `check_interval` seconds; a new snapshot is opened (and its team index
+    warmed) by one caller while the others keep using the previous one,
+    then swapped in. The previous snapshot is closed once its last
+    in-flight query has returned. `storage_options` are passed on to the
+    FootballDataStorage of each snapshot.
+
+    The reader may start before anything is published: until the first
+    snapshot appears, CURRENT is checked on every call and queries raise
+    FileNotFoundError.
+    """
+
+    def __init__(
+        self,
+        snapshots_dir: str | Path = SNAPSHOTS_DIR,
+        check_interval: float = 1,
+        open_storage: Optional[Callable[[Path], FootballDataStorage]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        storage_options: Optional[dict] = None,
+    ):
+        self.snapshots_dir = Path(snapshots_dir)
+        self.check_interval = check_interval
+        self._open_storage = open_storage or (
+            lambda path: FootballDataStorage(
+                db_path=str(path), read_only=True, **(storage_options or {})
+            )
+        )
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._leases: dict[int, int] = {}
+        self._retired: list[FootballDataStorage] = []
+        self._closed = False
+
+        self.path: Optional[Path] = None
+        self._storage: Optional[FootballDataStorage] = None
+        self._checked_at = clock()
+        path = current_snapshot(self.snapshots_dir)
+        if path is None:
+            logger.warning(f"No snapshot published in {self.snapshots_dir} yet")
+        else:
+            self.path = path
+            self._storage = self._open(path)
+
+    def _open(self, path: Path) -> FootballDataStorage:
+        storage = self._open_storage(path)
+        # Build these before the first query needs them
+        storage.team_index
+        if storage.use_fixture_index:
+            storage.fixture_index
+        return storage
+
+    def refresh(self, force: bool = False) -> bool:
+        """Swap to the published snapshot if it changed; True if swapped"""
+        now = self._clock()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+        # One caller opens the new snapshot; the others carry on meanwhile
+        if not self._swap_lock.acquire(blocking=force):
+            return False
+        try:
+            self._checked_at = now
+            path = current_snapshot(self.snapshots_dir)
+            if path is None or path == self.path:
+                return False
+            try:
+                storage = self._open(path)
+            except Exception as e:
+                logger.error(f"Could not open snapshot {path.name}: {e}")
+                return False
+            with self._lock:
+                old, self._storage, self.path = self._storage, storage, path
+                if old is not None:
+                    self._retired.append(old)
+            self._close_idle()
+            logger.info(f"Switched to snapshot {path.name}")
+            return True
+        finally:
+            self._swap_lock.release()
+
+    def _close_idle(self):
+        with self._lock:
+            idle = [s for s in self._retired if not self._leases.get(id(s))]
+            self._retired = [s for s in self._retired if self._leases.get(id(s))]
+        for storage in idle:
+            storage.close()
+
+    @contextmanager
+    def lease(self):
+        """The current snapshot's storage, kept open until the block exits"""
+        self.refresh(force=self._storage is None)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SnapshotReader is closed")
+            storage = self._storage
+            if storage is None:
+                raise FileNotFoundError(
+                    f"No snapshot published in {self.snapshots_dir} yet"
+                )
+            self._leases[id(storage)] = self._leases.get(id(storage), 0) + 1
+        try:
+            yield storage
+        finally:
+            with self._lock:
+                self._leases[id(storage)] -= 1
+                if not self._leases[id(storage)]:
+                    del self._leases[id(storage)]
+                retired = storage in self._retired
+            if retired:
+                self._close_idle()
+
+    @property
+    def query_cache(self):
+        storage = self._storage
+        return storage.query_cache if storage is not None else None
+
+    def __getattr__(self, name):
+        if not callable(getattr(FootballDataStorage, name, None)):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            with self.lease() as storage:
+                return getattr(storage, name)(*args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            storages = [self._storage, *self._retired]
+            self._retired = []
+        for storage in filter(None, storages):
+            storage.close()
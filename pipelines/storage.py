@@ -1,14 +1,124 @@
 # pipelines/storage.py
+from __future__ import annotations
+
 import duckdb
-import pandas as pd
+import glob
 from pathlib import Path
 import logging
-from typing import Optional
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional
+
+from pipelines import metrics
+from pipelines.formatting import format_fixture, format_result
+from pipelines.query_cache import DataVersionTracker, QueryCache
+from pipelines.teams import TeamIndex, normalize
+
+# pandas/pyarrow are only needed to load data, and numpy only for the
+# optional fixture index; they are imported where used so that read-only
+# processes (the bot) start without them
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+    from pipelines.fixture_index import FixtureIndex
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+FIXTURES_LOADED = metrics.counter(
+    "fixtures_loaded_total", "Fixture rows merged, by result"
+)
+MERGE_SECONDS = metrics.histogram(
+    "storage_merge_seconds", "Duration of fixture merges, derived tables included"
+)
+QUERY_SECONDS = metrics.histogram(
+    "storage_query_seconds", "Database time of read queries not served from cache"
+)
+
+# Fixture statuses that can no longer change (API-Football `status.short`)
+FINAL_STATUSES = ("FT", "AET", "PEN", "CANC", "ABD", "AWD", "WO")
+# Final statuses of matches that were actually played and count in a table
+PLAYED_STATUSES = ("FT", "AET", "PEN")
+# Scheduled, and in-progress (incl. breaks and interruptions) statuses
+NOT_STARTED_STATUSES = ("TBD", "NS")
+LIVE_STATUSES = ("1H", "HT", "2H", "ET", "BT", "P", "SUSP", "INT", "LIVE")
+
+FIXTURE_COLUMNS = (
+    "fixture_id, league_id, league_name, season, "
+    "home_team_id, home_team_name, away_team_id, away_team_name, "
+    "home_goals, away_goals, date, "
+    "venue_name, referee, status_short"
+)
+
+# Entries kept per team in team_snapshots. Upcoming fixtures drop out as
+# kick-off passes, so more are kept than the bot shows.
+SNAPSHOT_SIZES = {"upcoming": 20, "results": 10}
+
+
+# Days change events are kept for notification consumers to catch up
+CHANGE_EVENT_RETENTION_DAYS = 7
+
+# Load modes: keep stored rows as they are, or update the ones that changed
+LOAD_MODES = ("ignore", "upsert")
+
+# Columns compared and overwritten when a stored fixture is upserted
+MERGE_COLUMNS = [
+    column.strip()
+    for column in FIXTURE_COLUMNS.split(",")
+    if column.strip() != "fixture_id"
+]
+
+
+def utcnow() -> datetime:
+    """Naive UTC timestamp, comparable with the stored fixture dates"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _connect(db_path: str, read_only: bool = False) -> duckdb.DuckDBPyConnection:
+    """Connection (and cursors) whose session time zone is UTC.
+
+    Fixture dates are naive UTC TIMESTAMPs, but DuckDB converts
+    timezone-aware input and CURRENT_TIMESTAMP through the TimeZone
+    setting, which defaults to the host's local zone.
+    """
+    conn = duckdb.connect(db_path, read_only=read_only)
+    # GLOBAL: cursors are separate sessions and don't inherit a plain SET
+    conn.execute("SET GLOBAL TimeZone = 'UTC'")
+    return conn
+
+
+def _int_list(values) -> str:
+    """Comma-separated integer literals for an IN (...) list"""
+    return ", ".join(str(int(value)) for value in values)
+
+
+@dataclass
+class LoadStats:
+    """Row counts of one load into the fixtures table."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def loaded(self) -> int:
+        return self.inserted + self.updated
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def __str__(self):
+        return (
+            f"{self.inserted} inserted, {self.updated} updated, "
+            f"{self.unchanged} unchanged"
+        )
+
 
 class FootballDataStorage:
     required_columns = {
@@ -24,14 +134,85 @@ class FootballDataStorage:
         "away_goals",
         "date",
     }
-    def __init__(self, db_path: str = "data/football.db"):
+    def __init__(
+        self,
+        db_path: str = "data/football.db",
+        cache_ttl: float = 60,
+        cache_size: int = 512,
+        version_check_interval: float = 5,
+        read_only: bool = False,
+        fixture_index: bool = False,
+    ):
+        """Open (and create/migrate) the database.
+
+        With `read_only=True` an existing database written by the pipeline is
+        opened without schema setup or backfills, so several bot processes
+        can share one file; DuckDB does not allow a writer at the same time.
+        With `fixture_index=True` upcoming fixtures, recent results and
+        standings are answered from an in-memory FixtureIndex (numpy) instead
+        of SQL.
+        """
         self.db_path = Path(db_path)
-        self.conn = self._setup_database()
+        self.read_only = read_only
+        if read_only:
+            self.conn = _connect(str(self.db_path), read_only=True)
+        else:
+            self.conn = self._setup_database()
+        self._local = threading.local()
+        self._cursors = []
+        self._cursors_lock = threading.Lock()
+        self._team_index = None
+        self.use_fixture_index = fixture_index
+        self._fixture_index = None
+        # Bot read paths are served from memory until the data version moves
+        self.query_cache = QueryCache(ttl=cache_ttl, max_entries=cache_size)
+        self._version_tracker = DataVersionTracker(
+            self.query_cache,
+            self.get_data_version,
+            version_check_interval,
+            on_change=self._reset_team_index,
+        )
+        if not read_only:
+            self._run_backfills()
+
+    def _run_backfills(self):
+        """Fill the derived tables of databases created before they existed.
+
+        Each backfill runs once per database and is then recorded in
+        schema_migrations; a table that is merely empty (e.g. no standings
+        while no fixture was played yet) is not backfilled on every open.
+        """
+        applied = {
+            name
+            for (name,) in self.conn.execute(
+                "SELECT name FROM schema_migrations"
+            ).fetchall()
+        }
+        backfills = {
+            "backfill_standings": ("standings", self.rebuild_standings),
+            "backfill_teams": ("teams", lambda: self._refresh_teams("fixtures")),
+            "backfill_team_snapshots": (
+                "team_snapshots",
+                self._refresh_team_snapshots,
+            ),
+        }
+        for name, (table, backfill) in backfills.items():
+            if name in applied:
+                continue
+            is_empty = not self.conn.execute(
+                f"SELECT 1 FROM {table} LIMIT 1"
+            ).fetchone()
+            if is_empty and self.get_fixture_count():
+                logger.info(f"Backfilling {table}")
+                backfill()
+            self.conn.execute(
+                "INSERT INTO schema_migrations VALUES (?, CURRENT_TIMESTAMP)", [name]
+            )
 
     def _setup_database(self) -> duckdb.DuckDBPyConnection:
         """Initialize database with schema matching processed data"""
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        conn = duckdb.connect(str(self.db_path))
+        conn = _connect(str(self.db_path))
 
         conn.execute("""
         CREATE TABLE IF NOT EXISTS fixtures (
@@ -53,11 +234,163 @@ class FootballDataStorage:
         )
         """)
 
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingestion_state (
+            league_id INTEGER,
+            season INTEGER,
+            last_fetched_at TIMESTAMP,
+            PRIMARY KEY (league_id, season)
+        )
+        """)
+
         # Create indexes for performance
         conn.execute("""
         CREATE INDEX IF NOT EXISTS idx_fixture_date ON fixtures(date);
         CREATE INDEX IF NOT EXISTS idx_league ON fixtures(league_id);
         CREATE INDEX IF NOT EXISTS idx_teams ON fixtures(home_team_id, away_team_id);
+        CREATE INDEX IF NOT EXISTS idx_home_team ON fixtures(home_team_id);
+        CREATE INDEX IF NOT EXISTS idx_away_team ON fixtures(away_team_id);
+        """)
+
+        # Team dimension used to resolve user input to team IDs
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS teams (
+            team_id INTEGER PRIMARY KEY,
+            team_name VARCHAR
+        )
+        """)
+
+        # Bumped by every load that changes fixtures; read paths use it to
+        # invalidate cached query results
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY,
+            version BIGINT,
+            updated_at TIMESTAMP
+        )
+        """)
+        conn.execute(
+            "INSERT OR IGNORE INTO data_version VALUES (1, 0, CURRENT_TIMESTAMP)"
+        )
+
+        # One-off migrations (backfills) already applied to this database
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name VARCHAR PRIMARY KEY,
+            applied_at TIMESTAMP
+        )
+        """)
+
+        # Random ID of this database file, so that state kept outside of it
+        # (pipeline checkpoints) can tell a recreated database from this one
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS database_info (
+            id INTEGER PRIMARY KEY,
+            database_id VARCHAR,
+            created_at TIMESTAMP
+        )
+        """)
+        conn.execute(
+            "INSERT OR IGNORE INTO database_info "
+            "VALUES (1, uuid()::VARCHAR, CURRENT_TIMESTAMP)"
+        )
+
+        # Bot answers per team, already formatted (see _refresh_team_snapshots)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS team_snapshots (
+            team_id INTEGER PRIMARY KEY,
+            upcoming STRUCT(fixture_id BIGINT, date TIMESTAMP, line VARCHAR)[],
+            results STRUCT(fixture_id BIGINT, date TIMESTAMP, line VARCHAR)[],
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+
+        # Score changes and final whistles detected by loads, for notifications
+        conn.execute("""
+        CREATE SEQUENCE IF NOT EXISTS change_event_seq;
+        CREATE TABLE IF NOT EXISTS change_events (
+            event_id BIGINT PRIMARY KEY DEFAULT nextval('change_event_seq'),
+            kind VARCHAR,
+            fixture_id BIGINT,
+            league_id INTEGER,
+            home_team_id INTEGER,
+            home_team_name VARCHAR,
+            away_team_id INTEGER,
+            away_team_name VARCHAR,
+            home_goals INTEGER,
+            away_goals INTEGER,
+            old_home_goals INTEGER,
+            old_away_goals INTEGER,
+            status_short VARCHAR,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+
+        # League tables, kept up to date by every load (see _refresh_standings)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS standings (
+            league_id INTEGER,
+            season INTEGER,
+            rank INTEGER,
+            team_id INTEGER,
+            team_name VARCHAR,
+            played INTEGER,
+            won INTEGER,
+            drawn INTEGER,
+            lost INTEGER,
+            goals_for INTEGER,
+            goals_against INTEGER,
+            goal_diff INTEGER,
+            points INTEGER,
+            form VARCHAR,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (league_id, season, team_id)
+        )
+        """)
+
+        # Match details from `ids=` requests (see load_fixture_details), and
+        # the status each fixture had when its details were last fetched
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS fixture_events (
+            fixture_id BIGINT,
+            seq SMALLINT,
+            elapsed SMALLINT,
+            extra SMALLINT,
+            team_id INTEGER,
+            player_id BIGINT,
+            player_name VARCHAR,
+            assist_id BIGINT,
+            assist_name VARCHAR,
+            type VARCHAR,
+            detail VARCHAR,
+            comments VARCHAR,
+            PRIMARY KEY (fixture_id, seq)
+        );
+        CREATE TABLE IF NOT EXISTS fixture_lineups (
+            fixture_id BIGINT,
+            team_id INTEGER,
+            slot SMALLINT,
+            formation VARCHAR,
+            starter BOOLEAN,
+            player_id BIGINT,
+            player_name VARCHAR,
+            number SMALLINT,
+            position VARCHAR,
+            grid VARCHAR,
+            PRIMARY KEY (fixture_id, team_id, slot)
+        );
+        CREATE TABLE IF NOT EXISTS fixture_statistics (
+            fixture_id BIGINT,
+            team_id INTEGER,
+            stat_type VARCHAR,
+            value DOUBLE,
+            PRIMARY KEY (fixture_id, team_id, stat_type)
+        );
+        CREATE TABLE IF NOT EXISTS fixture_details_state (
+            fixture_id BIGINT PRIMARY KEY,
+            status_short VARCHAR,
+            fetched_at TIMESTAMP
+        )
         """)
 
         logger.info(f"Database initialized at {self.db_path.absolute()}")
@@ -66,8 +399,17 @@ class FootballDataStorage:
     def _validate_dataframe(self, df: pd.DataFrame) -> bool:
         """Validate DataFrame structure before loading"""
         return self.required_columns.issubset(df.columns)
-    def load_parquet_file(self, file_path: Path) -> int:
-        """Load a single parquet file into database"""
+
+    def load_parquet_file(self, file_path: Path, mode: str = "upsert") -> int:
+        """Load a single parquet file into database.
+
+        `mode="upsert"` (the default) updates the fixtures that changed
+        since they were stored (see merge_fixtures); `mode="ignore"` leaves
+        stored fixtures untouched. Returns the number of rows inserted or
+        updated.
+        """
+        import pandas as pd
+
         try:
             df = pd.read_parquet(file_path)
 
@@ -81,32 +423,269 @@ class FootballDataStorage:
             # Ensure proper datetime conversion
             df["date"] = pd.to_datetime(df["date"])
 
-            result = self.conn.execute("""
-                INSERT OR IGNORE INTO fixtures 
-                SELECT 
-                    fixture_id, league_id, league_name, season,
-                    home_team_id, home_team_name, away_team_id, away_team_name,
-                    home_goals, away_goals, date,
-                    venue_name, referee, status_short
-                FROM df
-            """)
-
-            inserted = result.rowcount
-            logger.info(f"Loaded {inserted} records from {file_path.name}")
-            return inserted
+            stats = self._insert_fixtures(df, mode=mode)
+            logger.info(
+                f"Loaded {stats.loaded} records from {file_path.name} ({stats})"
+            )
+            return stats.loaded
 
         except Exception as e:
             logger.error(f"Failed to load {file_path}: {str(e)}")
             return 0
 
-    def load_processed_data(self, processed_dir: str = "data/processed") -> int:
-        """Load all parquet files from processed directory"""
+    def _merge_fixtures(
+        self, select_sql: str, params=None, mode: str = "upsert"
+    ) -> LoadStats:
+        """Stage incoming rows and merge them into `fixtures` in one transaction.
+
+        Incoming rows are cast to the table's types in a temp table, compared
+        with the stored rows, and only new (and, in upsert mode, changed) rows
+        are written with a single INSERT ... ON CONFLICT DO UPDATE. The rows
+        written are kept in the `fixture_changes` temp table, with the
+        previous score and status, until the next load.
+        """
+        if mode not in LOAD_MODES:
+            raise ValueError(
+                f"Unknown load mode {mode!r}, expected one of {LOAD_MODES}"
+            )
+
+        changed = " OR ".join(
+            f"s.{column} IS DISTINCT FROM f.{column}" for column in MERGE_COLUMNS
+        )
+        if mode == "ignore":
+            changed = "FALSE"
+        updates = ", ".join(f"{column} = excluded.{column}" for column in MERGE_COLUMNS)
+
+        started = time.perf_counter()
+        self.conn.begin()
+        try:
+            self.conn.execute(f"""
+                CREATE OR REPLACE TEMP TABLE staged_fixtures AS
+                SELECT {FIXTURE_COLUMNS} FROM fixtures LIMIT 0
+            """)
+            staged = self.conn.execute(
+                f"INSERT INTO staged_fixtures ({FIXTURE_COLUMNS}) {select_sql}",
+                params or [],
+            ).fetchone()[0]
+            self.conn.execute(f"""
+                CREATE OR REPLACE TEMP TABLE fixture_changes AS
+                SELECT
+                    s.*,
+                    f.fixture_id IS NULL AS is_new,
+                    f.home_goals AS old_home_goals,
+                    f.away_goals AS old_away_goals,
+                    f.status_short AS old_status_short
+                FROM staged_fixtures s
+                LEFT JOIN fixtures f USING (fixture_id)
+                WHERE f.fixture_id IS NULL OR {changed}
+            """)
+            inserted, updated = self.conn.execute("""
+                SELECT
+                    count(*) FILTER (WHERE is_new),
+                    count(*) FILTER (WHERE NOT is_new)
+                FROM fixture_changes
+            """).fetchone()
+            self.conn.execute(f"""
+                INSERT INTO fixtures ({FIXTURE_COLUMNS}, processed_at)
+                SELECT {FIXTURE_COLUMNS}, CURRENT_TIMESTAMP FROM fixture_changes
+                ON CONFLICT (fixture_id) DO UPDATE SET
+                    {updates}, processed_at = excluded.processed_at
+            """)
+            if inserted or updated:
+                self._refresh_standings(
+                    "SELECT DISTINCT league_id, season FROM fixture_changes"
+                )
+                self._refresh_teams("fixture_changes")
+                self._refresh_team_snapshots("fixture_changes")
+                self._record_change_events()
+                self._bump_data_version()
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        if inserted or updated:
+            self._version_tracker.check(force=True)
+
+        stats = LoadStats(
+            inserted=inserted, updated=updated, unchanged=staged - inserted - updated
+        )
+        MERGE_SECONDS.observe(time.perf_counter() - started)
+        FIXTURES_LOADED.inc(stats.inserted, result="inserted")
+        FIXTURES_LOADED.inc(stats.updated, result="updated")
+        FIXTURES_LOADED.inc(stats.unchanged, result="unchanged")
+        return stats
+
+    def _insert_fixtures(self, source, mode: str = "upsert") -> LoadStats:
+        """Merge fixtures from a DataFrame or Arrow table/dataset; of a
+        fixture that appears more than once, the last row wins"""
+        import pyarrow.dataset as ds
+
+        from pipelines.processing import drop_duplicate_fixtures
+
+        if isinstance(source, ds.Dataset):
+            source = source.to_table()
+        self.conn.register("incoming_fixtures", drop_duplicate_fixtures(source))
+        try:
+            return self._merge_fixtures(
+                f"SELECT {FIXTURE_COLUMNS} FROM incoming_fixtures", mode=mode
+            )
+        finally:
+            self.conn.unregister("incoming_fixtures")
+
+    def load_fixtures(
+        self, data: pd.DataFrame | pa.Table, mode: str = "upsert"
+    ) -> LoadStats:
+        """Load already processed fixtures held in memory, updating the
+        stored ones that changed unless `mode="ignore"`"""
+        columns = getattr(data, "column_names", None)
+        if columns is None:  # pandas DataFrame
+            columns = data.columns
+        missing = self.required_columns - set(columns)
+        if missing:
+            raise ValueError(f"Processed fixtures missing columns: {missing}")
+        stats = self._insert_fixtures(data, mode=mode)
+        logger.info(f"Loaded {stats.loaded} records ({stats})")
+        return stats
+
+    def merge_fixtures(self, data: pd.DataFrame | pa.Table) -> LoadStats:
+        """Upsert fixtures: insert new ones and update those whose score,
+        status, referee, date or other details changed. Unchanged rows keep
+        their `processed_at`."""
+        return self.load_fixtures(data, mode="upsert")
+
+    def load_partitioned(
+        self,
+        lake_dir: Optional[str | Path] = None,
+        league_id: Optional[int] = None,
+        season: Optional[int] = None,
+        mode: str = "upsert",
+    ) -> int:
+        """Load the latest fixtures from the partitioned lake (LAKE_DIR by default).
+
+        Only the league_id/season partitions matching the given filters are
+        read, so loading one league/season does not scan the whole history.
+        Stored fixtures that changed are updated unless `mode="ignore"`.
+        """
+        from pipelines.lake import LAKE_DIR, partition_glob
+
+        lake_dir = lake_dir or LAKE_DIR
+        if not Path(lake_dir).exists():
+            raise FileNotFoundError(f"Processed data lake not found: {lake_dir}")
+
+        glob_pattern = partition_glob(lake_dir, league_id=league_id, season=season)
+        return self.bulk_load(glob_pattern, mode=mode)["rows"]
+
+    def _bulk_loadable(self, file_path: Path) -> bool:
+        """Check a file's schema from its footer, counting hive keys in its path"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        try:
+            columns = set(pq.read_schema(file_path).names)
+        except (OSError, pa.ArrowInvalid) as e:
+            logger.warning(f"Skipping {file_path} - unreadable: {e}")
+            return False
+        columns |= {part.split("=")[0] for part in file_path.parts if "=" in part}
+        missing = self.required_columns - columns
+        if missing:
+            logger.warning(f"Skipping {file_path} - missing columns: {missing}")
+        return not missing
+
+    def bulk_load(self, source, mode: str = "upsert") -> dict:
+        """Load many processed files in one set-based statement.
+
+        `source` is a glob (``**`` allowed), a directory, a list of Parquet
+        files, or an Arrow table/dataset. Files are scanned by DuckDB's
+        read_parquet() directly, with hive partition columns taken from the
+        path, so nothing is materialized in pandas. If a fixture appears in
+        several files, the most recently written one wins, going by file
+        name (see pipelines.lake.by_write_order). Everything runs
+        in a single transaction; stored fixtures that changed are updated
+        unless `mode="ignore"`. Returns the row counts, the elapsed time and
+        the throughput in rows/sec.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        from pipelines.lake import by_write_order
+
+        started = time.perf_counter()
+
+        if isinstance(source, (pa.Table, ds.Dataset)):
+            files = []
+            stats = self._insert_fixtures(source, mode=mode)
+        else:
+            if isinstance(source, (list, tuple)):
+                candidates = [Path(p) for p in source]
+            elif Path(source).is_dir():
+                candidates = list(Path(source).glob("*.parquet"))
+            else:
+                candidates = [Path(p) for p in glob.glob(str(source), recursive=True)]
+            files = by_write_order(p for p in candidates if self._bulk_loadable(p))
+            if not files:
+                logger.info(f"No loadable parquet files in {source}")
+                return {
+                    "files": 0,
+                    "rows": 0,
+                    "inserted": 0,
+                    "updated": 0,
+                    "unchanged": 0,
+                    "seconds": 0.0,
+                    "rows_per_sec": 0.0,
+                }
+            columns = FIXTURE_COLUMNS.replace("date,", "CAST(date AS TIMESTAMPTZ),")
+            select = f"""
+                SELECT {columns}
+                FROM read_parquet(
+                    $files, hive_partitioning = true, union_by_name = true,
+                    filename = true
+                )
+            """
+            if len(files) > 1:
+                select += """
+                QUALIFY row_number() OVER (
+                    PARTITION BY fixture_id
+                    ORDER BY list_position($files, filename) DESC
+                ) = 1
+                """
+            stats = self._merge_fixtures(
+                select, {"files": [str(p) for p in files]}, mode=mode
+            )
+
+        seconds = time.perf_counter() - started
+        rows = stats.loaded
+        result = {
+            "files": len(files),
+            "rows": rows,
+            "inserted": stats.inserted,
+            "updated": stats.updated,
+            "unchanged": stats.unchanged,
+            "seconds": seconds,
+            "rows_per_sec": stats.total / seconds if seconds else 0.0,
+        }
+        logger.info(
+            f"Bulk loaded {rows} records from {len(files)} files in {seconds:.2f}s "
+            f"({result['rows_per_sec']:.0f} rows/sec, {stats})"
+        )
+        return result
+
+    def load_processed_data(
+        self, processed_dir: str = "data/processed", bulk: bool = False
+    ) -> int:
+        """Load all parquet files from processed directory.
+
+        `bulk=True` loads them with a single DuckDB statement (see bulk_load)
+        instead of one pandas round-trip per file.
+        """
         processed_path = Path(processed_dir)
         if not processed_path.exists():
             raise FileNotFoundError(
                 f"Processed data directory not found: {processed_path}"
             )
 
+        if bulk:
+            return self.bulk_load(processed_path)["rows"]
+
         total_loaded = 0
         for parquet_file in sorted(processed_path.glob("*.parquet")):
             total_loaded += self.load_parquet_file(parquet_file)
@@ -114,11 +693,262 @@ class FootballDataStorage:
         logger.info(f"Total records loaded in this batch: {total_loaded}")
         return total_loaded
 
-    def get_fixture_count(self) -> int:
-        """Get total number of fixtures in database"""
-        return self.conn.execute("SELECT COUNT(*) FROM fixtures").fetchone()[0]
+    def get_fixture_count(
+        self, league_id: Optional[int] = None, season: Optional[int] = None
+    ) -> int:
+        """Get number of fixtures in database, optionally of one league/season"""
+        if league_id is None and season is None:
+            return self.conn.execute("SELECT COUNT(*) FROM fixtures").fetchone()[0]
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM fixtures WHERE league_id = ? AND season = ?",
+            [league_id, season],
+        ).fetchone()[0]
+
+    def get_database_id(self) -> str:
+        """Random ID given to this database when it was created"""
+        return self.conn.execute(
+            "SELECT database_id FROM database_info WHERE id = 1"
+        ).fetchone()[0]
+
+    def count_missing_fixtures(self, data: pd.DataFrame | pa.Table) -> int:
+        """How many of the fixture IDs in `data` are not stored"""
+        self.conn.register("checked_fixtures", data)
+        try:
+            return self.conn.execute("""
+                SELECT count(*) FROM (SELECT DISTINCT fixture_id FROM checked_fixtures)
+                WHERE fixture_id NOT IN (SELECT fixture_id FROM fixtures)
+            """).fetchone()[0]
+        finally:
+            self.conn.unregister("checked_fixtures")
+
+    def get_watermark(self, league_id: int, season: int) -> Optional[datetime]:
+        """Time of the last successful fetch for a league/season, if any"""
+        row = self.conn.execute(
+            "SELECT last_fetched_at FROM ingestion_state WHERE league_id = ? AND season = ?",
+            [league_id, season],
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, league_id: int, season: int, fetched_at: datetime):
+        """Record a successful fetch for a league/season"""
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO ingestion_state (league_id, season, last_fetched_at)
+            VALUES (?, ?, ?)
+            """,
+            [league_id, season, fetched_at],
+        )
+
+    def get_open_fixture_ids(
+        self, league_id: int, season: int, before: Optional[datetime] = None
+    ) -> list[int]:
+        """IDs of fixtures whose status is not final yet, optionally dated before `before`"""
+        query = f"""
+            SELECT fixture_id FROM fixtures
+            WHERE league_id = ? AND season = ?
+            AND status_short NOT IN ({", ".join("?" for _ in FINAL_STATUSES)})
+        """
+        params = [league_id, season, *FINAL_STATUSES]
+        if before is not None:
+            query += " AND date < ?"
+            params.append(before)
+        query += " ORDER BY date"
+        return [row[0] for row in self.conn.execute(query, params).fetchall()]
+
+    def get_live_fixtures(
+        self,
+        now: datetime,
+        lead: timedelta = timedelta(minutes=15),
+        max_duration: timedelta = timedelta(hours=3),
+        league_ids: Optional[list[int]] = None,
+    ) -> list[int]:
+        """IDs of fixtures in their match window at `now` (naive UTC).
+
+        A fixture is in its window from `lead` before kick-off until it
+        reaches a final status, but at most `max_duration` after kick-off,
+        so matches whose final whistle was missed stop being polled.
+        """
+        statuses = NOT_STARTED_STATUSES + LIVE_STATUSES
+        query = f"""
+            SELECT fixture_id FROM fixtures
+            WHERE status_short IN ({", ".join("?" for _ in statuses)})
+            AND date BETWEEN ? AND ?
+        """
+        params = [*statuses, now - max_duration, now + lead]
+        if league_ids:
+            query += f" AND league_id IN ({', '.join('?' for _ in league_ids)})"
+            params += league_ids
+        query += " ORDER BY date, fixture_id"
+        return [row[0] for row in self.conn.execute(query, params).fetchall()]
+
+    def get_next_kickoff(
+        self, after: datetime, league_ids: Optional[list[int]] = None
+    ) -> Optional[datetime]:
+        """Kick-off time of the next scheduled fixture after `after`"""
+        query = f"""
+            SELECT min(date) FROM fixtures
+            WHERE date > ?
+            AND status_short IN ({", ".join("?" for _ in NOT_STARTED_STATUSES)})
+        """
+        params = [after, *NOT_STARTED_STATUSES]
+        if league_ids:
+            query += f" AND league_id IN ({', '.join('?' for _ in league_ids)})"
+            params += league_ids
+        return self.conn.execute(query, params).fetchone()[0]
+
+    def _reader(self) -> duckdb.DuckDBPyConnection:
+        """Cursor for read queries owned by the calling thread.
+
+        A DuckDB connection must not be used by several threads at once;
+        cursors are independent connections to the same database, so read
+        paths can run concurrently from a thread pool.
+        """
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            with self._cursors_lock:
+                cursor = self.conn.cursor()
+                self._cursors.append(cursor)
+            self._local.cursor = cursor
+        return cursor
+
+    def _read(self, query: str, params: list = ()) -> duckdb.DuckDBPyConnection:
+        """Execute a read query on this thread's cursor.
+
+        Binding parameters makes DuckDB import numpy and pandas to check
+        their types, which would cost every bot worker that import on its
+        first query. The bot's read queries therefore take their integer
+        IDs and limits as literals (through int(), see _int_list) and have
+        no parameters; anything else is bound.
+        """
+        if not params:
+            return self._reader().execute(query)
+        return self._reader().execute(query, params)
+
+    def get_data_version(self) -> int:
+        # fetchall: a cursor left with an unfinished result keeps its read
+        # transaction open, and CHECKPOINT (publish_snapshot) then fails
+        return (
+            self._reader()
+            .execute("SELECT version FROM data_version WHERE id = 1")
+            .fetchall()[0][0]
+        )
+
+    def current_data_version(self) -> int:
+        """Data version as seen by the read paths, re-read every few seconds"""
+        self._version_tracker.check()
+        return self._version_tracker.version
+
+    def _bump_data_version(self):
+        self.conn.execute("""
+            UPDATE data_version
+            SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1
+        """)
+
+    def _timed_records(self, name: str, query: str, params: list) -> list[dict]:
+        with QUERY_SECONDS.time(query=name):
+            cursor = self._read(query, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def _cached_records(self, key: tuple, query: str, params: list) -> list[dict]:
+        """Run a read query through the result cache; errors are not cached"""
+        self._version_tracker.check()
+        try:
+            return self.query_cache.get_or_compute(
+                key, lambda: self._timed_records(key[0], query, params)
+            )
+        except Exception as e:
+            logger.error(f"Error in {key[0]}: {e}")
+            return []
+
+    def _refresh_teams(self, source_table: str):
+        """Upsert team IDs/names seen in `source_table` into the teams dimension"""
+        self.conn.execute(f"""
+            INSERT INTO teams (team_id, team_name)
+            SELECT team_id, arg_max(team_name, date) FROM (
+                SELECT home_team_id AS team_id, home_team_name AS team_name, date
+                FROM {source_table}
+                UNION ALL
+                SELECT away_team_id, away_team_name, date FROM {source_table}
+            )
+            WHERE team_id IS NOT NULL
+            GROUP BY team_id
+            ON CONFLICT (team_id) DO UPDATE SET team_name = excluded.team_name
+        """)
+        self._reset_team_index()
+
+    def _reset_team_index(self):
+        self._team_index = None
+        self._fixture_index = None
+
+    @property
+    def team_index(self) -> TeamIndex:
+        """Alias/fuzzy name index over the teams table, built on first use"""
+        self._version_tracker.check()
+        if self._team_index is None:
+            self._team_index = TeamIndex(
+                self._reader()
+                .execute("SELECT team_id, team_name FROM teams")
+                .fetchall()
+            )
+        return self._team_index
+
+    @property
+    def fixture_index(self) -> FixtureIndex:
+        """In-memory fixtures/standings index, rebuilt after data changes"""
+        self._version_tracker.check()
+        index = self._fixture_index
+        if index is None:
+            from pipelines.fixture_index import FixtureIndex
+
+            started = time.perf_counter()
+            index = self._fixture_index = FixtureIndex.build(self._reader())
+            logger.info(
+                f"Fixture index of {len(index)} fixtures built in "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+        return index
+
+    def _indexed(self, name: str, team_name: Optional[str], lookup) -> list[dict]:
+        """Answer a team query from the fixture index (None: all teams)"""
+        team_ids = self.resolve_team(team_name) if team_name else None
+        if team_ids == []:
+            return []
+        try:
+            with QUERY_SECONDS.time(query=name):
+                return lookup(self.fixture_index, team_ids)
+        except Exception as e:
+            logger.error(f"Error in {name}: {e}")
+            return []
+
+    def resolve_team(self, team_name: str) -> list[int]:
+        """Team IDs matching free-text user input ("Man Utd", "arsnal", ...)"""
+        return self.team_index.resolve(team_name)
+
+    def _team_filter(self, team_name: Optional[str]) -> Optional[tuple[str, list]]:
+        """SQL condition and parameters restricting fixtures to a team.
+
+        Returns None when a name was given but matches no known team.
+        """
+        if not team_name:
+            return "", []
+        team_ids = self.resolve_team(team_name)
+        if not team_ids:
+            return None
+        ids = _int_list(team_ids)
+        return f" AND (home_team_id IN ({ids}) OR away_team_id IN ({ids}))", []
+
     def get_upcoming_fixtures(self, team_name: str = None, limit: int = 10):
         """Get upcoming fixtures optionally filtered by team"""
+        if self.use_fixture_index:
+            # Same clock as the SQL path's CURRENT_TIMESTAMP (UTC sessions)
+            now = utcnow()
+            return self._indexed(
+                "get_upcoming_fixtures",
+                team_name,
+                lambda index, team_ids: index.upcoming(team_ids, limit, now),
+            )
         query = """
             SELECT 
                 fixture_id,
@@ -131,19 +961,23 @@ class FootballDataStorage:
             AND status_short = 'NS'
         """
 
-        if team_name:
-            query += f" AND (home_team_name ILIKE '%{team_name}%' OR away_team_name ILIKE '%{team_name}%')"
-
-        query += f" ORDER BY date LIMIT {limit}"
-
-        try:
-            return self.conn.execute(query).fetchdf().to_dict("records")
-        except Exception as e:
-            logger.error(f"Error in get_upcoming_fixtures: {e}")
+        team_filter = self._team_filter(team_name)
+        if team_filter is None:
             return []
+        condition, params = team_filter
+        query += condition + f" ORDER BY date LIMIT {int(limit)}"
+
+        key = ("get_upcoming_fixtures", normalize(team_name or ""), limit)
+        return self._cached_records(key, query, params)
 
     def get_recent_results(self, team_name: str = None, limit: int = 5):
         """Get recent results optionally filtered by team"""
+        if self.use_fixture_index:
+            return self._indexed(
+                "get_recent_results",
+                team_name,
+                lambda index, team_ids: index.recent(team_ids, limit),
+            )
         query = """
             SELECT 
                 home_team_name as home_team,
@@ -155,66 +989,472 @@ class FootballDataStorage:
             WHERE status_short = 'FT'
         """
 
-        if team_name:
-            query += f" AND (home_team_name ILIKE '%{team_name}%' OR away_team_name ILIKE '%{team_name}%')"
+        team_filter = self._team_filter(team_name)
+        if team_filter is None:
+            return []
+        condition, params = team_filter
+        query += condition + f" ORDER BY date DESC LIMIT {int(limit)}"
+
+        key = ("get_recent_results", normalize(team_name or ""), limit)
+        return self._cached_records(key, query, params)
+
+    def _record_change_events(self):
+        """Turn updated rows in fixture_changes into change events.
+
+        A fixture whose status became a played final status gives a "final"
+        event (with the final score); otherwise a changed score gives a
+        "score" event. Newly inserted fixtures have nothing to compare with
+        and give no events.
+        """
+        played = ", ".join(f"'{status}'" for status in PLAYED_STATUSES)
+        final = ", ".join(f"'{status}'" for status in FINAL_STATUSES)
+        self.conn.execute(f"""
+            INSERT INTO change_events (
+                kind, fixture_id, league_id,
+                home_team_id, home_team_name, away_team_id, away_team_name,
+                home_goals, away_goals, old_home_goals, old_away_goals,
+                status_short
+            )
+            SELECT * FROM (
+                SELECT
+                    CASE
+                        WHEN status_short IN ({played})
+                        AND coalesce(old_status_short NOT IN ({final}), TRUE)
+                        THEN 'final'
+                        -- No score before kick-off means 0-0, so NULL -> 0
+                        -- is not a change (nor is a score that went missing)
+                        WHEN home_goals IS NOT NULL AND away_goals IS NOT NULL
+                        AND (home_goals != coalesce(old_home_goals, 0)
+                             OR away_goals != coalesce(old_away_goals, 0))
+                        THEN 'score'
+                    END AS kind,
+                    fixture_id, league_id,
+                    home_team_id, home_team_name, away_team_id, away_team_name,
+                    home_goals, away_goals, old_home_goals, old_away_goals,
+                    status_short
+                FROM fixture_changes
+                WHERE NOT is_new
+                ORDER BY date, fixture_id
+            )
+            WHERE kind IS NOT NULL
+        """)
+        self.conn.execute(f"""
+            DELETE FROM change_events
+            WHERE created_at < CURRENT_TIMESTAMP
+                - INTERVAL {CHANGE_EVENT_RETENTION_DAYS} DAY
+        """)
+
+    def get_change_events(self, after_id: int = 0, limit: int = 1000) -> list[dict]:
+        """Change events newer than `after_id`, oldest first"""
+        cursor = self._read(f"""
+            SELECT * FROM change_events
+            WHERE event_id > {int(after_id)}
+            ORDER BY event_id
+            LIMIT {int(limit)}
+        """)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_latest_change_event_id(self) -> int:
+        return (
+            self._reader()
+            .execute("SELECT coalesce(max(event_id), 0) FROM change_events")
+            .fetchall()[0][0]
+        )
+
+    def find_teams(self, team_name: str) -> list[dict]:
+        """Known teams matching free-text input, as team_id/team_name dicts"""
+        names = self.team_index.names
+        return [
+            {"team_id": team_id, "team_name": names[team_id]}
+            for team_id in self.resolve_team(team_name)
+        ]
+
+    def get_team_names(self, team_ids: list[int]) -> dict[int, str]:
+        names = self.team_index.names
+        return {team_id: names[team_id] for team_id in team_ids if team_id in names}
+
+    def _refresh_team_snapshots(self, source_table: Optional[str] = None):
+        """Rebuild the snapshots of teams playing in `source_table` (default: all).
+
+        A snapshot holds a team's next upcoming fixtures and latest results
+        as the lines the bot sends, so answering "/results Arsenal" is a
+        primary key lookup instead of a sorted scan of the fixtures table.
+        """
+        if source_table is None:
+            affected = "SELECT team_id FROM teams"
+        else:
+            affected = f"""
+                SELECT home_team_id AS team_id FROM {source_table}
+                UNION SELECT away_team_id FROM {source_table}
+            """
+        rows = self.conn.execute(f"""
+            WITH affected AS ({affected}),
+            team_fixtures AS (
+                SELECT a.team_id, f.* FROM affected a
+                JOIN fixtures f ON f.home_team_id = a.team_id
+                UNION ALL
+                SELECT a.team_id, f.* FROM affected a
+                JOIN fixtures f ON f.away_team_id = a.team_id
+            ),
+            entries AS (
+                SELECT
+                    team_id,
+                    CASE WHEN status_short = 'NS' THEN 'upcoming' ELSE 'results' END
+                        AS kind,
+                    fixture_id,
+                    date,
+                    home_team_name AS home_team,
+                    away_team_name AS away_team,
+                    home_goals,
+                    away_goals,
+                    venue_name
+                FROM team_fixtures
+                WHERE (status_short = 'NS' AND date > CURRENT_TIMESTAMP)
+                OR status_short = 'FT'
+            )
+            SELECT a.team_id, e.* EXCLUDE (team_id) FROM affected a
+            LEFT JOIN entries e USING (team_id)
+            QUALIFY e.kind IS NULL OR row_number() OVER (
+                PARTITION BY a.team_id, e.kind
+                ORDER BY CASE WHEN e.kind = 'upcoming' THEN e.date END,
+                    e.date DESC
+            ) <= CASE e.kind
+                WHEN 'upcoming' THEN {SNAPSHOT_SIZES["upcoming"]}
+                ELSE {SNAPSHOT_SIZES["results"]}
+            END
+            ORDER BY a.team_id, e.kind, e.date
+        """).fetchall()
+
+        snapshots = {}
+        for team_id, kind, fixture_id, date, *details in rows:
+            if team_id is None:
+                continue
+            snapshot = snapshots.setdefault(team_id, {"upcoming": [], "results": []})
+            if kind is None:
+                continue
+            home_team, away_team, home_goals, away_goals, venue_name = details
+            record = {"home_team": home_team, "away_team": away_team}
+            if kind == "upcoming":
+                record.update(date=f"{date:%Y-%m-%d %H:%M}", venue_name=venue_name)
+                line = format_fixture(record)
+            else:
+                record.update(
+                    date=f"{date:%Y-%m-%d}",
+                    home_goals=home_goals,
+                    away_goals=away_goals,
+                )
+                line = format_result(record)
+            snapshot[kind].append(
+                {"fixture_id": fixture_id, "date": date, "line": line}
+            )
+        if not snapshots:
+            return
 
-        query += f" ORDER BY date DESC LIMIT {limit}"
+        import pyarrow as pa
 
+        entries = pa.list_(
+            pa.struct(
+                [
+                    ("fixture_id", pa.int64()),
+                    ("date", pa.timestamp("us")),
+                    ("line", pa.string()),
+                ]
+            )
+        )
+        snapshot_table = pa.table(
+            {
+                "team_id": pa.array(list(snapshots), type=pa.int32()),
+                "upcoming": pa.array(
+                    [s["upcoming"] for s in snapshots.values()], type=entries
+                ),
+                "results": pa.array(
+                    [s["results"][::-1] for s in snapshots.values()], type=entries
+                ),
+            }
+        )
+        self.conn.register("incoming_snapshots", snapshot_table)
         try:
-            return self.conn.execute(query).fetchdf().to_dict("records")
-        except Exception as e:
-            logger.error(f"Error in get_recent_results: {e}")
+            self.conn.execute("""
+                INSERT INTO team_snapshots (team_id, upcoming, results, updated_at)
+                SELECT team_id, upcoming, results, CURRENT_TIMESTAMP
+                FROM incoming_snapshots
+                ON CONFLICT (team_id) DO UPDATE SET
+                    upcoming = excluded.upcoming,
+                    results = excluded.results,
+                    updated_at = excluded.updated_at
+            """)
+        finally:
+            self.conn.unregister("incoming_snapshots")
+
+    def _snapshot_lines(self, team_name: str, kind: str, limit: int):
+        """Bot lines for a team from team_snapshots.
+
+        Returns None when the snapshots cannot answer (too many upcoming
+        fixtures kicked off since the last load, or `limit` above the
+        snapshot size) and the caller should query the fixtures table.
+        """
+        team_ids = self.resolve_team(team_name)
+        if not team_ids:
             return []
+        try:
+            self._version_tracker.check()
+            snapshots = self.query_cache.get_or_compute(
+                ("team_snapshots", kind, tuple(team_ids)),
+                lambda: [
+                    row[0]
+                    for row in self._read(
+                        f"SELECT {kind} FROM team_snapshots "
+                        f"WHERE team_id IN ({_int_list(team_ids)})"
+                    ).fetchall()
+                ],
+            )
+        except Exception as e:
+            logger.error(f"Error reading team snapshots: {e}")
+            return None
+        if len(snapshots) < len(team_ids):
+            return None
 
-    def get_league_standings(self, league_id: int = 39):
-        """Get league standings (simplified version)"""
-        query = f"""
-            SELECT 
-                team_name,
-                points,
-                games_played
-            FROM (
-                SELECT 
-                    home_team_name as team_name,
-                    SUM(CASE 
-                        WHEN home_goals > away_goals THEN 3
-                        WHEN home_goals = away_goals THEN 1
-                        ELSE 0
-                    END) as points,
-                    COUNT(*) as games_played
+        now = utcnow()
+        merged = {}
+        for stored in snapshots:
+            entries = stored
+            if kind == "upcoming":
+                entries = [e for e in stored if e["date"] > now]
+            # A full list may have left out entries that belong in the answer
+            if len(stored) >= SNAPSHOT_SIZES[kind] and len(entries) < limit:
+                return None
+            # Fixtures between two of the teams appear in both snapshots
+            merged.update((e["fixture_id"], e) for e in entries)
+        ordered = sorted(
+            merged.values(), key=lambda e: e["date"], reverse=kind == "results"
+        )
+        return [e["line"] for e in ordered[:limit]]
+
+    def get_upcoming_fixture_lines(
+        self, team_name: str = None, limit: int = 10
+    ) -> list[str]:
+        """Upcoming fixtures formatted for the bot, from the team snapshots"""
+        # The fixture index answers faster than the snapshots
+        if team_name and not self.use_fixture_index:
+            lines = self._snapshot_lines(team_name, "upcoming", limit)
+            if lines is not None:
+                return lines
+        return [format_fixture(f) for f in self.get_upcoming_fixtures(team_name, limit)]
+
+    def get_recent_result_lines(
+        self, team_name: str = None, limit: int = 5
+    ) -> list[str]:
+        """Recent results formatted for the bot, from the team snapshots"""
+        if team_name and not self.use_fixture_index:
+            lines = self._snapshot_lines(team_name, "results", limit)
+            if lines is not None:
+                return lines
+        return [format_result(r) for r in self.get_recent_results(team_name, limit)]
+
+    def _refresh_standings(self, partitions_sql: Optional[str] = None):
+        """Recompute the standings of the league/seasons selected by `partitions_sql`.
+
+        `partitions_sql` must return (league_id, season) rows; without it every
+        league/season is rebuilt. Teams are ranked by points, then goal
+        difference, then goals scored. `form` holds the last five results,
+        most recent first.
+        """
+        scope = (
+            f"WHERE (league_id, season) IN ({partitions_sql})" if partitions_sql else ""
+        )
+        played = ", ".join(f"'{status}'" for status in PLAYED_STATUSES)
+
+        self.conn.execute(f"DELETE FROM standings {scope}")
+        self.conn.execute(f"""
+            INSERT INTO standings (
+                league_id, season, rank, team_id, team_name, played, won, drawn,
+                lost, goals_for, goals_against, goal_diff, points, form
+            )
+            WITH games AS (
+                SELECT league_id, season, date,
+                       home_team_id AS team_id, home_team_name AS team_name,
+                       home_goals AS gf, away_goals AS ga
                 FROM fixtures
-                WHERE league_id = {league_id}
-                AND status_short = 'FT'
-                GROUP BY home_team_name
-                
+                {scope} {"AND" if scope else "WHERE"} status_short IN ({played})
                 UNION ALL
-                
-                SELECT 
-                    away_team_name as team_name,
-                    SUM(CASE 
-                        WHEN away_goals > home_goals THEN 3
-                        WHEN away_goals = home_goals THEN 1
-                        ELSE 0
-                    END) as points,
-                    COUNT(*) as games_played
+                SELECT league_id, season, date,
+                       away_team_id, away_team_name, away_goals, home_goals
                 FROM fixtures
-                WHERE league_id = {league_id}
-                AND status_short = 'FT'
-                GROUP BY away_team_name
+                {scope} {"AND" if scope else "WHERE"} status_short IN ({played})
+            ),
+            results AS (
+                SELECT *,
+                    CASE WHEN gf > ga THEN 'W' WHEN gf = ga THEN 'D' ELSE 'L' END AS result
+                FROM games
+            ),
+            totals AS (
+                SELECT
+                    league_id, season, team_id,
+                    arg_max(team_name, date) AS team_name,
+                    count(*) AS played,
+                    count(*) FILTER (WHERE result = 'W') AS won,
+                    count(*) FILTER (WHERE result = 'D') AS drawn,
+                    count(*) FILTER (WHERE result = 'L') AS lost,
+                    sum(gf) AS goals_for,
+                    sum(ga) AS goals_against,
+                    left(string_agg(result, '' ORDER BY date DESC), 5) AS form
+                FROM results
+                GROUP BY league_id, season, team_id
+            )
+            SELECT
+                league_id, season,
+                row_number() OVER (
+                    PARTITION BY league_id, season
+                    ORDER BY 3 * won + drawn DESC, goals_for - goals_against DESC,
+                             goals_for DESC, team_name
+                ),
+                team_id, team_name, played, won, drawn, lost,
+                goals_for, goals_against, goals_for - goals_against,
+                3 * won + drawn, form
+            FROM totals
+        """)
+
+    def rebuild_standings(self):
+        """Recompute every league table from scratch"""
+        self.conn.begin()
+        try:
+            self._refresh_standings()
+            self._bump_data_version()
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self._version_tracker.check(force=True)
+
+    def get_league_standings(self, league_id: int = 39, season: Optional[int] = None):
+        """Get the league table, for the latest season unless one is given"""
+        if self.use_fixture_index:
+            return self._indexed(
+                "get_league_standings",
+                None,
+                lambda index, _: index.league_standings(league_id, season),
             )
-            GROUP BY team_name
-            ORDER BY SUM(points) DESC
-            LIMIT 20
+        latest = (
+            f"(SELECT max(season) FROM standings WHERE league_id = {int(league_id)})"
+        )
+        query = f"""
+            SELECT
+                rank,
+                team_name,
+                points,
+                played AS games_played,
+                won, drawn, lost,
+                goals_for, goals_against, goal_diff,
+                form
+            FROM standings
+            WHERE league_id = {int(league_id)}
+            AND season = {latest if season is None else int(season)}
+            ORDER BY rank
+        """
+
+        key = ("get_league_standings", league_id, season)
+        return self._cached_records(key, query, [])
+
+    def get_fixtures_needing_details(
+        self,
+        league_id: Optional[int] = None,
+        season: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[int]:
+        """IDs of started fixtures whose status changed since their details
+        were last fetched (or that were never fetched), most recent first"""
+        query = f"""
+            SELECT f.fixture_id
+            FROM fixtures f
+            LEFT JOIN fixture_details_state d USING (fixture_id)
+            WHERE f.status_short NOT IN ({", ".join("?" for _ in NOT_STARTED_STATUSES)})
+            AND f.status_short IS DISTINCT FROM d.status_short
+        """
+        params = list(NOT_STARTED_STATUSES)
+        if league_id is not None:
+            query += " AND f.league_id = ?"
+            params.append(league_id)
+        if season is not None:
+            query += " AND f.season = ?"
+            params.append(season)
+        query += " ORDER BY f.date DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [row[0] for row in self.conn.execute(query, params).fetchall()]
+
+    def load_fixture_details(self, tables: dict) -> dict:
+        """Replace the events, lineups and statistics of the fetched fixtures.
+
+        `tables` comes from processing.fixture_details_to_tables. For every
+        fixture in its "fetched" table the stored details are replaced in
+        one transaction and the status they were fetched at is recorded, so
+        get_fixtures_needing_details skips it until its status moves again.
+        Returns the number of rows written per table.
         """
+        fact_tables = {
+            "events": "fixture_events",
+            "lineups": "fixture_lineups",
+            "statistics": "fixture_statistics",
+        }
+        counts = {"fixtures": tables["fetched"].num_rows}
+        if not counts["fixtures"]:
+            return {**counts, **{name: 0 for name in fact_tables}}
 
+        self.conn.begin()
         try:
-            return self.conn.execute(query).fetchdf().to_dict("records")
-        except Exception as e:
-            logger.error(f"Error in get_league_standings: {e}")
-            return []
+            self.conn.register("fetched_details", tables["fetched"])
+            for name, table_name in fact_tables.items():
+                self.conn.execute(f"""
+                    DELETE FROM {table_name}
+                    WHERE fixture_id IN (SELECT fixture_id FROM fetched_details)
+                """)
+                self.conn.register("incoming_details", tables[name])
+                # Repeated stat types (or events) per fixture keep the first row
+                columns = ", ".join(tables[name].column_names)
+                self.conn.execute(f"""
+                    INSERT OR IGNORE INTO {table_name} ({columns})
+                    SELECT {columns} FROM incoming_details
+                """)
+                self.conn.unregister("incoming_details")
+                counts[name] = tables[name].num_rows
+            self.conn.execute("""
+                INSERT INTO fixture_details_state
+                SELECT fixture_id, status_short, CURRENT_TIMESTAMP
+                FROM fetched_details
+                QUALIFY row_number() OVER (PARTITION BY fixture_id) = 1
+                ON CONFLICT (fixture_id) DO UPDATE SET
+                    status_short = excluded.status_short,
+                    fetched_at = excluded.fetched_at
+            """)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self.conn.unregister("fetched_details")
+        logger.info(f"Loaded fixture details: {counts}")
+        return counts
+
+    def publish_snapshot(self, snapshots_dir: Optional[str | Path] = None) -> Path:
+        """Checkpoint the database and publish a copy of it for readers
+        (see pipelines.snapshots), so the bot never opens this file"""
+        from pipelines.snapshots import SNAPSHOTS_DIR, publish_snapshot
+
+        self.conn.execute("CHECKPOINT")
+        return publish_snapshot(
+            self.db_path,
+            snapshots_dir or SNAPSHOTS_DIR,
+            version=self.get_data_version(),
+        )
 
     def close(self):
         """Clean up database connection"""
+        with self._cursors_lock:
+            for cursor in self._cursors:
+                cursor.close()
+            self._cursors.clear()
         self.conn.close()
 
 
@@ -223,11 +1463,17 @@ def main():
         storage = FootballDataStorage()
 
         # Load all available processed data
-        loaded_count = storage.load_processed_data()
+        loaded_count = storage.load_processed_data(bulk=True)
+        from pipelines.lake import LAKE_DIR
+
+        if Path(LAKE_DIR).exists():
+            loaded_count += storage.load_partitioned(LAKE_DIR)
         total_count = storage.get_fixture_count()
 
         logger.info(f"Total fixtures in database: {total_count}")
         logger.info(f"New fixtures loaded: {loaded_count}")
+        if os.getenv("FOOTBALL_SNAPSHOT_DIR"):
+            storage.publish_snapshot(os.environ["FOOTBALL_SNAPSHOT_DIR"])
 
     except Exception as e:
         logger.error(f"Storage operation failed: {str(e)}")
@@ -0,0 +1,152 @@
+# pipelines/teams.py
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Iterable
+
+# Nicknames and abbreviations users type, mapped to normalized official names
+ALIASES = {
+    "man utd": "manchester united",
+    "man united": "manchester united",
+    "mufc": "manchester united",
+    "man city": "manchester city",
+    "mcfc": "manchester city",
+    "spurs": "tottenham",
+    "wolves": "wolverhampton",
+    "forest": "nottingham forest",
+    "nffc": "nottingham forest",
+    "villa": "aston villa",
+    "palace": "crystal palace",
+    "hammers": "west ham",
+    "toffees": "everton",
+    "gunners": "arsenal",
+    "blues": "chelsea",
+    "reds": "liverpool",
+    "magpies": "newcastle",
+    "seagulls": "brighton",
+    "saints": "southampton",
+    "boro": "middlesbrough",
+    "psg": "paris saint germain",
+    "barca": "barcelona",
+    "atleti": "atletico madrid",
+    "bayern": "bayern munich",
+    "bvb": "borussia dortmund",
+    "juve": "juventus",
+}
+
+# Tokens that carry no meaning for matching ("Arsenal FC" == "Arsenal")
+_NOISE = {"fc", "afc", "cf", "sc", "ac", "the", "club", "de"}
+
+
+def normalize(name: str) -> str:
+    """Lowercase, strip accents and punctuation, drop filler tokens"""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace("&", " and ")
+    tokens = [t for t in re.split(r"[^a-z0-9]+", text) if t and t not in _NOISE]
+    return " ".join(tokens)
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TeamIndex:
+    """In-memory lookup from free-text team names to team IDs.
+
+    Resolution tries, in order: exact normalized name (as typed, then via
+    ALIASES), prefix of the name or of any word in it, substring, and
+    finally trigram similarity for typos. The first step that matches
+    anything wins, so "Manchester" returns both Manchester clubs while
+    "Man Utd" and "Arsnal" return a single team. Its matches are ranked by
+    trigram similarity to the query (then team ID), closest name first.
+    """
+
+    def __init__(self, teams: Iterable[tuple[int, str]] = ()):
+        self.names: dict[int, str] = {}
+        self._exact = defaultdict(set)
+        self._normalized: dict[int, str] = {}
+        self._prefix_keys: list[tuple[str, int]] = []
+        self._trigrams = defaultdict(set)
+        for team_id, team_name in teams:
+            self.add(team_id, team_name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, team_id: int, team_name: str):
+        key = normalize(team_name)
+        self.names[team_id] = team_name
+        self._normalized[team_id] = key
+        self._exact[key].add(team_id)
+        words = key.split()
+        # Index the full name and every suffix starting at a word boundary
+        for i in range(len(words)):
+            insort(self._prefix_keys, (" ".join(words[i:]), team_id))
+        for gram in _trigrams(key):
+            self._trigrams[gram].add(team_id)
+
+    def resolve(self, query: str, min_similarity: float = 0.4) -> list[int]:
+        """Team IDs matching `query`, best matches first"""
+        key = normalize(query)
+        if not key:
+            return []
+        # Feeds differ ("Wolves" vs "Wolverhampton"): try the text as typed first
+        keys = [key] if key not in ALIASES else [key, ALIASES[key]]
+
+        for lookup in (
+            self._exact_matches,
+            self._prefix_matches,
+            self._substring_matches,
+        ):
+            for candidate in keys:
+                matches = lookup(candidate)
+                if matches:
+                    return self._ranked(candidate, matches)
+
+        return self._similar(keys[-1], min_similarity)
+
+    def _exact_matches(self, key: str) -> set[int]:
+        return self._exact.get(key, set())
+
+    def _substring_matches(self, key: str) -> set[int]:
+        return {tid for tid, name in self._normalized.items() if key in name}
+
+    def _prefix_matches(self, key: str) -> set[int]:
+        matches = set()
+        i = bisect_left(self._prefix_keys, (key, -1))
+        while i < len(self._prefix_keys) and self._prefix_keys[i][0].startswith(key):
+            matches.add(self._prefix_keys[i][1])
+            i += 1
+        return matches
+
+    def _ranked(self, key: str, team_ids: set[int]) -> list[int]:
+        grams = _trigrams(key)
+
+        def similarity(team_id: int) -> float:
+            other = _trigrams(self._normalized[team_id])
+            return len(grams & other) / len(grams | other)
+
+        return sorted(team_ids, key=lambda team_id: (-similarity(team_id), team_id))
+
+    def _similar(self, key: str, min_similarity: float) -> list[int]:
+        grams = _trigrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for team_id in self._trigrams.get(gram, ()):
+                shared[team_id] += 1
+
+        scored = []
+        for team_id, count in shared.items():
+            other = len(_trigrams(self._normalized[team_id]))
+            score = count / (len(grams) + other - count)
+            if score >= min_similarity:
+                scored.append((score, team_id))
+        if not scored:
+            return []
+        best = max(score for score, _ in scored)
+        return [
+            team_id for score, team_id in sorted(scored, reverse=True) if score == best
+        ]
@@ -1,74 +1,678 @@
 # run_pipeline.py
+import argparse
+import glob
+import json
 import logging
+import os
+import signal
+import threading
 from pathlib import Path
-from datetime import datetime
-from pipelines.ingestion import fetch_fixtures, save_raw_data
-from pipelines.processing import process_fixtures, save_processed_data
-from pipelines.storage import FootballDataStorage
+from datetime import datetime, timedelta
+
+import pyarrow.parquet as pq
+from pipelines.ingestion import (
+    fetch_fixture_details,
+    fetch_fixtures,
+    fetch_fixtures_batch,
+    fetch_fixtures_incremental,
+    save_raw_data,
+)
+from pipelines.checkpoints import CHECKPOINTS_DIR, Checkpoint, file_hash, text_hash
+from pipelines.http_cache import ResponseCache
+from pipelines.lake import (
+    LAKE_DIR,
+    compact,
+    lake_has_fixtures,
+    new_partition_file,
+    partition_glob,
+    write_partitioned,
+)
+from pipelines.metrics import PipelineRun
+from pipelines.processing import (
+    LAKE_COLUMNS,
+    fixture_details_to_tables,
+    process_fixtures,
+    process_fixtures_streaming,
+    save_processed_data,
+)
+from pipelines.scheduler import PipelineScheduler
+from pipelines.snapshots import current_snapshot
+from pipelines.storage import FootballDataStorage, LoadStats
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# An interrupted run older than this fetches again instead of resuming
+RESUME_MAX_AGE = timedelta(hours=1)
+
+
+def _finish_run(run: PipelineRun, status: str = "ok") -> dict:
+    """Mark the run finished and write its JSON summary"""
+    summary = run.finish(status)
+    try:
+        path = run.write()
+        logger.info(f"Run summary written to {path}")
+    except OSError as e:
+        logger.warning(f"Could not write run summary: {e}")
+    return summary
+
+
+def _load_details(
+    run: PipelineRun,
+    storage: FootballDataStorage,
+    league_id: int,
+    season: int,
+    api_key: str,
+    session=None,
+    max_requests: int | None = None,
+) -> int:
+    """Fetch and load events, lineups and statistics of the fixtures whose
+    status moved since their details were stored; returns fixtures loaded"""
+    fixture_ids = storage.get_fixtures_needing_details(league_id, season)
+    if not fixture_ids:
+        return 0
+    with run.stage("details") as details:
+        data = fetch_fixture_details(
+            fixture_ids, api_key, max_requests=max_requests, session=session
+        )
+        save_raw_data(
+            data, f"details_{league_id}_{season}_{datetime.now():%Y-%m-%d_%H%M%S}"
+        )
+        counts = storage.load_fixture_details(
+            fixture_details_to_tables(data["response"])
+        )
+        details.update(
+            rows=counts["events"] + counts["lineups"] + counts["statistics"],
+            **counts,
+            pending=len(data["pending"]),
+        )
+    if data["pending"]:
+        logger.info(f"{len(data['pending'])} fixtures left for the next details run")
+    return counts["fixtures"]
+
+
+def run_full_pipeline(
+    league_id: int = 39,
+    season: int = 2023,
+    incremental: bool = False,
+    use_cache: bool = True,
+    storage: FootballDataStorage | None = None,
+    session=None,
+    publish_dir: str | None = None,
+    details: bool = False,
+    max_detail_requests: int | None = None,
+    checkpoints_dir: str | None = CHECKPOINTS_DIR,
+    resume: bool = True,
+):
+    """Run complete pipeline from ingestion to storage.
 
-def run_full_pipeline(league_id: int = 39, season: int = 2023):
-    """Run complete pipeline from ingestion to storage"""
+    With `incremental=True` and a stored watermark for the league/season, only
+    fixtures that can still change are fetched and merged into the stored
+    ones (upsert). The first incremental run for a league/season does a full
+    fetch and sets the watermark. `use_cache` serves repeated requests from
+    the on-disk response cache in data/cache/http. A given `storage` is
+    used and left open; `session` is used for all API requests. Stage
+    timings and counts are returned under "metrics" and written to
+    data/runs as a JSON run summary. With `publish_dir`, a snapshot of the
+    database is published there for the bot after data changed (see
+    pipelines.snapshots). With `details`, events, lineups and statistics of
+    fixtures that started or finished since the last run are fetched in
+    batches of IDs, in at most `max_detail_requests` requests.
+
+    Completed stages are checkpointed in `checkpoints_dir` (None disables
+    this, see pipelines.checkpoints): processing, lake writing and loading
+    are skipped when the fetched response is identical to the last one, and
+    with `resume` a run that was interrupted within RESUME_MAX_AGE continues
+    from its saved raw response instead of fetching again.
+    """
+    owns_storage = storage is None
+    run = PipelineRun(
+        "pipeline", league_id=league_id, season=season, incremental=incremental
+    )
+    checkpoint = (
+        Checkpoint(f"pipeline_{league_id}_{season}", checkpoints_dir)
+        if checkpoints_dir
+        else None
+    )
     try:
+        if owns_storage:
+            storage = FootballDataStorage()
+
         # 1. INGESTION
         logger.info("Starting data ingestion...")
         api_key = os.getenv("API_KEY")
         if not api_key:
             raise ValueError("API_KEY not found in environment variables")
 
-        fixtures_data = fetch_fixtures(
-            league_id=league_id, season=season, api_key=api_key
-        )
+        fetched = _resumable_fetch(checkpoint) if resume else None
+        if fetched:
+            raw_file_path = Path(fetched["raw_file"])
+            raw_hash = fetched["output"]
+            fetched_at = datetime.fromisoformat(fetched["fetched_at"])
+            watermark = fetched["watermark"] and datetime.fromisoformat(
+                fetched["watermark"]
+            )
+            fixture_count = fetched["fixtures"]
+            logger.info(f"Resuming interrupted run from {raw_file_path}")
+            run.context["resumed"] = True
+        else:
+            cache = ResponseCache() if use_cache else None
+            fetched_at = datetime.now()
+            watermark = (
+                storage.get_watermark(league_id, season) if incremental else None
+            )
+            with run.stage("fetch") as fetch:
+                if watermark:
+                    open_ids = storage.get_open_fixture_ids(
+                        league_id, season, before=watermark - timedelta(days=1)
+                    )
+                    logger.info(
+                        f"Incremental fetch since {watermark} "
+                        f"(+{len(open_ids)} open fixtures by ID)"
+                    )
+                    fixtures_data = fetch_fixtures_incremental(
+                        league_id=league_id,
+                        season=season,
+                        api_key=api_key,
+                        since=watermark,
+                        open_fixture_ids=open_ids,
+                        session=session,
+                        cache=cache,
+                    )
+                    raw_filename = f"fixtures_{league_id}_{season}_{fetched_at:%Y-%m-%d_%H%M%S}_delta"
+                else:
+                    fixtures_data = fetch_fixtures(
+                        league_id=league_id,
+                        season=season,
+                        api_key=api_key,
+                        session=session,
+                        cache=cache,
+                    )
+                    raw_filename = (
+                        f"fixtures_{league_id}_{season}_{datetime.now().date()}"
+                    )
+
+                # Save raw data with timestamp
+                save_raw_data(fixtures_data, raw_filename)
+                logger.info(f"Saved raw data to data/raw/{raw_filename}.json")
+                raw_file_path = Path(f"data/raw/{raw_filename}.json")
+                fixture_count = len(fixtures_data.get("response", []))
+                del fixtures_data
+                raw_hash = file_hash(raw_file_path)
+                fetch["fixtures"] = fixture_count
+                fetch["bytes"] = raw_file_path.stat().st_size
+            if checkpoint:
+                checkpoint.record(
+                    "fetch",
+                    output=raw_hash,
+                    raw_file=str(raw_file_path),
+                    fetched_at=fetched_at.isoformat(),
+                    watermark=watermark and watermark.isoformat(),
+                    fixtures=fixture_count,
+                )
 
-        # Save raw data with timestamp
-        raw_filename = f"fixtures_{league_id}_{season}_{datetime.now().date()}"
-        save_raw_data(fixtures_data, raw_filename)
-        logger.info(f"Saved raw data to data/raw/{raw_filename}.json")
+        if watermark and not fixture_count:
+            logger.info("No fixtures changed since the last run")
+            storage.set_watermark(league_id, season, fetched_at)
+            # Catch up on details a previous run had to leave out
+            details_count = details and _load_details(
+                run,
+                storage,
+                league_id,
+                season,
+                api_key,
+                session=session,
+                max_requests=max_detail_requests,
+            )
+            # The bot can't serve before a first snapshot exists
+            if publish_dir and (details_count or current_snapshot(publish_dir) is None):
+                with run.stage("publish"):
+                    storage.publish_snapshot(publish_dir)
+            if checkpoint:
+                checkpoint.finish()
+            return {
+                "raw_file": raw_file_path,
+                "processed_file": None,
+                "loaded_count": 0,
+                "total_count": storage.get_fixture_count(),
+                "metrics": _finish_run(run),
+            }
 
         # 2. PROCESSING
-        logger.info("Processing data...")
-        raw_file_path = Path(f"data/raw/{raw_filename}.json")
-        processed_df = process_fixtures(raw_file_path)
+        processed = checkpoint and _checkpointed_table(checkpoint, raw_hash)
+        if processed is not None:
+            logger.info("Raw data unchanged since the last processing, reusing it")
+            processed_hash = checkpoint.stage("processing")["output"]
+        else:
+            logger.info("Processing data...")
+            with run.stage("processing") as processing:
+                processed = process_fixtures(raw_file_path)
+                processing["rows"] = len(processed)
+            if checkpoint:
+                path = save_processed_data(
+                    processed, checkpoint.artifact("processed.parquet")
+                )
+                processed_hash = file_hash(path)
+                checkpoint.record(
+                    "processing",
+                    raw_hash,
+                    output=processed_hash,
+                    file=str(path),
+                    rows=len(processed),
+                )
 
-        # Save processed data
-        processed_path = Path("data/processed") / f"processed_{raw_filename}.parquet"
-        saved_path = save_processed_data(processed_df, processed_path)
-        logger.info(f"Saved processed data to {saved_path}")
+        # Save processed data into the league_id/season partitioned lake
+        written = checkpoint and checkpoint.completed("lake_write", processed_hash)
+        if not len(processed):
+            # e.g. a season without fixtures yet
+            logger.info("No fixtures fetched, nothing to write to the lake")
+            saved_path = None
+        # The lake may have been wiped or rebuilt since
+        elif written and lake_has_fixtures(processed, LAKE_DIR, league_id, season):
+            saved_path = Path(written["file"])
+        else:
+            with run.stage("lake_write") as lake_write:
+                saved_path = write_partitioned(processed, LAKE_DIR)[0]
+                compact(LAKE_DIR, league_id=league_id, season=season, min_files=8)
+                lake_write["rows"] = len(processed)
+            if checkpoint:
+                checkpoint.record("lake_write", processed_hash, file=str(saved_path))
+            logger.info(f"Saved processed data to {saved_path}")
 
         # 3. STORAGE
-        logger.info("Loading data into database...")
-        storage = FootballDataStorage()
-        loaded_count = storage.load_parquet_file(saved_path)
+        load_key = checkpoint and text_hash(
+            f"{processed_hash}:{storage.get_database_id()}"
+        )
+        if (
+            checkpoint
+            and checkpoint.completed("load", load_key)
+            and not storage.count_missing_fixtures(processed)
+        ):
+            # These exact fixtures were loaded into this database and are still there
+            logger.info("Processed data unchanged since the last load, skipping it")
+            stats = LoadStats(unchanged=len(processed))
+        else:
+            logger.info("Loading data into database...")
+            with run.stage("load") as load:
+                stats = storage.load_fixtures(processed)
+                load.update(
+                    rows=stats.total,
+                    inserted=stats.inserted,
+                    updated=stats.updated,
+                    unchanged=stats.unchanged,
+                )
+            if checkpoint and stats.total == len(processed):
+                checkpoint.record("load", load_key, rows=stats.total)
+        loaded_count = stats.loaded
+        if incremental:
+            # Only move the watermark once every fetched row made it in
+            if stats.total == len(processed):
+                storage.set_watermark(league_id, season, fetched_at)
+            else:
+                logger.warning("Incomplete load, keeping previous watermark")
+
+        details_count = 0
+        if details:
+            details_count = _load_details(
+                run,
+                storage,
+                league_id,
+                season,
+                api_key,
+                session=session,
+                max_requests=max_detail_requests,
+            )
+
+        if publish_dir and (
+            loaded_count or details_count or current_snapshot(publish_dir) is None
+        ):
+            with run.stage("publish"):
+                storage.publish_snapshot(publish_dir)
+        if checkpoint:
+            checkpoint.finish()
 
         # Verify results
         total_count = storage.get_fixture_count()
-        logger.info(f"Successfully loaded {loaded_count} new fixtures")
+        logger.info(f"Successfully loaded fixtures: {stats}")
         logger.info(f"Total fixtures in database: {total_count}")
 
         return {
             "raw_file": raw_file_path,
             "processed_file": saved_path,
             "loaded_count": loaded_count,
+            "inserted": stats.inserted,
+            "updated": stats.updated,
+            "unchanged": stats.unchanged,
             "total_count": total_count,
+            "metrics": _finish_run(run),
         }
 
     except Exception as e:
         logger.error(f"Pipeline failed: {str(e)}")
+        _finish_run(run, "failed")
         raise
     finally:
-        if "storage" in locals():
+        if owns_storage and storage is not None:
             storage.close()
 
 
+def _resumable_fetch(checkpoint: Checkpoint | None) -> dict | None:
+    """Fetch record of an interrupted run whose raw file can be reused"""
+    if checkpoint is None or checkpoint.status != "running":
+        return None
+    fetched = checkpoint.stage("fetch")
+    if not fetched:
+        return None
+    if datetime.now() - datetime.fromisoformat(fetched["fetched_at"]) > RESUME_MAX_AGE:
+        logger.info("Interrupted run is too old to resume, fetching again")
+        return None
+    raw_file = Path(fetched["raw_file"])
+    if not raw_file.exists() or file_hash(raw_file) != fetched["output"]:
+        logger.warning(f"Raw file {raw_file} changed or is gone, fetching again")
+        return None
+    return fetched
+
+
+def _checkpointed_table(checkpoint: Checkpoint, raw_hash: str):
+    """Processed fixtures of `raw_hash` kept by the checkpoint, if intact"""
+    processed = checkpoint.completed("processing", raw_hash)
+    if not processed:
+        return None
+    path = Path(processed["file"])
+    if not path.exists() or file_hash(path) != processed["output"]:
+        return None
+    return pq.read_table(path)
+
+
+def run_batch_pipeline(
+    pairs: list[tuple[int, int]],
+    max_concurrency: int = 8,
+    requests_per_minute: int | None = None,
+    use_cache: bool = True,
+    publish_dir: str | None = None,
+    checkpoints_dir: str | None = CHECKPOINTS_DIR,
+):
+    """Run the pipeline for many (league_id, season) pairs with concurrent ingestion.
+
+    Returns one entry per pair; the run summary with the stage totals is
+    written to data/runs. With `publish_dir`, one snapshot is published
+    after all pairs are loaded. Pairs whose response is identical to the
+    one last loaded into this database are not processed again (see
+    pipelines.checkpoints).
+    """
+    api_key = os.getenv("API_KEY")
+    if not api_key:
+        raise ValueError("API_KEY not found in environment variables")
+
+    run = PipelineRun("batch", pairs=len(pairs))
+    # 1. INGESTION (concurrent, pooled connections)
+    logger.info(f"Fetching {len(pairs)} league/season pairs...")
+    with run.stage("fetch") as fetch:
+        results = fetch_fixtures_batch(
+            pairs,
+            api_key=api_key,
+            max_concurrency=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            cache=ResponseCache() if use_cache else None,
+        )
+        fetch["failed"] = sum(not result.ok for result in results)
+
+    storage = FootballDataStorage()
+    summary = []
+    try:
+        for result in results:
+            entry = {
+                "league_id": result.league_id,
+                "season": result.season,
+                "latency": result.latency,
+                "error": result.error,
+                "loaded_count": 0,
+            }
+            summary.append(entry)
+            if not result.ok:
+                logger.error(
+                    f"Skipping league={result.league_id} season={result.season}: "
+                    f"{result.error}"
+                )
+                continue
+
+            # 2. PROCESSING
+            raw_filename = (
+                f"fixtures_{result.league_id}_{result.season}_{datetime.now().date()}"
+            )
+            save_raw_data(result.data, raw_filename)
+            raw_file_path = Path(f"data/raw/{raw_filename}.json")
+            checkpoint = (
+                Checkpoint(f"batch_{result.league_id}_{result.season}", checkpoints_dir)
+                if checkpoints_dir
+                else None
+            )
+            load_key = text_hash(
+                f"{file_hash(raw_file_path)}:{storage.get_database_id()}"
+            )
+            previous = checkpoint and checkpoint.completed("load", load_key)
+            if (
+                previous
+                and storage.get_fixture_count(result.league_id, result.season)
+                >= previous["rows"]
+                and glob.glob(partition_glob(LAKE_DIR, result.league_id, result.season))
+            ):
+                logger.info(
+                    f"league={result.league_id} season={result.season} "
+                    "unchanged since the last load, skipping it"
+                )
+                entry["skipped"] = True
+                continue
+            with run.stage("processing") as processing:
+                processing["rows"] = process_fixtures_streaming(
+                    raw_file_path,
+                    new_partition_file(LAKE_DIR, result.league_id, result.season),
+                    columns=LAKE_COLUMNS,
+                )
+
+            # 3. STORAGE
+            with run.stage("load") as load:
+                entry["loaded_count"] = storage.load_partitioned(
+                    LAKE_DIR, league_id=result.league_id, season=result.season
+                )
+                load["loaded"] = entry["loaded_count"]
+            if checkpoint:
+                checkpoint.record("load", load_key, rows=processing["rows"])
+                checkpoint.finish()
+
+        loaded = sum(entry["loaded_count"] for entry in summary)
+        if publish_dir and (loaded or current_snapshot(publish_dir) is None):
+            with run.stage("publish"):
+                storage.publish_snapshot(publish_dir)
+
+        total_latency = sum(entry["latency"] for entry in summary)
+        logger.info(
+            f"Batch finished: {sum(r.ok for r in results)}/{len(results)} succeeded, "
+            f"{total_latency:.2f}s cumulative request latency"
+        )
+        _finish_run(run)
+        return summary
+    except Exception:
+        _finish_run(run, "failed")
+        raise
+    finally:
+        storage.close()
+
+
+def run_backfill(
+    pairs: list[tuple[int, int]],
+    restart: bool = False,
+    publish_dir: str | None = None,
+    checkpoints_dir: str = CHECKPOINTS_DIR,
+    **options,
+) -> list[dict]:
+    """Load many league/seasons as small resumable units, one at a time.
+
+    Each pair is a run_full_pipeline unit with its own stage checkpoints,
+    and the backfill records every pair it finished. Running the same
+    backfill again (same pairs) after a crash or failures skips finished
+    pairs and resumes the interrupted one; `restart` starts over. One
+    snapshot is published at the end. `options` go to run_full_pipeline.
+    """
+    key = text_hash(json.dumps(sorted(pairs)))[:12]
+    progress = Checkpoint(f"backfill_{key}", checkpoints_dir)
+    if restart:
+        progress.reset()
+
+    storage = FootballDataStorage()
+    summary = []
+    try:
+        for league_id, season in pairs:
+            unit = f"{league_id}:{season}"
+            if progress.stage(unit):
+                logger.info(f"Backfill: {unit} already done, skipping")
+                summary.append({"unit": unit, "skipped": True, "loaded_count": 0})
+                continue
+            try:
+                result = run_full_pipeline(
+                    league_id,
+                    season,
+                    incremental=True,
+                    storage=storage,
+                    checkpoints_dir=checkpoints_dir,
+                    **options,
+                )
+            except Exception as e:
+                # Left unrecorded, so the next run of this backfill retries it
+                logger.error(f"Backfill: {unit} failed: {e}")
+                summary.append({"unit": unit, "error": str(e), "loaded_count": 0})
+                continue
+            progress.record(unit, loaded=result["loaded_count"])
+            summary.append({"unit": unit, "loaded_count": result["loaded_count"]})
+
+        failed = [entry["unit"] for entry in summary if "error" in entry]
+        done = len(pairs) - len(failed)
+        logger.info(f"Backfill {key}: {done}/{len(pairs)} pairs done")
+        if not failed:
+            progress.finish()
+        loaded = sum(entry["loaded_count"] for entry in summary)
+        if publish_dir and (loaded or current_snapshot(publish_dir) is None):
+            storage.publish_snapshot(publish_dir)
+        return summary
+    finally:
+        storage.close()
+
+
+def run_scheduler(pairs: list[tuple[int, int]], **options):
+    """Run the pipeline daemon until SIGINT/SIGTERM (see PipelineScheduler)"""
+    api_key = os.getenv("API_KEY")
+    if not api_key:
+        raise ValueError("API_KEY not found in environment variables")
+
+    storage = FootballDataStorage()
+    scheduler = PipelineScheduler(
+        pairs,
+        storage,
+        api_key,
+        refresh=lambda league_id, season, session: run_full_pipeline(
+            league_id, season, incremental=True, storage=storage, session=session
+        ),
+        **options,
+    )
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    try:
+        scheduler.run(stop)
+    finally:
+        storage.close()
+
+
+def _pair(value: str) -> tuple[int, int]:
+    league_id, season = value.split(":")
+    return int(league_id), int(season)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Football data pipeline")
+    parser.add_argument(
+        "--publish-dir",
+        default=os.getenv("FOOTBALL_SNAPSHOT_DIR"),
+        help="publish database snapshots for the bot here after loads",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="one-off run for a league/season")
+    run.add_argument("--league", type=int, default=39)
+    run.add_argument("--season", type=int, default=2023)
+    run.add_argument("--full", action="store_true", help="ignore the watermark")
+    run.add_argument("--no-cache", action="store_true")
+    run.add_argument(
+        "--no-resume", action="store_true", help="fetch again after a crashed run"
+    )
+    run.add_argument(
+        "--details", action="store_true", help="also load events/lineups/statistics"
+    )
+    run.add_argument(
+        "--detail-requests", type=int, help="API requests allowed for details"
+    )
+
+    batch = commands.add_parser("batch", help="one-off run for many pairs")
+    batch.add_argument("pairs", nargs="+", type=_pair, metavar="LEAGUE:SEASON")
+    batch.add_argument("--max-concurrency", type=int, default=8)
+    batch.add_argument("--requests-per-minute", type=int)
+
+    backfill = commands.add_parser("backfill", help="resumable run for many pairs")
+    backfill.add_argument("pairs", nargs="+", type=_pair, metavar="LEAGUE:SEASON")
+    backfill.add_argument("--restart", action="store_true", help="start over")
+    backfill.add_argument("--details", action="store_true")
+
+    schedule = commands.add_parser("schedule", help="long-running scheduler")
+    schedule.add_argument("pairs", nargs="+", type=_pair, metavar="LEAGUE:SEASON")
+    schedule.add_argument("--refresh-hours", type=float, default=6)
+    schedule.add_argument("--live-interval", type=float, default=60)
+    schedule.add_argument(
+        "--daily-quota", type=int, default=int(os.getenv("API_DAILY_QUOTA", "100"))
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        return run_batch_pipeline(
+            args.pairs,
+            max_concurrency=args.max_concurrency,
+            requests_per_minute=args.requests_per_minute,
+            publish_dir=args.publish_dir,
+        )
+    if args.command == "backfill":
+        return run_backfill(
+            args.pairs,
+            restart=args.restart,
+            publish_dir=args.publish_dir,
+            details=args.details,
+        )
+    if args.command == "schedule":
+        return run_scheduler(
+            args.pairs,
+            refresh_interval=args.refresh_hours * 60 * 60,
+            live_interval=args.live_interval,
+            daily_quota=args.daily_quota,
+            publish_dir=args.publish_dir,
+        )
+    if args.command == "run":
+        return run_full_pipeline(
+            args.league,
+            args.season,
+            incremental=not args.full,
+            use_cache=not args.no_cache,
+            publish_dir=args.publish_dir,
+            details=args.details,
+            max_detail_requests=args.detail_requests,
+            resume=not args.no_resume,
+        )
+    # No command: Premier League 2023, as before
+    return run_full_pipeline(
+        league_id=39, season=2023, incremental=True, publish_dir=args.publish_dir
+    )
+
+
 if __name__ == "__main__":
-    import os
     from dotenv import load_dotenv
 
     load_dotenv()
-
-    # Example: Process Premier League 2023 data
-    run_full_pipeline(league_id=39, season=2023)
+    main()
@@ -0,0 +1,88 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from apps.telegram_bot.async_storage import AsyncStorage
+
+
+class SlowStorage:
+    """Blocking storage whose queries take `delay` seconds"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def get_upcoming_fixtures(self, team_name=None, limit=10):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return [{"team": team_name}]
+
+    def close(self):
+        pass
+
+
+def test_query_times_out():
+    storage = AsyncStorage(SlowStorage(delay=0.5), timeout=0.05)
+
+    async def run():
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await storage.get_upcoming_fixtures()
+        return time.monotonic() - started
+
+    try:
+        assert asyncio.run(run()) < 0.4
+    finally:
+        storage.close()
+
+
+def test_concurrency_is_bounded():
+    slow = SlowStorage(delay=0.05)
+    storage = AsyncStorage(slow, max_workers=8, max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(
+            *(storage.get_upcoming_fixtures(str(i)) for i in range(6))
+        )
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        storage.close()
+    assert [rows[0]["team"] for rows in results] == [str(i) for i in range(6)]
+    assert slow.max_in_flight == 2
+
+
+def test_event_loop_stays_responsive():
+    storage = AsyncStorage(SlowStorage(delay=0.3))
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await storage.get_upcoming_fixtures()
+        task.cancel()
+        return ticks
+
+    try:
+        # A query blocking the loop would leave the ticker at 0 or 1
+        assert asyncio.run(run()) >= 10
+    finally:
+        storage.close()
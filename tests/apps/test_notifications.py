@@ -0,0 +1,95 @@
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from apps.telegram_bot.notifications import Notifier
+from apps.telegram_bot.rendering import SendQueue
+from apps.telegram_bot.subscriptions import SubscriptionStore
+
+
+@pytest.fixture
+def subscriptions(tmp_path):
+    store = SubscriptionStore(str(tmp_path / "subscriptions.db"))
+    yield store
+    store.close()
+
+
+def test_subscription_index(subscriptions, tmp_path):
+    subscriptions.follow(1, 42)
+    subscriptions.follow(2, 42)
+    subscriptions.follow(2, 66)
+
+    assert subscriptions.chats_for([42, 66]) == {1, 2}
+    assert subscriptions.unfollow(1, 42)
+    assert not subscriptions.unfollow(1, 42)
+    assert subscriptions.teams_followed(2) == [42, 66]
+
+    # Changes made by another worker are picked up
+    other = SubscriptionStore(str(tmp_path / "subscriptions.db"))
+    other.follow(3, 66)
+    other.close()
+    assert subscriptions.chats_for([66]) == {2, 3}
+
+
+def test_claim_events_is_compare_and_swap(subscriptions):
+    assert subscriptions.claim_events(None, 5)
+    assert not subscriptions.claim_events(None, 9)
+    assert subscriptions.claim_events(5, 7)
+    assert not subscriptions.claim_events(5, 8)  # another worker got there first
+    assert subscriptions.last_event_id() == 7
+
+
+class FakeStorage:
+    def __init__(self, events):
+        self.events = events
+
+    async def get_latest_change_event_id(self):
+        return 0
+
+    async def get_change_events(self, after_id=0, limit=1000):
+        return [e for e in self.events if e["event_id"] > after_id][:limit]
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+def _event(event_id, kind, home_goals, away_goals):
+    return {
+        "event_id": event_id,
+        "kind": kind,
+        "home_team_id": 42,
+        "home_team_name": "Arsenal",
+        "away_team_id": 66,
+        "away_team_name": "Liverpool",
+        "home_goals": home_goals,
+        "away_goals": away_goals,
+    }
+
+
+def test_notifier_batches_events_per_chat(subscriptions):
+    storage = FakeStorage([_event(1, "score", 1, 0), _event(2, "final", 1, 0)])
+    bot = FakeBot()
+    notifier = Notifier(
+        storage, subscriptions, SendQueue(per_chat_interval=0), bot, batch_size=10
+    )
+    subscriptions.follow(100, 42)
+    subscriptions.follow(100, 66)  # follows both teams: still one message
+    subscriptions.follow(200, 66)
+
+    async def scenario():
+        assert await notifier.poll_once() == 0  # first start: skip history
+        assert await notifier.poll_once() == 2
+        assert await notifier.poll_once() == 0
+
+    asyncio.run(scenario())
+    assert sorted(chat for chat, _ in bot.sent) == [100, 200]
+    assert dict(bot.sent)[200] == (
+        "⚽ Score update: Arsenal 1-0 Liverpool\n\n🏁 Full time: Arsenal 1-0 Liverpool"
+    )
@@ -0,0 +1,124 @@
+import pytest
+import asyncio
+import sys
+from pathlib import Path
+
+from telegram.error import BadRequest, RetryAfter
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from apps.telegram_bot.handlers import page
+from apps.telegram_bot.rendering import (
+    Renderer,
+    SendQueue,
+    page_buttons,
+    page_callback_data,
+    paginate,
+    parse_page_callback,
+)
+
+
+def test_paginate_by_count_and_length():
+    assert paginate("H\n", ["a", "b", "c"], per_page=2) == ["H\na\n\nb", "H\nc"]
+
+    pages = paginate("H\n", ["x" * 40] * 5, per_page=10, max_length=100)
+    assert all(len(page) <= 100 for page in pages)
+    assert sum(page.count("x" * 40) for page in pages) == 5
+
+
+def test_page_callbacks():
+    data = page_callback_data("results", 1, ["man", "utd"])
+    assert parse_page_callback(data) == ("results", 1, ["man", "utd"])
+
+    markup = page_buttons("results", ["arsenal"], 0, 3)
+    assert [b.callback_data for b in markup.inline_keyboard[0]] == [
+        "page:results:1:arsenal"
+    ]
+    assert page_buttons("results", ["arsenal"], 0, 1) is None
+    assert page_buttons("results", ["x" * 80], 0, 3) is None
+
+
+class FakeStorage:
+    def __init__(self):
+        self.version = 1
+        self.calls = 0
+
+    async def data_version(self):
+        return self.version
+
+    async def get_recent_result_lines(self, team_name=None, limit=5):
+        self.calls += 1
+        return [f"result {i}" for i in range(7)]
+
+
+def test_renderer_caches_per_data_version():
+    storage = FakeStorage()
+    renderer = Renderer(storage)
+
+    async def scenario():
+        first = await renderer.render("results", ["Arsenal"])
+        again = await renderer.render("results", ["arsenal", "FC"])
+        storage.version = 2
+        await renderer.render("results", ["Arsenal"])
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    assert len(first) == 2  # 5 results per page
+    assert again is first
+    assert storage.calls == 2
+
+
+def test_send_queue_paces_chats_and_retries():
+    now = [0.0]
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    queue = SendQueue(per_chat_interval=1.0, clock=lambda: now[0], sleep=sleep)
+    attempts = []
+
+    async def send():
+        attempts.append(now[0])
+        if len(attempts) == 1:
+            raise RetryAfter(5)
+        return "sent"
+
+    async def scenario():
+        assert await queue.send(1, send) == "sent"
+        await queue.send(1, send)
+
+    asyncio.run(scenario())
+    assert attempts == [0.0, 5.0, 6.0]
+    assert sleeps == [5, 1.0]
+
+
+class FakeQuery:
+    def __init__(self, data, error):
+        self.data = data
+        self.error = error
+
+    async def answer(self):
+        pass
+
+    async def edit_message_text(self, text, reply_markup=None):
+        raise BadRequest(self.error)
+
+
+class FakeUpdate:
+    def __init__(self, query):
+        self.callback_query = query
+        self.effective_chat = type("Chat", (), {"id": 1})()
+
+
+def test_unmodified_page_edit_is_ignored():
+    renderer = Renderer(FakeStorage())
+    data = page_callback_data("results", 0, ["Arsenal"])
+
+    async def tap(error):
+        await page(FakeUpdate(FakeQuery(data, error)), None, renderer, SendQueue())
+
+    # Tapping the button of the page already shown
+    asyncio.run(tap("Message is not modified: specified new message content ..."))
+    with pytest.raises(BadRequest):
+        asyncio.run(tap("Message to edit not found"))
@@ -0,0 +1,164 @@
+import pytest
+import asyncio
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from apps.telegram_bot.bot import FootballBot
+from apps.telegram_bot.webhook import WebhookApp
+from pipelines.storage import FootballDataStorage
+
+
+@pytest.fixture
+def telegram_stub():
+    """Stub Bot API recording the messages the bot sends"""
+    sent = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length).decode()
+            try:
+                params = json.loads(raw) if raw else {}
+            except ValueError:
+                from urllib.parse import parse_qsl
+
+                params = dict(parse_qsl(raw))
+            if self.path.endswith("/getMe"):
+                result = {
+                    "id": 1,
+                    "is_bot": True,
+                    "first_name": "Stub",
+                    "username": "stub_bot",
+                }
+            else:
+                sent.append(params)
+                result = {
+                    "message_id": len(sent),
+                    "date": 0,
+                    "chat": {"id": int(params["chat_id"]), "type": "private"},
+                    "text": params.get("text", ""),
+                }
+            body = json.dumps({"ok": True, "result": result}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/bot", sent
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "football.db"
+    storage = FootballDataStorage(db_path=str(path))
+    storage.merge_fixtures(
+        pd.DataFrame(
+            {
+                "fixture_id": [1],
+                "league_id": [39],
+                "league_name": ["Premier League"],
+                "season": [2023],
+                "home_team_id": [42],
+                "home_team_name": ["Arsenal"],
+                "away_team_id": [66],
+                "away_team_name": ["Liverpool"],
+                "home_goals": [2],
+                "away_goals": [1],
+                "date": pd.to_datetime(["2023-08-01"]),
+                "venue_name": ["Emirates"],
+                "referee": ["Ref"],
+                "status_short": ["FT"],
+            }
+        )
+    )
+    storage.close()
+    return path
+
+
+def _command_update(text, update_id=1):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 7, "type": "private"},
+            "from": {"id": 7, "is_bot": False, "first_name": "Fan"},
+            "text": text,
+            "entities": [
+                {"type": "bot_command", "offset": 0, "length": len(text.split()[0])}
+            ],
+        },
+    }
+
+
+async def _call(app, method, path, body=b"", headers=()):
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers)}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages[0]["status"], messages[1]["body"]
+
+
+async def _request(app, method, path, body=b"", headers=()):
+    return (await _call(app, method, path, body, headers))[0]
+
+
+def test_webhook_dispatches_updates(telegram_stub, db_path):
+    base_url, sent = telegram_stub
+
+    async def scenario():
+        bot = FootballBot(
+            "123:abc",
+            db_path=str(db_path),
+            read_only=True,
+            webhook=True,
+            base_url=base_url,
+            subscriptions_path=str(db_path.parent / "subscriptions.db"),
+        )
+        app = WebhookApp(bot, secret_token="s3cret")
+        await app.startup()
+        try:
+            secret = [(b"x-telegram-bot-api-secret-token", b"s3cret")]
+            update = json.dumps(_command_update("/results arsenal")).encode()
+
+            assert await _request(app, "GET", "/healthz") == 200
+            assert await _request(app, "POST", "/telegram", update) == 403
+            assert await _request(app, "POST", "/telegram", b"{", secret) == 400
+            assert await _request(app, "POST", "/telegram", update, secret) == 200
+
+            for _ in range(100):
+                if sent:
+                    break
+                await asyncio.sleep(0.05)
+
+            status, body = await _call(app, "GET", "/metrics")
+            assert status == 200
+            assert b'bot_command_seconds_count{command="results"}' in body
+            assert b'cache_misses_total{cache="replies"}' in body
+        finally:
+            await app.shutdown()
+
+    asyncio.run(scenario())
+
+    assert len(sent) == 1
+    assert "Arsenal 2-1 Liverpool" in sent[0]["text"]
@@ -0,0 +1,215 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+import run_pipeline
+from pipelines.checkpoints import Checkpoint, file_hash
+from pipelines.ingestion import FetchResult
+from pipelines.snapshots import current_snapshot
+from pipelines.storage import FootballDataStorage
+
+
+def _payload(league_id, fixtures=5, goals=1, status="FT"):
+    return {
+        "response": [
+            {
+                "fixture": {
+                    "id": league_id * 1000 + i,
+                    "date": f"2023-08-{10 + i}T19:00:00+00:00",
+                    "venue": {"name": "Turf Moor"},
+                    "status": {"short": status},
+                },
+                "league": {"id": league_id, "name": "League", "season": 2023},
+                "teams": {
+                    "home": {"id": 44, "name": "Burnley"},
+                    "away": {"id": 50, "name": "Manchester City"},
+                },
+                "goals": {"home": goals, "away": 0},
+            }
+            for i in range(fixtures)
+        ]
+    }
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Pipeline runs write data/... relative to the working directory"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("API_KEY", "test_key")
+    return tmp_path
+
+
+@pytest.fixture
+def storage(workdir):
+    storage = FootballDataStorage(db_path=str(workdir / "football.db"))
+    yield storage
+    storage.close()
+
+
+def test_checkpoint_manifest(tmp_path):
+    checkpoint = Checkpoint("unit", tmp_path)
+    assert checkpoint.status == "new"
+    checkpoint.record("processing", "abc", rows=3)
+
+    reopened = Checkpoint("unit", tmp_path)
+    assert reopened.status == "running"
+    assert reopened.completed("processing", "abc")["rows"] == 3
+    assert reopened.completed("processing", "other") is None
+    reopened.finish()
+    assert Checkpoint("unit", tmp_path).status == "complete"
+
+    artifact = reopened.artifact("data.txt")
+    artifact.write_text("x")
+    assert file_hash(artifact) == file_hash(artifact) != file_hash(__file__)
+
+
+def test_unchanged_response_skips_stages(storage, monkeypatch):
+    payloads = [_payload(39), _payload(39), _payload(39, goals=2)]
+    monkeypatch.setattr(run_pipeline, "fetch_fixtures", lambda **_: payloads.pop(0))
+
+    first = run_pipeline.run_full_pipeline(39, 2023, storage=storage, use_cache=False)
+    assert first["loaded_count"] == 5
+
+    second = run_pipeline.run_full_pipeline(39, 2023, storage=storage, use_cache=False)
+    assert list(second["metrics"]["stages"]) == ["fetch"]
+    assert second["loaded_count"] == 0
+
+    third = run_pipeline.run_full_pipeline(39, 2023, storage=storage, use_cache=False)
+    assert "load" in third["metrics"]["stages"]
+
+
+def test_full_runs_update_stored_fixtures(storage, monkeypatch):
+    payloads = [_payload(39, goals=None, status="NS"), _payload(39, goals=2)]
+    monkeypatch.setattr(run_pipeline, "fetch_fixtures", lambda **_: payloads.pop(0))
+    run_pipeline.run_full_pipeline(39, 2023, storage=storage, use_cache=False)
+
+    # The matches were played: a full (not incremental) run updates them
+    result = run_pipeline.run_full_pipeline(39, 2023, storage=storage, use_cache=False)
+    assert result["loaded_count"] == 5
+    assert [e["kind"] for e in storage.get_change_events()] == ["final"] * 5
+
+
+def test_duplicated_fixture_still_moves_the_watermark(storage, monkeypatch):
+    monkeypatch.setattr(run_pipeline, "fetch_fixtures", lambda **_: _payload(39))
+    options = dict(storage=storage, use_cache=False, incremental=True)
+    run_pipeline.run_full_pipeline(39, 2023, **options)
+    watermark = storage.get_watermark(39, 2023)
+
+    # Fetched by date and again by ID: the later copy is the newer one
+    stale, fresh = _payload(39, 1, goals=1), _payload(39, 1, goals=3)
+    overlap = {"response": stale["response"] + fresh["response"]}
+    monkeypatch.setattr(run_pipeline, "fetch_fixtures_incremental", lambda **_: overlap)
+    run_pipeline.run_full_pipeline(39, 2023, **options)
+
+    assert storage.get_watermark(39, 2023) > watermark
+    assert storage.get_change_events()[-1]["home_goals"] == 3
+
+
+def test_batch_runs_update_stored_fixtures(workdir, monkeypatch):
+    payloads = [_payload(39, goals=None, status="NS"), _payload(39, goals=2)]
+    monkeypatch.setattr(
+        run_pipeline,
+        "fetch_fixtures_batch",
+        lambda pairs, **_: [FetchResult(39, 2023, data=payloads.pop(0))],
+    )
+    run_pipeline.run_batch_pipeline([(39, 2023)], use_cache=False)
+    summary = run_pipeline.run_batch_pipeline([(39, 2023)], use_cache=False)
+
+    assert summary[0]["loaded_count"] == 5
+    storage = FootballDataStorage()
+    try:
+        assert storage.get_recent_results(limit=1)[0]["home_goals"] == 2
+    finally:
+        storage.close()
+
+
+def test_empty_response_skips_the_lake(storage, monkeypatch):
+    monkeypatch.setattr(run_pipeline, "fetch_fixtures", lambda **_: {"response": []})
+
+    result = run_pipeline.run_full_pipeline(39, 2023, storage=storage, use_cache=False)
+
+    assert result["processed_file"] is None
+    assert result["loaded_count"] == 0
+
+
+def test_unchanged_run_publishes_a_missing_snapshot(storage, monkeypatch):
+    monkeypatch.setattr(run_pipeline, "fetch_fixtures", lambda **_: _payload(39))
+    monkeypatch.setattr(
+        run_pipeline, "fetch_fixtures_incremental", lambda **_: {"response": []}
+    )
+    options = dict(storage=storage, use_cache=False, incremental=True)
+    run_pipeline.run_full_pipeline(39, 2023, **options)
+    assert current_snapshot("snapshots") is None
+
+    # Nothing changed, but the bot has no snapshot to serve yet
+    result = run_pipeline.run_full_pipeline(
+        39, 2023, publish_dir="snapshots", **options
+    )
+    assert result["loaded_count"] == 0
+    assert "publish" in result["metrics"]["stages"]
+    assert current_snapshot("snapshots") is not None
+
+
+def test_recreated_database_and_lake_are_reloaded(workdir, monkeypatch):
+    monkeypatch.setattr(run_pipeline, "fetch_fixtures", lambda **_: _payload(39))
+    db_path = workdir / "football.db"
+
+    for run in range(2):
+        storage = FootballDataStorage(db_path=str(db_path))
+        try:
+            result = run_pipeline.run_full_pipeline(
+                39, 2023, storage=storage, use_cache=False
+            )
+        finally:
+            storage.close()
+        # Same response, but a new database and an empty lake
+        assert result["loaded_count"] == result["total_count"] == 5
+        assert "lake_write" in result["metrics"]["stages"]
+        db_path.unlink()
+        shutil.rmtree(workdir / "data" / "processed")
+
+
+def test_crashed_run_resumes_without_fetching(storage, monkeypatch):
+    monkeypatch.setattr(run_pipeline, "fetch_fixtures", lambda **_: _payload(39))
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(storage, "load_fixtures", crash)
+        with pytest.raises(RuntimeError):
+            run_pipeline.run_full_pipeline(39, 2023, storage=storage, use_cache=False)
+
+    def no_fetch(**_):
+        raise AssertionError("resumed run fetched again")
+
+    monkeypatch.setattr(run_pipeline, "fetch_fixtures", no_fetch)
+    resumed = run_pipeline.run_full_pipeline(39, 2023, storage=storage, use_cache=False)
+
+    assert resumed["metrics"]["resumed"] is True
+    assert list(resumed["metrics"]["stages"]) == ["load"]
+    assert storage.get_fixture_count() == 5
+    assert Checkpoint("pipeline_39_2023", "data/checkpoints").status == "complete"
+
+
+def test_backfill_retries_only_unfinished_pairs(workdir, monkeypatch):
+    fetched = []
+
+    def fetch(league_id, **_):
+        fetched.append(league_id)
+        if league_id == 140 and fetched.count(140) == 1:
+            raise RuntimeError("API down")
+        return _payload(league_id)
+
+    monkeypatch.setattr(run_pipeline, "fetch_fixtures", fetch)
+    pairs = [(39, 2023), (140, 2023), (78, 2023)]
+
+    first = run_pipeline.run_backfill(pairs, use_cache=False)
+    assert [entry.get("error") is None for entry in first] == [True, False, True]
+
+    second = run_pipeline.run_backfill(pairs, use_cache=False)
+    assert [entry.get("skipped", False) for entry in second] == [True, False, True]
+    assert fetched == [39, 140, 78, 140]
@@ -0,0 +1,120 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from pipelines.fixture_index import FixtureIndex
+from pipelines.storage import FootballDataStorage
+
+TEAMS = [(42, "Arsenal"), (66, "Liverpool"), (50, "Chelsea"), (47, "Tottenham")]
+
+
+def _fixtures():
+    now = datetime.now(timezone.utc).replace(tzinfo=None, second=0, microsecond=0)
+    rows = []
+    for fixture_id in range(1, 41):
+        home = TEAMS[fixture_id % 4]
+        away = TEAMS[(fixture_id + 1 + fixture_id // 4) % 4]
+        if home == away:
+            away = TEAMS[(fixture_id + 2) % 4]
+        date = now + timedelta(days=fixture_id - 20, hours=fixture_id % 5)
+        played = date < now
+        rows.append(
+            {
+                "fixture_id": fixture_id,
+                "league_id": 39,
+                "league_name": "Premier League",
+                "season": 2023,
+                "home_team_id": home[0],
+                "home_team_name": home[1],
+                "away_team_id": away[0],
+                "away_team_name": away[1],
+                "home_goals": fixture_id % 4 if played else None,
+                "away_goals": fixture_id % 3 if played else None,
+                "date": pd.Timestamp(date),
+                "venue_name": None if fixture_id % 7 == 0 else f"Stadium {home[0]}",
+                "referee": "Ref",
+                "status_short": "FT" if played else "NS",
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = FootballDataStorage(db_path=str(tmp_path / "test.db"))
+    storage.load_fixtures(_fixtures())
+    yield storage
+    storage.close()
+
+
+LOOKUPS = {
+    "upcoming": lambda s: s.get_upcoming_fixtures(),
+    "upcoming_team": lambda s: s.get_upcoming_fixtures("Arsenal", limit=3),
+    "upcoming_many": lambda s: s.get_upcoming_fixtures(limit=100),
+    "recent": lambda s: s.get_recent_results(),
+    "recent_team": lambda s: s.get_recent_results("Chelsea", limit=7),
+    "recent_lines": lambda s: s.get_recent_result_lines("Liverpool"),
+    "upcoming_lines": lambda s: s.get_upcoming_fixture_lines("Tottenham"),
+    "standings": lambda s: s.get_league_standings(39),
+    "standings_season": lambda s: s.get_league_standings(39, 2023),
+    "unknown_team": lambda s: s.get_recent_results("Nobody FC"),
+    "unknown_league": lambda s: s.get_league_standings(140),
+}
+
+
+@pytest.mark.parametrize("lookup", LOOKUPS)
+def test_index_answers_like_sql(storage, lookup):
+    expected = LOOKUPS[lookup](storage)
+    storage.use_fixture_index = True
+    assert LOOKUPS[lookup](storage) == expected
+
+
+def test_index_answers_like_sql_on_a_non_utc_host(tmp_path):
+    script = f"""
+import sys
+sys.path.append({str(Path(__file__).parent.parent.parent)!r})
+sys.path.append({str(Path(__file__).parent)!r})
+from test_fixture_index import LOOKUPS, _fixtures
+from pipelines.storage import FootballDataStorage
+storage = FootballDataStorage(db_path={str(tmp_path / "tz.db")!r})
+df = _fixtures()
+df["date"] = df["date"].dt.tz_localize("UTC")  # as processed from the API
+storage.load_fixtures(df)
+expected = {{name: lookup(storage) for name, lookup in LOOKUPS.items()}}
+storage.use_fixture_index = True
+for name, lookup in LOOKUPS.items():
+    assert lookup(storage) == expected[name], name
+"""
+    env = {**os.environ, "TZ": "Asia/Tokyo"}
+    subprocess.run([sys.executable, "-c", script], check=True, env=env)
+
+
+def test_index_follows_data_version(storage):
+    storage.use_fixture_index = True
+    before = storage.fixture_index
+    assert len(before) == 40
+
+    df = _fixtures()
+    df.loc[df["status_short"] == "NS", "status_short"] = "PST"
+    storage.merge_fixtures(df)
+
+    assert storage.fixture_index is not before
+    assert storage.get_upcoming_fixtures() == []
+
+
+def test_empty_index(tmp_path):
+    storage = FootballDataStorage(db_path=str(tmp_path / "empty.db"))
+    try:
+        index = FixtureIndex.build(storage.conn)
+    finally:
+        storage.close()
+    assert len(index) == 0
+    assert index.upcoming(None, 5, datetime(2024, 1, 1)) == []
+    assert index.recent([42], 5) == []
+    assert index.league_standings(39, None) == []
@@ -0,0 +1,135 @@
+import pytest
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from pipelines.http_cache import ResponseCache
+from pipelines.ingestion import APIError, fetch_fixtures
+
+
+@pytest.fixture
+def etag_api():
+    """Stub API that supports ETag revalidation"""
+    calls = []
+    body = json.dumps({"response": [{"fixture": {"id": 1}}]}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            calls.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", calls
+    server.shutdown()
+    server.server_close()
+
+
+def test_fresh_entries_skip_the_network(etag_api, tmp_path):
+    base_url, calls = etag_api
+    cache = ResponseCache(tmp_path / "cache")
+
+    first = fetch_fixtures(39, 2023, "key", base_url=base_url, cache=cache)
+    second = fetch_fixtures(39, 2023, "key", base_url=base_url, cache=cache)
+
+    assert first == second
+    assert calls == [None]
+
+
+def test_stale_entries_are_revalidated(etag_api, tmp_path):
+    base_url, calls = etag_api
+    cache = ResponseCache(tmp_path / "cache", ttls={"fixtures": 0})
+
+    first = fetch_fixtures(39, 2023, "key", base_url=base_url, cache=cache)
+    second = fetch_fixtures(39, 2023, "key", base_url=base_url, cache=cache)
+
+    assert first == second
+    assert calls == [None, '"v1"']  # second request answered with 304
+
+
+def test_error_payloads_are_not_cached(tmp_path):
+    # API-Football reports quota/auth failures as 200s with `errors`
+    bodies = [
+        {"errors": {"requests": "You have reached the request limit"}, "response": []},
+        {"errors": [], "response": [{"fixture": {"id": 1}}]},
+    ]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps(bodies.pop(0)).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    cache = ResponseCache(tmp_path / "cache")
+    try:
+        with pytest.raises(APIError, match="request limit"):
+            fetch_fixtures(39, 2023, "key", base_url=base_url, cache=cache)
+        data = fetch_fixtures(39, 2023, "key", base_url=base_url, cache=cache)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert data["response"] == [{"fixture": {"id": 1}}]
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(tmp_path / "cache", max_bytes=250)
+    for i in range(2):
+        cache.put(f"k{i}", "fixtures", bytes([i]) * 100)
+    # k0 was used recently, so k1 is the least recently used entry
+    cache.get("k0")
+    cache.put("k2", "fixtures", b"x" * 100)
+
+    assert cache.total_bytes() <= 250
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None
+    assert cache.get("k2") is not None
+
+
+def test_put_keeps_a_running_size(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path / "cache", max_bytes=250)
+    counted = []
+    total_bytes = cache.total_bytes
+    monkeypatch.setattr(
+        cache, "total_bytes", lambda: counted.append(1) or total_bytes()
+    )
+    for i in range(2):
+        cache.put(f"k{i}", "fixtures", bytes([i]) * 100)
+    assert counted == []  # under max_bytes nothing is re-counted from disk
+
+    cache.put("k2", "fixtures", b"x" * 100)
+    assert len(counted) == 1
+    assert cache._total == total_bytes() == 200
+
+
+def test_identical_bodies_share_a_blob(tmp_path):
+    cache = ResponseCache(tmp_path / "cache")
+    a = cache.put(
+        ResponseCache.make_key("fixtures", {"a": 1, "b": 2}), "fixtures", b"{}"
+    )
+    b = cache.put(ResponseCache.make_key("fixtures", {"ids": 5}), "fixtures", b"{}")
+
+    assert a.blob == b.blob
+    assert cache.total_bytes() == 2
+    assert ResponseCache.make_key("fixtures", {"b": 2, "a": 1}) == a.key
@@ -70,3 +70,121 @@ def test_main(mock_save, mock_fetch, tmp_path):
     main()
     mock_fetch.assert_called_once_with(league_id=39, season=2023, api_key="test_key")
     mock_save.assert_called_once()
+
+
+# ---- Test fetch_fixtures_batch() against a local stub server ----
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from urllib.parse import urlparse, parse_qs
+from pipelines.ingestion import (
+    RateLimiter,
+    fetch_fixture_details,
+    fetch_fixtures_batch,
+    fetch_fixtures_incremental,
+)
+
+@pytest.fixture
+def stub_api():
+    """Local HTTP server mimicking the /fixtures endpoint"""
+    seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            if "ids" in query:
+                ids = [int(i) for i in query["ids"][0].split("-")]
+                seen.append((query, self.client_address))
+                body = json.dumps(
+                    {"response": [{"fixture": {"id": i}} for i in ids]}
+                ).encode()
+                status = 200
+            elif (league := int(query["league"][0])) == 999:
+                seen.append((league, self.client_address))
+                body, status = b'{"errors": ["bad league"]}', 500
+            else:
+                seen.append((league, self.client_address))
+                body = json.dumps(
+                    {"parameters": query, "response": [{"fixture": {"id": league}}]}
+                ).encode()
+                status = 200
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_fixtures_batch(stub_api):
+    base_url, seen = stub_api
+    pairs = [(39, 2023), (140, 2023), (999, 2023), (78, 2022)]
+
+    results = fetch_fixtures_batch(
+        pairs, api_key="test_key", max_concurrency=2, base_url=base_url
+    )
+
+    # Results keep input order and failures don't abort the batch
+    assert [(r.league_id, r.season) for r in results] == pairs
+    assert [r.ok for r in results] == [True, True, False, True]
+    assert results[0].data["response"][0]["fixture"]["id"] == 39
+    assert all(r.latency > 0 for r in results)
+    # Pooled keep-alive session: fewer connections than requests
+    assert len(seen) == 4
+    assert len({addr for _, addr in seen}) <= 2
+
+
+def test_rate_limiter_waits_for_window():
+    now = [0.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(2, period=60, clock=lambda: now[0], sleep=fake_sleep)
+    for _ in range(3):
+        limiter.acquire()
+
+    assert sleeps == [60]
+
+
+def test_fetch_fixtures_incremental(stub_api):
+    base_url, seen = stub_api
+    since = datetime(2024, 1, 10, 12, 0)
+    open_ids = list(range(1000, 1025))  # 25 stale fixtures -> 2 `ids` requests
+
+    result = fetch_fixtures_incremental(
+        39, 2023, "test_key", since=since, open_fixture_ids=open_ids, base_url=base_url
+    )
+
+    window = result["parameters"]
+    assert window["from"] == ["2024-01-09"]
+    assert "to" in window
+    assert len(seen) == 3
+    assert {item["fixture"]["id"] for item in result["response"]} == {39, *open_ids}
+    assert result["results"] == 26
+
+
+def test_fetch_fixture_details_batches_ids(stub_api):
+    base_url, seen = stub_api
+    fixture_ids = list(range(1, 46))  # 45 fixtures -> 3 `ids` requests
+
+    result = fetch_fixture_details(
+        fixture_ids, "test_key", max_requests=2, base_url=base_url
+    )
+
+    assert len(seen) == 2
+    assert all(len(query["ids"][0].split("-")) <= 20 for query, _ in seen)
+    assert result["results"] == 40
+    # Over the request budget: left for the next run
+    assert result["pending"] == list(range(41, 46))
@@ -0,0 +1,76 @@
+import pytest
+import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from pipelines.lake import compact, partition_glob, read_fixtures, write_partitioned
+from pipelines.storage import FootballDataStorage
+
+
+def _fixtures(ids, league_id=39, season=2023, home_goals=1):
+    n = len(ids)
+    return pd.DataFrame(
+        {
+            "fixture_id": ids,
+            "league_id": [league_id] * n,
+            "league_name": ["League"] * n,
+            "season": [season] * n,
+            "home_team_id": [42] * n,
+            "home_team_name": ["Arsenal"] * n,
+            "away_team_id": [66] * n,
+            "away_team_name": ["Liverpool"] * n,
+            "home_goals": [home_goals] * n,
+            "away_goals": [0] * n,
+            "date": pd.to_datetime(["2023-08-01"] * n, utc=True),
+            "venue_name": ["Emirates"] * n,
+            "referee": [None] * n,
+            "status_short": ["FT"] * n,
+        }
+    )
+
+
+@pytest.fixture
+def lake(tmp_path):
+    lake_dir = tmp_path / "lake"
+    write_partitioned(_fixtures([1, 2]), lake_dir)
+    write_partitioned(_fixtures([2, 3], home_goals=5), lake_dir)
+    write_partitioned(_fixtures([10], league_id=140, season=2022), lake_dir)
+    return lake_dir
+
+
+def test_partition_layout(lake):
+    assert len(list((lake / "league_id=39" / "season=2023").glob("*.parquet"))) == 2
+    assert (lake / "league_id=140" / "season=2022").is_dir()
+    assert partition_glob(lake, league_id=39).endswith(
+        "league_id=39/season=*/*.parquet"
+    )
+
+
+def test_read_fixtures_prunes_and_keeps_latest(lake):
+    table = read_fixtures(lake, league_id=39, season=2023)
+    df = table.to_pandas().sort_values("fixture_id")
+
+    assert df["fixture_id"].tolist() == [1, 2, 3]
+    assert df["home_goals"].tolist() == [1, 5, 5]  # fixture 2 from the newer file
+    assert set(df["league_id"]) == {39}
+    assert read_fixtures(lake).num_rows == 4
+
+
+def test_compact_merges_small_files(lake):
+    assert compact(lake) == 1
+
+    files = list((lake / "league_id=39" / "season=2023").glob("*.parquet"))
+    assert len(files) == 1
+    df = read_fixtures(lake, league_id=39).to_pandas().sort_values("fixture_id")
+    assert df["home_goals"].tolist() == [1, 5, 5]
+
+
+def test_storage_load_partitioned(lake, tmp_path):
+    storage = FootballDataStorage(db_path=str(tmp_path / "test.db"))
+    try:
+        assert storage.load_partitioned(lake, league_id=39, season=2023) == 3
+        assert storage.get_fixture_count() == 3
+        assert storage.load_partitioned(lake, league_id=140) == 1
+    finally:
+        storage.close()
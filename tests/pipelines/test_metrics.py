@@ -0,0 +1,107 @@
+import json
+import sys
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from pipelines.metrics import (
+    MetricsRegistry,
+    PipelineRun,
+    cache_collector,
+    serve_metrics,
+)
+from pipelines.query_cache import QueryCache
+
+
+def test_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("api_requests_total", "API calls")
+    requests.inc(endpoint="fixtures", outcome="ok")
+    requests.inc(2, endpoint="fixtures", outcome="ok")
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    latency.observe(0.05, command="fixtures")
+    latency.observe(0.5, command="fixtures")
+    latency.observe(5, command="fixtures")
+
+    text = registry.render()
+
+    assert "# TYPE api_requests_total counter" in text
+    assert 'api_requests_total{endpoint="fixtures",outcome="ok"} 3' in text
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{command="fixtures",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{command="fixtures",le="1"} 2' in text
+    assert 'latency_seconds_bucket{command="fixtures",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{command="fixtures"} 3' in text
+    assert 'latency_seconds_sum{command="fixtures"} 5.55' in text
+
+
+def test_metric_kind_conflict():
+    registry = MetricsRegistry()
+    registry.counter("requests")
+    assert registry.counter("requests") is registry.counter("requests")
+    with pytest.raises(ValueError):
+        registry.histogram("requests")
+
+
+def test_timer_records_failures():
+    registry = MetricsRegistry()
+    latency = registry.histogram("seconds")
+    with pytest.raises(RuntimeError):
+        with latency.time(stage="load"):
+            raise RuntimeError("boom")
+    assert latency.count(stage="load") == 1
+
+
+def test_cache_collector():
+    registry = MetricsRegistry()
+    cache = QueryCache()
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("b")
+    collector = registry.register_collector(cache_collector("queries", cache))
+
+    text = registry.render()
+    assert 'cache_hits_total{cache="queries"} 1' in text
+    assert 'cache_hit_ratio{cache="queries"} 0.5' in text
+
+    registry.unregister_collector(collector)
+    assert "cache_hits_total" not in registry.render()
+
+
+def test_pipeline_run_summary(tmp_path):
+    registry = MetricsRegistry()
+    run = PipelineRun("batch", registry=registry, pairs=2)
+    for rows in (100, 50):
+        with run.stage("processing") as stage:
+            stage["rows"] = rows
+    with pytest.raises(ValueError):
+        with run.stage("load"):
+            raise ValueError("bad file")
+    summary = run.finish("failed")
+
+    assert summary["pairs"] == 2
+    assert summary["status"] == "failed"
+    assert summary["stages"]["processing"]["rows"] == 150
+    assert summary["stages"]["processing"]["rows_per_sec"] > 0
+    assert "load" in summary["stages"]
+    assert registry.histogram("pipeline_stage_seconds").count(stage="processing") == 2
+
+    written = json.loads(run.write(tmp_path).read_text())
+    assert written["stages"]["processing"]["rows"] == 150
+
+
+def test_metrics_endpoint():
+    registry = MetricsRegistry()
+    registry.counter("bot_commands_total").inc(command="fixtures", outcome="ok")
+    server = serve_metrics(0, host="127.0.0.1", registry=registry)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'bot_commands_total{command="fixtures",outcome="ok"} 1' in body
@@ -1,12 +1,25 @@
 import pytest
 import pandas as pd
 import os
-#import json
+import json
+import pyarrow.parquet as pq
 from unittest.mock import patch, mock_open
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
-from pipelines.processing import process_fixtures, save_processed_data
+from pipelines.processing import (
+    DETAIL_SCHEMAS,
+    PROCESSED_SCHEMA,
+    fixture_details_to_tables,
+    fixtures_to_table,
+    iter_fixtures,
+    process_directory,
+    process_fixtures,
+    process_fixtures_streaming,
+    read_fixture_items,
+    save_processed_data,
+)
+
 # Sample raw API data for testing
 SAMPLE_RAW_DATA = {
     "response": [
@@ -59,3 +72,145 @@ def test_save_processed_data_error_handling(mock_to_parquet):
 
     with pytest.raises(Exception, match="Save failed"):
         save_processed_data(df, "dummy_path.parquet")
+
+
+def _raw_fixture(i, goals=None, referee=None):
+    return {
+        "fixture": {
+            "id": i,
+            "referee": referee,
+            "date": "2023-08-11T19:00:00+00:00",
+            "venue": {"id": 1, "name": "Turf Moor"},
+            "status": {"short": "FT" if goals is not None else "NS"},
+        },
+        "league": {"id": 39, "name": "Premier League", "season": 2023},
+        "teams": {
+            "home": {"id": 44, "name": "Burnley"},
+            "away": {"id": 50, "name": "Manchester City"},
+        },
+        "goals": {"home": goals, "away": goals},
+    }
+
+
+@pytest.fixture
+def raw_file(tmp_path):
+    data = {
+        "get": "fixtures",
+        "parameters": {"league": "39", "season": "2023"},
+        "errors": [],
+        "results": 25,
+        "paging": {"current": 1, "total": 1},
+        "response": [
+            _raw_fixture(i, goals=i % 4 or None, referee="Ref \"é\"" if i % 2 else None)
+            for i in range(1, 26)
+        ],
+    }
+    path = tmp_path / "raw" / "fixtures.json"
+    path.parent.mkdir()
+    path.write_text(json.dumps(data, indent=1))
+    return path
+
+
+def test_iter_fixtures_matches_json_load(raw_file):
+    # A tiny chunk size forces values to straddle read boundaries
+    streamed = list(iter_fixtures(raw_file, chunk_size=7))
+    assert streamed == json.loads(raw_file.read_text())["response"]
+    assert read_fixture_items(raw_file) == streamed
+
+
+def test_process_fixtures_streaming(raw_file, tmp_path):
+    output = tmp_path / "processed" / "streamed.parquet"
+
+    rows = process_fixtures_streaming(raw_file, output, batch_size=10)
+
+    assert rows == 25
+    assert pq.ParquetFile(output).num_row_groups == 3
+    streamed = pd.read_parquet(output)
+    expected = process_fixtures(raw_file)
+    assert streamed["fixture_id"].tolist() == expected["fixture_id"].tolist()
+    assert streamed["referee"].tolist() == expected["referee"].tolist()
+
+
+def test_fixtures_to_table_schema(raw_file, tmp_path):
+    fixtures = json.loads(raw_file.read_text())["response"]
+
+    table = fixtures_to_table(fixtures)
+
+    assert table.schema == PROCESSED_SCHEMA
+    assert str(table.schema.field("date").type) == "timestamp[ms, tz=UTC]"
+    assert table.column("home_goals").null_count == 6  # i % 4 == 0 -> NS
+    df = process_fixtures(raw_file)
+    assert str(df["home_goals"].dtype) == "Int16"
+
+    # Processed frames round-trip through save_processed_data with the schema
+    path = save_processed_data(df, tmp_path / "typed.parquet")
+    assert pq.read_schema(path).remove_metadata() == PROCESSED_SCHEMA
+
+
+def test_process_directory_dedupes_and_partitions(tmp_path):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    old = raw_dir / "fixtures_39_2023_2023-08-01.json"
+    old.write_text(json.dumps({"response": [_raw_fixture(1), _raw_fixture(2)]}))
+    new = raw_dir / "fixtures_39_2023_2023-08-02.json"
+    new.write_text(json.dumps({"response": [_raw_fixture(1, goals=2)]}))
+    # Restored from a backup: modification times no longer follow the names
+    os.utime(new, (1_000_000, 1_000_000))
+    other = _raw_fixture(3)
+    other["league"].update(id=140, season=2022)
+    (raw_dir / "fixtures_140_2022.json").write_text(json.dumps({"response": [other]}))
+    (raw_dir / "broken.json").write_bytes(b"\x00" * 16)
+
+    summary = process_directory(raw_dir, tmp_path / "out", max_workers=2)
+
+    assert summary["files"] == 3
+    assert summary["rows"] == 4
+    assert summary["fixtures"] == 3
+    assert (tmp_path / "out" / "league_id=39" / "season=2023").is_dir()
+    assert (tmp_path / "out" / "league_id=140" / "season=2022").is_dir()
+    result = pd.read_parquet(tmp_path / "out").sort_values("fixture_id")
+    assert result["home_goals"].iloc[0] == 2  # newest snapshot wins
+    assert pd.isna(result["home_goals"].iloc[1])
+
+
+def test_fixture_details_to_tables():
+    item = {
+        "fixture": {"id": 7, "status": {"short": "FT"}},
+        "events": [
+            {
+                "time": {"elapsed": 45, "extra": 2},
+                "team": {"id": 42},
+                "player": {"id": 9, "name": "Striker"},
+                "assist": {"id": None, "name": None},
+                "type": "Goal",
+                "detail": "Penalty",
+                "comments": None,
+            }
+        ],
+        "lineups": [
+            {
+                "team": {"id": 42},
+                "formation": "4-3-3",
+                "startXI": [{"player": {"id": 1, "name": "Keeper", "pos": "G"}}],
+                "substitutes": [{"player": {"id": 12, "name": "Sub", "pos": "M"}}],
+            }
+        ],
+        "statistics": [
+            {
+                "team": {"id": 42},
+                "statistics": [
+                    {"type": "Ball Possession", "value": "61%"},
+                    {"type": "Shots on Goal", "value": 5},
+                    {"type": "Red Cards", "value": None},
+                ],
+            }
+        ],
+    }
+
+    tables = fixture_details_to_tables([item, {"fixture": {"id": 8}}])
+
+    assert {name: t.schema for name, t in tables.items()} == DETAIL_SCHEMAS
+    assert tables["fetched"].column("fixture_id").to_pylist() == [7, 8]
+    assert tables["events"].to_pylist()[0]["extra"] == 2
+    assert tables["lineups"].column("starter").to_pylist() == [True, False]
+    assert tables["statistics"].column("value").to_pylist() == [61.0, 5.0, None]
@@ -0,0 +1,76 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from pipelines.query_cache import DataVersionTracker, QueryCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_and_stats():
+    clock = FakeClock()
+    cache = QueryCache(ttl=10, clock=clock)
+    cache.put("a", [1])
+
+    assert cache.get("a") == [1]
+    clock.now = 11
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert len(cache) == 0
+
+
+def test_lru_bound():
+    cache = QueryCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_errors_are_not_cached():
+    cache = QueryCache()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", fail)
+    assert cache.get_or_compute("k", lambda: []) == []
+    assert cache.get_or_compute("k", fail) == []
+
+
+def test_version_change_clears_cache():
+    clock = FakeClock()
+    cache = QueryCache(clock=clock)
+    version = [1]
+    changes = []
+    tracker = DataVersionTracker(
+        cache,
+        lambda: version[0],
+        check_interval=5,
+        clock=clock,
+        on_change=lambda: changes.append(True),
+    )
+    tracker.check()
+    cache.put("k", "old")
+
+    version[0] = 2
+    tracker.check()  # within the check interval: not noticed yet
+    assert cache.get("k") == "old"
+
+    clock.now = 6
+    tracker.check()
+    assert cache.get("k") is None
+    assert changes == [True]
@@ -0,0 +1,233 @@
+import pytest
+import json
+import os
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from pipelines.scheduler import PipelineScheduler, QuotaBudget
+from pipelines.storage import FootballDataStorage
+
+KICKOFF = datetime(2024, 1, 6, 15, 0)
+
+
+@pytest.fixture
+def live_api():
+    """Stub API answering `ids=` requests with the fixtures in the second half"""
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            ids = [int(i) for i in query["ids"][0].split("-")]
+            calls.append(ids)
+            body = json.dumps(
+                {
+                    "response": [
+                        {
+                            "fixture": {
+                                "id": i,
+                                "date": f"{KICKOFF.isoformat()}+00:00",
+                                "venue": {"name": "Emirates"},
+                                "status": {"short": "2H"},
+                            },
+                            "league": {
+                                "id": 39,
+                                "name": "Premier League",
+                                "season": 2023,
+                            },
+                            "teams": {
+                                "home": {"id": 42, "name": "Arsenal"},
+                                "away": {"id": 66, "name": "Liverpool"},
+                            },
+                            "goals": {"home": 1, "away": 0},
+                        }
+                        for i in ids
+                    ]
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", calls
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = FootballDataStorage(db_path=str(tmp_path / "test.db"))
+    dates = [KICKOFF, KICKOFF + timedelta(hours=5), KICKOFF - timedelta(days=1)]
+    storage.merge_fixtures(
+        pd.DataFrame(
+            {
+                "fixture_id": [1, 2, 3],
+                "league_id": [39] * 3,
+                "league_name": ["Premier League"] * 3,
+                "season": [2023] * 3,
+                "home_team_id": [42] * 3,
+                "home_team_name": ["Arsenal"] * 3,
+                "away_team_id": [66] * 3,
+                "away_team_name": ["Liverpool"] * 3,
+                "home_goals": [0, None, 2],
+                "away_goals": [0, None, 2],
+                "date": pd.to_datetime(dates),
+                "venue_name": ["Emirates"] * 3,
+                "referee": [None] * 3,
+                "status_short": ["1H", "NS", "FT"],
+            }
+        )
+    )
+    yield storage
+    storage.close()
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler(storage, base_url, clock, refresh=None, **options):
+    refreshes = []
+    scheduler = PipelineScheduler(
+        [(39, 2023)],
+        storage,
+        "key",
+        refresh=refresh or (lambda *args: refreshes.append(args[:2])),
+        jitter=0,
+        base_url=base_url,
+        clock=clock,
+        rng=random.Random(0),
+        **options,
+    )
+    return scheduler, refreshes
+
+
+def test_live_window(storage):
+    now = KICKOFF + timedelta(minutes=30)
+    assert storage.get_live_fixtures(now) == [1]
+    assert storage.get_live_fixtures(now, league_ids=[140]) == []
+    assert storage.get_live_fixtures(KICKOFF + timedelta(hours=4)) == []
+    assert storage.get_next_kickoff(now) == KICKOFF + timedelta(hours=5)
+
+
+def test_live_window_on_a_non_utc_host(tmp_path):
+    # API dates are timezone-aware UTC; the host's zone must not shift them
+    script = f"""
+import sys
+from datetime import timedelta
+import pandas as pd
+sys.path.append({str(Path(__file__).parent.parent.parent)!r})
+from pipelines.storage import FootballDataStorage, utcnow
+storage = FootballDataStorage(db_path={str(tmp_path / "tz.db")!r})
+now = utcnow()
+kickoffs = [now - timedelta(minutes=30), now + timedelta(hours=2)]
+storage.merge_fixtures(pd.DataFrame({{
+    "fixture_id": [1, 2], "league_id": [39] * 2, "league_name": ["PL"] * 2,
+    "season": [2023] * 2, "home_team_id": [42] * 2, "home_team_name": ["A"] * 2,
+    "away_team_id": [66] * 2, "away_team_name": ["B"] * 2,
+    "home_goals": [0, None], "away_goals": [0, None],
+    "date": pd.to_datetime(kickoffs, utc=True), "venue_name": ["V"] * 2,
+    "referee": [None] * 2, "status_short": ["1H", "NS"],
+}}))
+assert storage.get_live_fixtures(utcnow()) == [1], storage.get_live_fixtures(utcnow())
+assert storage.get_next_kickoff(now) == kickoffs[1]
+"""
+    env = {**os.environ, "TZ": "America/New_York"}
+    subprocess.run([sys.executable, "-c", script], check=True, env=env)
+
+
+def test_scheduler_polls_live_fixtures(storage, live_api):
+    base_url, calls = live_api
+    clock = Clock(KICKOFF + timedelta(minutes=50))
+    scheduler, refreshes = _scheduler(storage, base_url, clock, daily_quota=7500)
+
+    assert scheduler.tick() == 60
+    assert refreshes == [(39, 2023)]
+    assert calls == [[1]]
+    assert scheduler.budget.used == 1
+    status = storage.conn.execute(
+        "SELECT status_short, home_goals FROM fixtures WHERE fixture_id = 1"
+    ).fetchone()
+    assert status == ("2H", 1)
+
+    # Nothing due yet: no requests
+    clock.now += timedelta(seconds=30)
+    scheduler.tick()
+    assert calls == [[1]]
+
+    # After the match: sleep until shortly before the next kick-off
+    storage.conn.execute("UPDATE fixtures SET status_short = 'FT' WHERE fixture_id = 1")
+    clock.now = KICKOFF + timedelta(hours=4, minutes=30)
+    assert scheduler.tick() == 15 * 60
+
+
+def test_scheduler_publishes_snapshots_after_changes(storage, live_api, tmp_path):
+    base_url, _ = live_api
+    clock = Clock(KICKOFF + timedelta(minutes=50))
+    snapshots = tmp_path / "snapshots"
+    scheduler, _ = _scheduler(
+        storage, base_url, clock, daily_quota=7500, publish_dir=str(snapshots)
+    )
+
+    scheduler.tick()
+    assert len(list(snapshots.glob("football-*.db"))) == 1
+
+    # The live poll returns the same score: nothing changed, nothing published
+    clock.now += timedelta(seconds=60)
+    scheduler.tick()
+    assert len(list(snapshots.glob("football-*.db"))) == 1
+
+
+def test_live_polling_respects_quota(storage, live_api):
+    base_url, calls = live_api
+    clock = Clock(KICKOFF + timedelta(minutes=50))
+    scheduler, _ = _scheduler(
+        storage, base_url, clock, daily_quota=10, refresh_reserve=8
+    )
+
+    scheduler.tick()
+    assert calls == [[1]]
+    # 10 requests, 8 reserved: two polls (this one included) share the 3h window
+    assert scheduler._next_live_poll - clock.now == timedelta(hours=1.5)
+
+
+def test_scheduler_backs_off_on_failure(storage):
+    def failing_refresh(*args):
+        raise RuntimeError("API down")
+
+    clock = Clock(KICKOFF - timedelta(days=2))
+    scheduler, _ = _scheduler(storage, "http://unused", clock, refresh=failing_refresh)
+
+    assert scheduler.tick() == 120
+    assert scheduler.tick() == 240
+
+
+def test_quota_budget_resets_daily():
+    clock = Clock(datetime(2024, 1, 6, 23, 0))
+    budget = QuotaBudget(10, clock)
+    budget.spend(9)
+    assert budget.can_spend(1)
+    assert not budget.can_spend(1, reserve=1)
+    assert budget.seconds_until_reset() == 3600
+
+    clock.now += timedelta(hours=2)
+    assert budget.remaining() == 10
@@ -0,0 +1,124 @@
+import pytest
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from pipelines.snapshots import SnapshotReader, current_snapshot
+from pipelines.storage import FootballDataStorage
+
+
+def _fixture(fixture_id, home, away, home_goals=1, away_goals=0):
+    return {
+        "fixture_id": fixture_id,
+        "league_id": 39,
+        "league_name": "Premier League",
+        "season": 2023,
+        "home_team_id": home[0],
+        "home_team_name": home[1],
+        "away_team_id": away[0],
+        "away_team_name": away[1],
+        "home_goals": home_goals,
+        "away_goals": away_goals,
+        "date": pd.Timestamp("2023-08-01") + pd.Timedelta(days=fixture_id),
+        "venue_name": "Emirates",
+        "referee": "Ref",
+        "status_short": "FT",
+    }
+
+
+ARSENAL, LIVERPOOL, CHELSEA = (42, "Arsenal"), (66, "Liverpool"), (50, "Chelsea")
+
+
+@pytest.fixture
+def writer(tmp_path):
+    storage = FootballDataStorage(db_path=str(tmp_path / "football.db"))
+    yield storage
+    storage.close()
+
+
+def test_publish_and_hot_swap(writer, tmp_path):
+    snapshots = tmp_path / "snapshots"
+    writer.load_fixtures(pd.DataFrame([_fixture(1, ARSENAL, LIVERPOOL)]))
+    first = writer.publish_snapshot(snapshots)
+    assert current_snapshot(snapshots) == first
+
+    reader = SnapshotReader(snapshots, check_interval=0)
+    try:
+        assert len(reader.get_recent_results("Arsenal")) == 1
+
+        # The writer keeps loading while the reader is open
+        writer.load_fixtures(pd.DataFrame([_fixture(2, CHELSEA, ARSENAL)]))
+        second = writer.publish_snapshot(snapshots)
+
+        assert len(reader.get_recent_results("Arsenal")) == 2
+        assert reader.path == second
+        assert reader.current_data_version() == writer.get_data_version()
+    finally:
+        reader.close()
+
+
+def test_in_flight_queries_keep_their_snapshot(writer, tmp_path):
+    snapshots = tmp_path / "snapshots"
+    writer.load_fixtures(pd.DataFrame([_fixture(1, ARSENAL, LIVERPOOL)]))
+    writer.publish_snapshot(snapshots)
+    reader = SnapshotReader(snapshots, check_interval=0)
+    try:
+        with reader.lease() as old:
+            writer.load_fixtures(pd.DataFrame([_fixture(2, CHELSEA, ARSENAL)]))
+            writer.publish_snapshot(snapshots)
+            assert reader.refresh(force=True)
+
+            # Still open and still answering from the previous snapshot
+            assert len(old.get_recent_results("Arsenal")) == 1
+        with pytest.raises(Exception):
+            old.get_fixture_count()  # closed once the lease ended
+        assert len(reader.get_recent_results("Arsenal")) == 2
+    finally:
+        reader.close()
+
+
+def test_old_snapshots_are_pruned(writer, tmp_path):
+    snapshots = tmp_path / "snapshots"
+    for fixture_id in range(1, 6):
+        writer.load_fixtures(pd.DataFrame([_fixture(fixture_id, ARSENAL, CHELSEA)]))
+        writer.publish_snapshot(snapshots)
+
+    published = sorted(p.name for p in snapshots.glob("football-*.db"))
+    assert len(published) == 3
+    assert current_snapshot(snapshots).name in published
+    assert not list(snapshots.glob(".*tmp"))
+
+
+def test_reader_starts_before_the_first_snapshot(writer, tmp_path):
+    snapshots = tmp_path / "snapshots"
+    reader = SnapshotReader(snapshots, check_interval=60)
+    try:
+        assert reader.path is None and reader.query_cache is None
+        with pytest.raises(FileNotFoundError):
+            reader.get_recent_results("Arsenal")
+
+        # Picked up on the next call, without waiting for check_interval
+        writer.load_fixtures(pd.DataFrame([_fixture(1, ARSENAL, LIVERPOOL)]))
+        first = writer.publish_snapshot(snapshots)
+        assert len(reader.get_recent_results("Arsenal")) == 1
+        assert reader.path == first
+    finally:
+        reader.close()
+
+
+def test_reader_passes_storage_options(writer, tmp_path):
+    snapshots = tmp_path / "snapshots"
+    writer.load_fixtures(pd.DataFrame([_fixture(1, ARSENAL, LIVERPOOL)]))
+    writer.publish_snapshot(snapshots)
+    reader = SnapshotReader(snapshots, storage_options={"fixture_index": True})
+    try:
+        with reader.lease() as storage:
+            assert storage.use_fixture_index
+            assert storage._fixture_index is not None  # warmed on open
+        assert reader.get_recent_results("Arsenal") == writer.get_recent_results(
+            "Arsenal"
+        )
+    finally:
+        reader.close()
@@ -1,7 +1,10 @@
 import pytest
 from pathlib import Path
+import os
 import pandas as pd
+import subprocess
 import sys
+from datetime import datetime
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
@@ -61,3 +64,365 @@ def test_invalid_data(temp_db, tmp_path):
 
     count = temp_db.load_parquet_file(invalid_path)
     assert count == 0  # Should skip invalid files
+
+
+def test_replace_updates_existing_fixtures(temp_db, sample_parquet, tmp_path):
+    temp_db.load_parquet_file(sample_parquet)
+
+    df = pd.read_parquet(sample_parquet)
+    df.loc[0, ["home_goals", "status_short"]] = [3, "AET"]
+    updated_path = tmp_path / "updated.parquet"
+    df.to_parquet(updated_path)
+
+    assert temp_db.load_parquet_file(updated_path, mode="ignore") == 0
+    assert temp_db.load_parquet_file(updated_path) == 1  # upsert by default
+    row = temp_db.conn.execute(
+        "SELECT home_goals, status_short FROM fixtures WHERE fixture_id = 1"
+    ).fetchone()
+    assert row == (3, "AET")
+    assert temp_db.get_fixture_count() == 2
+
+
+def test_merge_fixtures_counts_and_processed_at(temp_db, sample_parquet):
+    df = pd.read_parquet(sample_parquet)
+    df["date"] = pd.to_datetime(df["date"])
+    assert temp_db.merge_fixtures(df).inserted == 2
+    temp_db.conn.execute("UPDATE fixtures SET processed_at = TIMESTAMP '2000-01-01'")
+
+    df.loc[1, ["away_goals", "referee"]] = [3, "Ref 9"]
+    df.loc[2] = df.loc[0]
+    df.loc[2, "fixture_id"] = 3
+    stats = temp_db.merge_fixtures(df)
+
+    assert (stats.inserted, stats.updated, stats.unchanged) == (1, 1, 1)
+    rows = dict(
+        temp_db.conn.execute(
+            "SELECT fixture_id, processed_at > TIMESTAMP '2000-01-01' FROM fixtures"
+        ).fetchall()
+    )
+    assert rows == {1: False, 2: True, 3: True}
+    changes = temp_db.conn.execute(
+        "SELECT fixture_id, is_new, old_away_goals FROM fixture_changes ORDER BY 1"
+    ).fetchall()
+    assert changes == [(2, False, 0), (3, True, None)]
+
+
+def test_duplicate_fixtures_in_a_batch_keep_the_last_row(temp_db, sample_parquet):
+    import pyarrow as pa
+
+    df = pd.read_parquet(sample_parquet)
+    df["date"] = pd.to_datetime(df["date"])
+    newer = df.iloc[[0]].assign(home_goals=5)
+    batch = pd.concat([df, newer], ignore_index=True)
+
+    for data in (batch, pa.Table.from_pandas(batch)):
+        stats = temp_db.load_fixtures(data)
+        assert stats.total == 2
+        goals = temp_db.conn.execute(
+            "SELECT home_goals FROM fixtures WHERE fixture_id = 1"
+        ).fetchone()
+        assert goals == (5,)
+
+
+def test_watermark_and_open_fixtures(temp_db, tmp_path):
+    df = pd.DataFrame(
+        {
+            "fixture_id": [1, 2, 3],
+            "league_id": [39] * 3,
+            "league_name": ["Premier League"] * 3,
+            "season": [2023] * 3,
+            "home_team_id": [42, 50, 66],
+            "home_team_name": ["Arsenal", "Chelsea", "Liverpool"],
+            "away_team_id": [66, 55, 42],
+            "away_team_name": ["Liverpool", "Man City", "Arsenal"],
+            "home_goals": [1, None, None],
+            "away_goals": [0, None, None],
+            "date": ["2023-08-01", "2023-08-02", "2023-09-01"],
+            "venue_name": ["Emirates", "Stamford Bridge", "Anfield"],
+            "referee": [None] * 3,
+            "status_short": ["FT", "PST", "NS"],
+        }
+    )
+    path = tmp_path / "open.parquet"
+    df.to_parquet(path)
+    temp_db.load_parquet_file(path)
+
+    assert temp_db.get_watermark(39, 2023) is None
+    fetched_at = datetime(2023, 8, 20, 10, 30)
+    temp_db.set_watermark(39, 2023, fetched_at)
+    assert temp_db.get_watermark(39, 2023) == fetched_at
+
+    assert temp_db.get_open_fixture_ids(39, 2023) == [2, 3]
+    assert temp_db.get_open_fixture_ids(39, 2023, before=fetched_at) == [2]
+
+
+def test_bulk_load(temp_db, sample_parquet, tmp_path):
+    newer = pd.read_parquet(sample_parquet)
+    newer["fixture_id"] = [2, 3]
+    newer["home_goals"] = [4, 0]
+    newer.to_parquet(tmp_path / "test_2.parquet")
+    pd.DataFrame({"invalid_column": [1]}).to_parquet(tmp_path / "invalid.parquet")
+    # Copied files: modification times no longer follow the names
+    os.utime(tmp_path / "test_2.parquet", (1_000_000, 1_000_000))
+
+    stats = temp_db.bulk_load(tmp_path)
+
+    assert stats["files"] == 2  # invalid file skipped
+    assert stats["rows"] == 3
+    assert stats["rows_per_sec"] > 0
+    # fixture 2 appears twice; the most recently written file (by name) wins
+    row = temp_db.conn.execute(
+        "SELECT home_goals, date FROM fixtures WHERE fixture_id = 2"
+    ).fetchone()
+    assert row == (4, datetime(2023, 8, 1))
+
+
+def test_bulk_load_arrow_table(temp_db, sample_parquet):
+    import pyarrow.parquet as pq
+
+    stats = temp_db.bulk_load(pq.read_table(sample_parquet))
+    assert stats["rows"] == 2
+    assert temp_db.get_fixture_count() == 2
+
+
+def test_standings_follow_fixture_updates(temp_db, sample_parquet):
+    df = pd.read_parquet(sample_parquet)
+    df["date"] = pd.to_datetime(df["date"])
+    df.loc[1, "status_short"] = "NS"
+    temp_db.merge_fixtures(df)
+
+    table = {row["team_name"]: row for row in temp_db.get_league_standings(39)}
+    assert set(table) == {"Arsenal", "Liverpool"}  # only the finished match counts
+    assert table["Arsenal"]["points"] == 1
+
+    # The second match finishes: Chelsea 1-0 Man City
+    df.loc[1, "status_short"] = "FT"
+    temp_db.merge_fixtures(df)
+
+    standings = temp_db.get_league_standings(39, season=2023)
+    assert [row["team_name"] for row in standings][:1] == ["Chelsea"]
+    chelsea = standings[0]
+    assert (chelsea["won"], chelsea["goal_diff"], chelsea["form"]) == (1, 1, "W")
+    assert standings[-1]["team_name"] == "Man City"
+    assert temp_db.get_league_standings(140) == []
+
+
+def test_backfills_run_once_per_database(temp_db, sample_parquet):
+    df = pd.read_parquet(sample_parquet)
+    df["date"] = pd.to_datetime(df["date"])
+    df["status_short"] = "NS"  # no standings until a match is played
+    temp_db.merge_fixtures(df)
+    version = temp_db.get_data_version()
+    temp_db.close()
+
+    reopened = FootballDataStorage(db_path=str(temp_db.db_path))
+    assert reopened.get_data_version() == version  # standings not rebuilt
+
+    # A database from before the derived tables: backfilled on the next open
+    reopened.conn.execute("DELETE FROM schema_migrations")
+    reopened.conn.execute("DELETE FROM teams")
+    reopened.close()
+    migrated = FootballDataStorage(db_path=str(temp_db.db_path))
+    try:
+        assert migrated.find_teams("Arsenal")
+    finally:
+        migrated.close()
+
+
+def test_team_queries_resolve_names(temp_db, sample_parquet):
+    df = pd.read_parquet(sample_parquet)
+    df["date"] = pd.to_datetime(df["date"])
+    temp_db.merge_fixtures(df)
+
+    assert temp_db.resolve_team("man city") == [55]
+    results = temp_db.get_recent_results("Chelsea FC")
+    assert [(r["home_team"], r["away_team"]) for r in results] == [
+        ("Chelsea", "Man City")
+    ]
+    assert len(temp_db.get_recent_results(limit=1)) == 1
+    assert temp_db.get_recent_results("Real Madrid") == []
+    assert temp_db.get_recent_results("x' OR '1'='1") == []
+
+
+def test_query_cache_invalidated_by_loads(temp_db, sample_parquet):
+    df = pd.read_parquet(sample_parquet)
+    df["date"] = pd.to_datetime(df["date"])
+    temp_db.merge_fixtures(df)
+    version = temp_db.get_data_version()
+
+    first = temp_db.get_league_standings(39)
+    assert temp_db.get_league_standings(39) is first
+    assert temp_db.query_cache.stats()["hits"] == 1
+
+    # Loading identical rows changes nothing and keeps the cache
+    temp_db.merge_fixtures(df)
+    assert temp_db.get_data_version() == version
+    assert temp_db.get_league_standings(39) is first
+
+    df.loc[0, "home_goals"] = 3
+    temp_db.merge_fixtures(df)
+    assert temp_db.get_data_version() == version + 1
+    standings = temp_db.get_league_standings(39)
+    assert standings[0]["team_name"] == "Arsenal"
+    assert standings[0]["points"] == 3
+
+
+def test_concurrent_reads_use_thread_cursors(temp_db, sample_parquet):
+    from concurrent.futures import ThreadPoolExecutor
+
+    df = pd.read_parquet(sample_parquet)
+    df["date"] = pd.to_datetime(df["date"])
+    temp_db.merge_fixtures(df)
+    temp_db.query_cache.ttl = 0  # force every call to hit the database
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        tables = list(pool.map(lambda _: temp_db.get_league_standings(39), range(40)))
+
+    assert all(len(table) == 4 for table in tables)
+    assert len(temp_db._cursors) <= 5  # one per worker plus the main thread
+
+
+def test_team_snapshots_answer_team_queries(temp_db, sample_parquet):
+    df = pd.read_parquet(sample_parquet)
+    df["date"] = pd.to_datetime(df["date"])
+    upcoming = df.iloc[[0]].assign(
+        fixture_id=3,
+        home_goals=None,
+        away_goals=None,
+        date=pd.Timestamp("2099-01-01 15:00"),
+        status_short="NS",
+    )
+    temp_db.merge_fixtures(pd.concat([df, upcoming]))
+
+    snapshot = temp_db.conn.execute(
+        "SELECT upcoming, results FROM team_snapshots WHERE team_id = 42"
+    ).fetchone()
+    assert [e["fixture_id"] for e in snapshot[0]] == [3]
+    assert [e["fixture_id"] for e in snapshot[1]] == [1]
+
+    assert temp_db.get_recent_result_lines("Arsenal") == [
+        "⚽ Arsenal 2-2 Liverpool\n📅 2023-08-01"
+    ]
+    assert temp_db.get_upcoming_fixture_lines("arsenal") == [
+        "⚔ Arsenal vs Liverpool\n📅 2099-01-01 15:00\n🏟 Emirates"
+    ]
+    # Same lines as the fallback query path
+    assert temp_db.get_recent_result_lines() == [
+        "⚽ Chelsea 1-0 Man City\n📅 2023-08-02",
+        "⚽ Arsenal 2-2 Liverpool\n📅 2023-08-01",
+    ]
+
+    # The fixture is played: both teams' snapshots move it to results
+    played = upcoming.assign(home_goals=1, away_goals=0, status_short="FT")
+    temp_db.merge_fixtures(played)
+    assert temp_db.get_upcoming_fixture_lines("Liverpool") == []
+    assert temp_db.get_recent_result_lines("Liverpool")[0].startswith(
+        "⚽ Arsenal 1-0 Liverpool"
+    )
+
+
+def test_team_snapshots_on_a_non_utc_host(tmp_path):
+    script = f"""
+import sys
+from datetime import timedelta
+import pandas as pd
+sys.path.append({str(Path(__file__).parent.parent.parent)!r})
+from pipelines.storage import FootballDataStorage, utcnow
+storage = FootballDataStorage(db_path={str(tmp_path / "tz.db")!r})
+now = utcnow()
+kickoffs = [now - timedelta(hours=2), now + timedelta(hours=2)]
+storage.merge_fixtures(pd.DataFrame({{
+    "fixture_id": [1, 2], "league_id": [39] * 2, "league_name": ["PL"] * 2,
+    "season": [2023] * 2, "home_team_id": [42] * 2,
+    "home_team_name": ["Arsenal"] * 2, "away_team_id": [66, 50],
+    "away_team_name": ["Liverpool", "Chelsea"], "home_goals": [None] * 2,
+    "away_goals": [None] * 2, "date": pd.to_datetime(kickoffs, utc=True),
+    "venue_name": ["V"] * 2, "referee": [None] * 2, "status_short": ["NS"] * 2,
+}}))
+lines = storage.get_upcoming_fixture_lines("Arsenal")
+assert len(lines) == 1 and "Chelsea" in lines[0], lines
+"""
+    env = {**os.environ, "TZ": "Asia/Tokyo"}
+    subprocess.run([sys.executable, "-c", script], check=True, env=env)
+
+
+def test_change_events_from_score_and_status_changes(temp_db, sample_parquet):
+    df = pd.read_parquet(sample_parquet)
+    df["date"] = pd.to_datetime(df["date"])
+    df["status_short"] = ["2H", "NS"]
+    df.loc[1, ["home_goals", "away_goals"]] = None
+    temp_db.merge_fixtures(df)
+    assert temp_db.get_change_events() == []  # new fixtures: no baseline
+
+    df.loc[0, "home_goals"] = 3  # goal in a live match
+    df.loc[1, ["status_short", "home_goals", "away_goals"]] = ["1H", 0, 0]
+    temp_db.merge_fixtures(df)
+    df.loc[0, "status_short"] = "FT"
+    temp_db.merge_fixtures(df)
+
+    events = temp_db.get_change_events()
+    assert [(e["kind"], e["fixture_id"]) for e in events] == [
+        ("score", 1),
+        ("final", 1),
+    ]  # kick-off (no score -> 0-0) is not a score change
+    assert (events[0]["old_home_goals"], events[0]["home_goals"]) == (2, 3)
+    assert temp_db.get_change_events(after_id=events[0]["event_id"]) == events[1:]
+    assert temp_db.get_latest_change_event_id() == events[1]["event_id"]
+
+
+def test_fixture_details_follow_status(temp_db, sample_parquet):
+    from pipelines.processing import fixture_details_to_tables
+
+    df = pd.read_parquet(sample_parquet)
+    df["date"] = pd.to_datetime(df["date"])
+    df["status_short"] = ["2H", "NS"]
+    temp_db.merge_fixtures(df)
+    assert temp_db.get_fixtures_needing_details() == [1]  # not started: skipped
+
+    def details(status, goals):
+        item = {
+            "fixture": {"id": 1, "status": {"short": status}},
+            "events": [{"type": "Goal", "team": {"id": 42}}] * goals,
+        }
+        return fixture_details_to_tables([item])
+
+    assert temp_db.load_fixture_details(details("2H", 1))["events"] == 1
+    assert temp_db.get_fixtures_needing_details() == []
+
+    df.loc[0, "status_short"] = "FT"
+    temp_db.merge_fixtures(df)
+    assert temp_db.get_fixtures_needing_details() == [1]
+
+    # Reloading replaces the fixture's details instead of adding to them
+    temp_db.load_fixture_details(details("FT", 3))
+    count = temp_db.conn.execute("SELECT count(*) FROM fixture_events").fetchone()
+    assert count == (3,)
+    assert temp_db.get_fixtures_needing_details() == []
+
+
+def test_read_queries_inline_integers_only(temp_db, sample_parquet):
+    temp_db.load_parquet_file(sample_parquet)
+    latest = temp_db.get_league_standings(39)
+    assert latest and temp_db.get_league_standings(39, season=2023) == latest
+    # Limits and IDs are written into the SQL through int(), never as text
+    with pytest.raises(ValueError):
+        temp_db.get_change_events(after_id="0 OR 1=1")
+    # Other parameters are still bound
+    assert temp_db._read("SELECT ? || '?'", ["what"]).fetchall() == [("what?",)]
+
+
+def test_read_only_queries_do_not_import_pandas(temp_db, sample_parquet):
+    temp_db.load_parquet_file(sample_parquet)
+    temp_db.close()
+    script = f"""
+import sys
+sys.path.append({str(Path(__file__).parent.parent.parent)!r})
+from pipelines.storage import FootballDataStorage
+storage = FootballDataStorage(db_path={str(temp_db.db_path)!r}, read_only=True)
+assert storage.get_recent_results("Arsenal", limit=1)
+assert storage.get_recent_result_lines("Chelsea")
+assert storage.get_league_standings(39)
+heavy = [m for m in ("pandas", "pyarrow", "numpy") if m in sys.modules]
+assert not heavy, heavy
+"""
+    subprocess.run([sys.executable, "-c", script], check=True)
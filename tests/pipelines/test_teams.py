@@ -0,0 +1,51 @@
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from pipelines.teams import TeamIndex, normalize
+
+TEAMS = [
+    (33, "Manchester United"),
+    (50, "Manchester City"),
+    (42, "Arsenal"),
+    (47, "Tottenham"),
+    (39, "Wolves"),
+    (66, "Aston Villa"),
+    (65, "Nottingham Forest"),
+]
+
+
+@pytest.fixture
+def index():
+    return TeamIndex(TEAMS)
+
+
+def test_normalize():
+    assert normalize("Arsenal FC") == "arsenal"
+    assert normalize("Atlético  Madrid") == "atletico madrid"
+    assert normalize("Brighton & Hove Albion") == "brighton and hove albion"
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("Arsenal", [42]),
+        ("man utd", [33]),
+        ("Spurs", [47]),
+        ("Wolves", [39]),
+        ("villa", [66]),
+        ("Forest", [65]),
+        ("Manchester", [50, 33]),  # closest name first
+        ("Man", [50, 33]),
+        ("Arsnal", [42]),
+    ],
+)
+def test_resolve(index, query, expected):
+    assert index.resolve(query) == expected
+
+
+def test_resolve_unknown(index):
+    assert index.resolve("Real Madrid") == []
+    assert index.resolve("") == []
+    assert index.resolve("'; DROP TABLE fixtures; --") == []